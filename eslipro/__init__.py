@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+EsLiPro: Estimations of Linguistic Productivity (CRE and TRI)
+
+The stages of the analysis can be used from Python, e.g. to run many comparisons in the same process:
+
+    import eslipro
+    data1 = eslipro.load_corpus("a.txt")
+    data2 = eslipro.load_corpus("b.txt")
+    cre1 = eslipro.compute_cre(data1, 1)
+    vocabulary = eslipro.shared_vocabulary(data1, data2)
+    FILT_1 = eslipro.vocabulary_filter(data1, vocabulary)
+    comparison = eslipro.compare(data1, data2, numiter=1000, seed=1)
+    ResultsTable = eslipro.build_results_table(comparison)
+
+The modules are only imported when one of their functions is used, so "import eslipro" is fast
+(see EsLiPro.py and readme.txt for the command line)
+"""
+
+# import importlib to import the modules of the package when they are first needed
+# https://docs.python.org/3/library/importlib.html
+import importlib
+
+# Name of every public function or class, and the module where it is defined
+_EXPORTS = {
+    "Corpus": "corpus",
+    "read_corpus": "corpus",
+    "load_corpus": "corpus",
+    "NORMALIZATION_RULES": "corpus",
+    "Tokenizer": "tokenizer",
+    "CREResult": "cre",
+    "compute_cre": "cre",
+    "SharedVocabulary": "vocabulary",
+    "shared_vocabulary": "vocabulary",
+    "vocabulary_filter": "vocabulary",
+    "resample_cre": "resampling",
+    "exact_cre": "exact",
+    "Sample3": "analysis",
+    "resample": "analysis",
+    "Comparison": "analysis",
+    "compare": "analysis",
+    "EqualSamplesError": "analysis",
+    "build_results_table": "analysis",
+    "write_outputs": "analysis",
+    "run_comparison": "analysis",
+    "read_iterations": "outputs",
+    "difference_tests": "inference",
+    "best_comparison": "bayes",
+    "RunReport": "instrument",
+    "load_directory": "batch",
+    "batch_pairs": "batch",
+    "run_batch": "batch",
+    "summary_matrices": "batch",
+    "NWayComparison": "nway",
+    "compare_many": "nway",
+    "build_nway_table": "nway",
+    "write_nway_outputs": "nway",
+    "IncrementalComparison": "incremental",
+    "update_state": "incremental",
+    "trajectory": "trajectory",
+    "synthetic_pair": "benchmark",
+    "run_benchmark": "benchmark",
+    "main": "cli",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError("module 'eslipro' has no attribute " + repr(name))
+    value = getattr(importlib.import_module("." + _EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+"""
+{01}-{7} Comparison of two samples: CRE and TRI before and after the vocabulary and sample size controls,
+histograms and feedback files
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# {01}-{7} Comparison of two samples
+# =============================================================================
+
+# Import os.path to write the outputs in the output directory
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import namedtuple to keep the results of every stage together
+# https://docs.python.org/3/library/collections.html
+from collections import namedtuple
+# import multiprocessing to draw the images of the histograms in another process
+# https://docs.python.org/3/library/multiprocessing.html
+import multiprocessing as mp
+
+from .corpus import load_corpus
+from .cre import CREResult, compute_cre, cre_summary
+from .vocabulary import shared_vocabulary, vocabulary_filter
+from .resampling import converged, resample_cre
+from .exact import exact_cre
+from .inference import difference_tests
+from .bayes import best_comparison, write_best
+from .instrument import RunReport, write_manifest
+from .outputs import output_path, write_table
+from .memo import cacheable, load_result, result_key, store_result
+
+
+# Nothing can be compared when both samples have the same number of tokens after the vocabulary control
+class EqualSamplesError(ValueError):
+    """Both samples have the same number of tokens, so no random samples can be extracted from the largest one."""
+
+
+# {04} Sample 3: the largest sample (after the vocabulary control) reduced to the size of the smallest one
+
+# Sample 3 keeps its CREResult (mean CRE of every morpheme), the summaries of the iterations (montecarlo) and the seed used
+# With a precision (adaptive mode), it also keeps the number of iterations run and the standard errors reached:
+# of the overall CRE of prefixes and suffixes, and the largest one of the mean CRE of a prefix and of a suffix
+# (converged is False when all the iterations were run before the precision was reached), and the sampler used
+# In the exact mode, ntypes has the expected numbers of prefixes and suffixes drawn (the denominators of TRI)
+Sample3 = namedtuple("Sample3", ["cre", "Pre_Stats", "Suf_Stats", "seed", "precision", "iterations", "errors", "converged",
+                                 "sampler", "ntypes"], defaults=(None, None, None, None, None, None))
+
+def sample3_types(sample3):
+    """Return the numbers of prefixes and suffixes of Sample 3 (expected numbers in the exact mode)."""
+    if sample3.ntypes is not None:
+        return sample3.ntypes
+    return len(sample3.cre.Pre), len(sample3.cre.Suf)
+
+def sample3_table(table, position):
+    """Return the 'Sample','Position','Morpheme','CRE' table of Sample 3 for a "Morpheme","CRE" table."""
+    table['Sample'] = 3
+    table['Position'] = position
+    return table[['Sample', 'Position', 'Morpheme', 'CRE']]
+
+def resample(corpus, n, mode="montecarlo", numiter=1000, seed=None, workers=1, iteration_files=None, quantiles=(),
+             vocabulary=None, progress=True, precision=None, per_morpheme=False, sampler="tokens", iteration_format="csv"):
+    """Return the Sample3 of a Corpus reduced to n tokens, with random samples (montecarlo) or expected values (exact)."""
+    Pre_Stats = Suf_Stats = seed_used = iterations = errors = reached = ntypes = None
+    if mode == "montecarlo":
+        # All iterations are drawn in batches from the encoded sample (see {00.d}: random tokens, or random numbers of
+        # tokens of every construction type with the samplers "counts" and "bootstrap"), and the corresponding compute of
+        # Creativity [CRE] is made for every random sample, now called Sample 3
+        # The mean (and sd) of CRE of every morpheme is updated as every block of iterations finishes
+        # The seed actually used is kept, so that the same random samples can be drawn again with --seed
+        Pre_Acc, Suf_Acc, pre_vocab, suf_vocab, seed_used = resample_cre(corpus, n, numiter, seed=seed, workers=workers,
+                                                                         iteration_files=iteration_files,
+                                                                         quantiles=quantiles, vocabulary=vocabulary,
+                                                                         progress=progress, precision=precision,
+                                                                         per_morpheme=per_morpheme, sampler=sampler,
+                                                                         iteration_format=iteration_format)
+        # Now the CRE values are summarised: number of iterations where each morpheme was drawn, mean, sd and quantiles
+        Pre_Stats = Pre_Acc.table(pre_vocab, quantiles)
+        Suf_Stats = Suf_Acc.table(suf_vocab, quantiles)
+        CRE_Pre_Table = Pre_Stats[['Morpheme', 'CRE']].copy()
+        CRE_Suf_Table = Suf_Stats[['Morpheme', 'CRE']].copy()
+        # the morphemes with a mean CRE of 1 were used with just one partner in every iteration
+        count_Tri_Pre = CRE_Pre_Table[CRE_Pre_Table.CRE == 1].shape[0]
+        count_Tri_Suf = CRE_Suf_Table[CRE_Suf_Table.CRE == 1].shape[0]
+        if precision is not None:
+            iterations = Pre_Acc.iterations()
+            errors = (Pre_Acc.standard_error(), Suf_Acc.standard_error(),
+                      Pre_Acc.morpheme_standard_error(), Suf_Acc.morpheme_standard_error())
+            reached = converged(Pre_Acc, Suf_Acc, precision, per_morpheme)
+    elif mode == "exact":
+        # No random samples are drawn: the expected CRE of every morpheme in a sample of that size is computed (see {00.e})
+        # The expected numbers of morphemes with a mean CRE of 1 and of morphemes drawn in numiter iterations are kept
+        # for the analysis of TRI in {05.c}, so that TRI is the expected value of the one of the random samples
+        CRE_Pre_Table, CRE_Suf_Table, count_Tri_Pre, count_Tri_Suf, *ntypes = exact_cre(corpus, n, vocabulary=vocabulary,
+                                                                                        numiter=numiter)
+    else:
+        raise ValueError('mode must be "montecarlo" or "exact", not ' + repr(mode))
+    cre = CREResult(sample3_table(CRE_Pre_Table, 'Prefix'), sample3_table(CRE_Suf_Table, 'Suffix'), count_Tri_Pre, count_Tri_Suf)
+    return Sample3(cre, Pre_Stats, Suf_Stats, seed_used, precision if mode == "montecarlo" else None, iterations, errors,
+                   reached, sampler if mode == "montecarlo" else None, tuple(ntypes) if ntypes else None)
+
+
+# {01}-{05} All the stages of the comparison of two samples
+
+# Every stage keeps its results in the Comparison, so the tables and feedback files of {7} can be created from it
+# (tests keeps the DifferenceTests of {05.d} and best the BayesianComparison of {05.e} when they were requested)
+Comparison = namedtuple("Comparison", ["names", "mode", "data1", "data2", "cre1", "cre2", "vocabulary",
+                                       "FILT_1", "FILT_2", "cre1b", "cre2b", "tokendiff", "sample3", "tests", "best"],
+                        defaults=(None, None))
+
+def compare(data1, data2, mode="montecarlo", numiter=1000, seed=None, workers=1, iteration_files=None, quantiles=(),
+            names=("Sample 1", "Sample 2"), cre1=None, cre2=None, progress=True, precision=None, per_morpheme=False,
+            sampler="tokens", tests=0, confidence=0.95, report=None, iteration_format="csv"):
+    """Return the Comparison of two Corpus objects: CRE and TRI before and after the vocabulary and sample size controls."""
+    # the time and memory of every section are kept in the RunReport (see eslipro/instrument.py)
+    if report is None:
+        report = RunReport()
+    # the same master seed is used by the random samples of {04} and the tests of {05.d}
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    # {01} and {02} A first compute of Creativity [CRE] before controlling for vocabulary and sample size
+    # The counts of prefixes and suffixes with CRE = 1 are kept for the analysis of TRI in {05.a}
+    # (the CREResult of a sample can be given when it was already computed, e.g. by the batch mode)
+    with report.stage("01-02", "CRE and TRI of Samples 1 and 2") as counts:
+        if cre1 is None:
+            cre1 = compute_cre(data1, 1)
+        if cre2 is None:
+            cre2 = compute_cre(data2, 2)
+        counts.update(prefixes=len(cre1.Pre) + len(cre2.Pre), suffixes=len(cre1.Suf) + len(cre2.Suf))
+    # {03} The shared vocabulary is computed only once, and it is used again by the random samples in {04}
+    # Only the constructions of every sample with a prefix and a suffix existing in the other one are kept
+    with report.stage("03", "vocabulary control") as counts:
+        vocabulary = shared_vocabulary(data1, data2)
+        FILT_1 = vocabulary_filter(data1, vocabulary)
+        FILT_2 = vocabulary_filter(data2, vocabulary)
+        # The counts of prefixes and suffixes with CRE = 1 are kept for the analysis of TRI in {05.b}
+        cre1b = compute_cre(FILT_1, 1)
+        cre2b = compute_cre(FILT_2, 2)
+        counts.update(shared_prefixes=len(vocabulary.prefixes), shared_suffixes=len(vocabulary.suffixes),
+                      tokens=FILT_1.ntokens + FILT_2.ntokens, constructions=FILT_1.nconstructions + FILT_2.nconstructions)
+    # {04} The sample that is larger after the lexical control is the one used for the random samples
+    # (without lexical control, data2 or data1 would be used instead of FILT_2 or FILT_1)
+    tokendiff = FILT_2.ntokens - FILT_1.ntokens
+    if tokendiff == 0:
+        raise EqualSamplesError('Both files have the same size of tokens.' + "\r\n" +
+                                'Nothing is done and the code stops here because both samples had the same size.')
+    elif tokendiff > 0:
+        #samples are extracted from the second file
+        FILT_sample, nsample = FILT_2, FILT_1.ntokens
+    else:
+        #samples are extracted from the first file
+        FILT_sample, nsample = FILT_1, FILT_2.ntokens
+    with report.stage("04", "Sample 3 (" + mode + ")") as counts:
+        sample3 = resample(FILT_sample, nsample, mode=mode, numiter=numiter, seed=seed, workers=workers,
+                           iteration_files=iteration_files, quantiles=quantiles, vocabulary=vocabulary, progress=progress,
+                           precision=precision, per_morpheme=per_morpheme, sampler=sampler, iteration_format=iteration_format)
+        counts.update(tokens=int(nsample), constructions=FILT_sample.nconstructions)
+        if mode == "montecarlo":
+            counts["iterations"] = int(sample3.iterations if sample3.iterations is not None else numiter)
+    # {05.d} permutation test and bootstrap interval of the difference between the samples after the vocabulary control
+    Tests = None
+    if tests > 0:
+        with report.stage("05.d", "permutation test and bootstrap interval") as counts:
+            Tests = difference_tests(FILT_1, FILT_2, vocabulary, tests, seed=seed, confidence=confidence)
+            counts["replicates"] = tests
+    return Comparison(tuple(names), mode, data1, data2, cre1, cre2, vocabulary, FILT_1, FILT_2, cre1b, cre2b, tokendiff, sample3,
+                      Tests)
+
+
+# {05} Analysis of TRI and the main results table
+
+# Main results table with the values of CRE and TRI and sample sizes, equivalent to Table 3 from Aguado-Orea & Pine (2015)
+def build_results_table(comparison):
+    """Return the summary table (ResultsTable) of a Comparison: CRE, sd, Tokens, Types and TRI of every sample and control."""
+    c = comparison
+    ntokens1, ntokens2 = c.data1.ntokens, c.data2.ntokens
+    ntokens1f, ntokens2f = c.FILT_1.ntokens, c.FILT_2.ntokens
+    nShared_Prefix_Types = len(c.vocabulary.prefixes)
+    nShared_Suffix_Types = len(c.vocabulary.suffixes)
+    ntypes_Pre3, ntypes_Suf3 = sample3_types(c.sample3)
+    # the Types column follows the layout of the original table (e.g. the number of suffixes for Prefix/Suffix)
+    # (the last value of every row is the number of morphemes TRI is divided by, when it is not the one of the table:
+    # the expected numbers of morphemes drawn in the exact mode of Sample 3)
+    rows = [('None', 1, 'Prefix/Suffix', c.cre1.Pre, c.cre1.count_Tri_Pre, ntokens1, len(c.cre1.Suf), None),
+            ('None', 1, 'Suffix/Prefix', c.cre1.Suf, c.cre1.count_Tri_Suf, ntokens1, len(c.cre1.Pre), None),
+            ('None', 2, 'Prefix/Suffix', c.cre2.Pre, c.cre2.count_Tri_Pre, ntokens2, len(c.cre2.Suf), None),
+            ('None', 2, 'Suffix/Prefix', c.cre2.Suf, c.cre2.count_Tri_Suf, ntokens2, len(c.cre2.Pre), None),
+            ('Lexical', 1, 'Prefix/Suffix', c.cre1b.Pre, c.cre1b.count_Tri_Pre, ntokens1f, nShared_Prefix_Types, None),
+            ('Lexical', 1, 'Suffix/Prefix', c.cre1b.Suf, c.cre1b.count_Tri_Suf, ntokens1f, nShared_Prefix_Types, None),
+            ('Lexical', 2, 'Prefix/Suffix', c.cre2b.Pre, c.cre2b.count_Tri_Pre, ntokens2f, nShared_Suffix_Types, None),
+            ('Lexical', 2, 'Suffix/Prefix', c.cre2b.Suf, c.cre2b.count_Tri_Suf, ntokens2f, nShared_Suffix_Types, None),
+            ('Both', 1, 'Prefix/Suffix', c.sample3.cre.Pre, c.sample3.cre.count_Tri_Pre, ntokens1, len(c.sample3.cre.Suf), ntypes_Pre3),
+            ('Both', 1, 'Suffix/Prefix', c.sample3.cre.Suf, c.sample3.cre.count_Tri_Suf, ntokens1, len(c.sample3.cre.Pre), ntypes_Suf3)]
+    ResultsTable = pd.DataFrame(columns=['Control','Sample','Analysis','CRE','sd','Tokens','Types','TRI', 'TRI%'])
+    for control, sample, analysis, table, count_Tri, ntokens, ntypes, ntypes_Tri in rows:
+        CRE, sd, ntypes_table, TRI, TRI_percent = cre_summary(table, count_Tri, ntypes_Tri)
+        ResultsTable.loc[len(ResultsTable)] = [control, sample, analysis, CRE, sd, ntokens, ntypes, TRI, TRI_percent]
+    # adaptive mode: the number of iterations of Sample 3 and the standard error of its CRE
+    if c.sample3.precision is not None:
+        both = ResultsTable.Control == 'Both'
+        ResultsTable['Iterations'] = pd.array([c.sample3.iterations if row else None for row in both], dtype='Int64')
+        ResultsTable['SE'] = np.where(both, np.where(ResultsTable.Analysis == 'Prefix/Suffix', c.sample3.errors[0],
+                                                     c.sample3.errors[1]), np.nan)
+    # {05.d} the difference between the samples after the vocabulary control, in the rows of the control Lexical
+    if c.tests is not None:
+        lexical = ResultsTable.Control == 'Lexical'
+        for row in c.tests.Table.itertuples():
+            for column in ('Difference', 'p_permutation', 'CI_low', 'CI_high'):
+                if row.Statistic + '_' + column not in ResultsTable:
+                    ResultsTable[row.Statistic + '_' + column] = np.nan
+                ResultsTable.loc[lexical & (ResultsTable.Analysis == row.Analysis), row.Statistic + '_' + column] = getattr(row, column)
+    return ResultsTable
+
+
+# =============================================================================
+# {6} Histograms for CRE
+# =============================================================================
+
+# The CRE of the filtered samples 1 and 2 (and of Sample 3 against the smallest sample) are compared side by side
+# The histograms are counted with array operations in bins of width 1 (CRE = 1, 2, 3...; the mean CRE of Sample 3 goes to
+# the bin of its integer part), and written in histograms_CRE.csv: Position, Plot (the samples compared side by side),
+# Sample, CRE (the first value of the bin) and Count (number of morphemes)
+def histogram_bins(comparison):
+    """Return the table of the bins of the histograms of CRE for prefixes and suffixes (Samples 1 and 2, and Sample 3 against the smallest one)."""
+    c = comparison
+    # Sample 3 is compared with Sample 1 when there were more tokens in the second sample, and with Sample 2 otherwise
+    small = 1 if c.tokendiff > 0 else 2
+    small_cre = c.cre1b if small == 1 else c.cre2b
+    tables = []
+    for position, name in (("Pre", "Prefixes"), ("Suf", "Suffixes")):
+        pairs = [(1, getattr(c.cre1b, position)), (2, getattr(c.cre2b, position))]
+        pairs3 = [(small, getattr(small_cre, position)), (3, getattr(c.sample3.cre, position))]
+        for plot in (pairs, pairs3):
+            label = str(plot[0][0]) + '-' + str(plot[1][0])
+            for sample, table in plot:
+                counts = np.bincount(np.floor(np.asarray(table.CRE, dtype=float)).astype(np.int64))
+                bins = np.flatnonzero(counts)
+                tables.append(pd.DataFrame({'Position': name, 'Plot': label, 'Sample': sample, 'CRE': bins, 'Count': counts[bins]}))
+    return pd.concat(tables, ignore_index=True)
+
+# The images are only drawn when they are requested (--plots), by another process, while {7} writes the other outputs:
+# matplotlib is imported by that process only (without any screen, Agg), so a run without images never imports it
+# One png file per plot, with the histograms of both samples side by side: histogram_Prefixes_1-2.png...
+def render_histograms(bins_file, output_dir="."):
+    """Draw the histograms of a histograms_CRE.csv file as png files in output_dir."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    Bins = pd.read_csv(bins_file, dtype={'Plot': str})
+    for (name, label), Plot in Bins.groupby(['Position', 'Plot'], sort=False):
+        samples = Plot.Sample.unique()
+        fig, axes = plt.subplots(1, len(samples), figsize=(12, 4), squeeze=False)
+        for ax, sample in zip(axes[0], samples):
+            Sample = Plot[Plot.Sample == sample]
+            ax.bar(Sample.CRE, Sample.Count, width=1, align='edge')
+            ax.set_title("CRE " + name + " Sample " + str(sample))
+            ax.set_xlabel("CRE")
+            ax.set_ylabel("Morphemes")
+        fig.savefig(os.path.join(output_dir, 'histogram_' + name + '_' + label + '.png'))
+        plt.close(fig)
+
+def start_histograms(comparison, output_dir=".", plots=False):
+    """Write histograms_CRE.csv in output_dir; with plots, start and return the process that draws the images (else None)."""
+    os.makedirs(output_dir, exist_ok=True)
+    bins_file = os.path.join(output_dir, 'histograms_CRE.csv')
+    histogram_bins(comparison).to_csv(bins_file, header=True, index=False)
+    if not plots:
+        return None
+    process = mp.get_context().Process(target=render_histograms, args=(bins_file, output_dir))
+    process.start()
+    return process
+
+
+# =============================================================================
+# {7} Feedback files
+# =============================================================================
+
+def feedback_text(comparison):
+    """Return the text of feedback_file.txt for a Comparison."""
+    c = comparison
+    txtfile1, txtfile2 = c.names
+    ntokens1, ntokens2 = c.data1.ntokens, c.data2.ntokens
+    ntokens1f, ntokens2f = c.FILT_1.ntokens, c.FILT_2.ntokens
+    ntypes_prefix1, ntypes_suffix1 = len(c.data1.prefixes), len(c.data1.suffixes)
+    ntypes_prefix2, ntypes_suffix2 = len(c.data2.prefixes), len(c.data2.suffixes)
+    CRE_Pre_Table_1, CRE_Suf_Table_1, count_Tri_Pre_1, count_Tri_Suf_1 = c.cre1
+    CRE_Pre_Table_2, CRE_Suf_Table_2, count_Tri_Pre_2, count_Tri_Suf_2 = c.cre2
+    CRE_Pre_FILT_1, CRE_Suf_FILT_1, count_Tri_Pre_1b, count_Tri_Suf_1b = c.cre1b
+    CRE_Pre_FILT_2, CRE_Suf_FILT_2, count_Tri_Pre_2b, count_Tri_Suf_2b = c.cre2b
+    CRE_Pre_Table_3, CRE_Suf_Table_3, count_Tri_Pre_3, count_Tri_Suf_3 = c.sample3.cre
+    ntypes_Pre3, ntypes_Suf3 = sample3_types(c.sample3)
+    # {01.c}, {02.c}, {03.f} and {04}: overall level of creativity, and {05}: TRI
+    CRE_Pre_Value_1, CRE_Pre_Value_1_sd, ntypes, TRI_Pre_1, TRI_Pre_1_percent = cre_summary(CRE_Pre_Table_1, count_Tri_Pre_1)
+    CRE_Suf_Value_1, CRE_Suf_Value_1_sd, ntypes, TRI_Suf_1, TRI_Suf_1_percent = cre_summary(CRE_Suf_Table_1, count_Tri_Suf_1)
+    CRE_Pre_Value_2, CRE_Pre_Value_2_sd, ntypes, TRI_Pre_2, TRI_Pre_2_percent = cre_summary(CRE_Pre_Table_2, count_Tri_Pre_2)
+    CRE_Suf_Value_2, CRE_Suf_Value_2_sd, ntypes, TRI_Suf_2, TRI_Suf_2_percent = cre_summary(CRE_Suf_Table_2, count_Tri_Suf_2)
+    CRE_Pre_FILT_Value_1, sd, nFILT_pref_1, TRI_Pre_1b, TRI_Pre_1b_percent = cre_summary(CRE_Pre_FILT_1, count_Tri_Pre_1b)
+    CRE_Suf_FILT_Value_1, sd, nFILT_suff_1, TRI_Suf_1b, TRI_Suf_1b_percent = cre_summary(CRE_Suf_FILT_1, count_Tri_Suf_1b)
+    CRE_Pre_FILT_Value_2, sd, nFILT_pref_2, TRI_Pre_2b, TRI_Pre_2b_percent = cre_summary(CRE_Pre_FILT_2, count_Tri_Pre_2b)
+    CRE_Suf_FILT_Value_2, sd, nFILT_suff_2, TRI_Suf_2b, TRI_Suf_2b_percent = cre_summary(CRE_Suf_FILT_2, count_Tri_Suf_2b)
+    CRE_Pre_Value_3, sd, ntypes_prefix3, TRI_Pre_3, TRI_Pre_3_percent = cre_summary(CRE_Pre_Table_3, count_Tri_Pre_3, ntypes_Pre3)
+    CRE_Suf_Value_3, sd, ntypes_suffix3, TRI_Suf_3, TRI_Suf_3_percent = cre_summary(CRE_Suf_Table_3, count_Tri_Suf_3, ntypes_Suf3)
+    if c.tokendiff > 0:
+        msgtkn2 = ' second file'
+        msgtkn3 = str(ntokens1)
+    else:
+        msgtkn2 = ' first file'
+        msgtkn3 = str(ntokens2)
+
+    #A couple of lines to ask for the first filename to read
+    msg_sep = "————————————————————————————————————————————————————————————————————" + "\r\n"
+    msg_intro_01 = "Sample 1 is "+txtfile1 + "\r\n"
+    msg_intro_02 = "Sample 2 is "+txtfile2 + "\r\n"
+    msg_intro_03 = 'Number of tokens in FIRST text file :' + str(ntokens1) + "\r\n"
+    msg_intro_04 = 'Number of tokens in SECOND text file :' + str(ntokens2) + "\r\n"
+    msg_intro_05= '[A] Number of prefix types in FIRST text file :' + str(ntypes_prefix1) + "\r\n"
+    msg_intro_06= '[B] Number of prefix types in SECOND text file :' + str(ntypes_prefix2) + "\r\n"
+    msg_intro_07= '[C] Number of suffix types in FIRST text file :' + str(ntypes_suffix1) + "\r\n"
+    msg_intro_08= '[D] Number of suffix types in SECOND text file :' + str(ntypes_suffix2) + "\r\n"
+    msg_intro_10= 'Shared prefixes between samples 1 and 2: ' + "\r\n" + str(c.vocabulary.prefixes.tolist()) + "\r\n"
+    msg_intro_11= 'Shared sufffixes between samples 1 and 2: '  + "\r\n" + str(c.vocabulary.suffixes.tolist()) + "\r\n"
+    msg_intro_12 = "After filtering Sample 1 with the lexical items of Sample 2, the number of tokens of Sample 1 is now " + str(ntokens1f) + "\r\n"
+    msg_intro_13 = "After filtering Sample 2 with the lexical items of Sample 1, the number of tokens of Sample 2 is now " + str(ntokens2f) + "\r\n"
+    msg_intro_14 = 'Number of tokens in sample extracted from ' + msgtkn2 + ': ' + msgtkn3 + "\r\n"
+    msg_intro_15= '[E] Number of prefix types in sample extracted from ' + msgtkn2 + ': ' + str(ntypes_prefix3) + "\r\n"
+    msg_intro_16= '[F] Number of suffix types in sample extracted from ' + msgtkn2 + ': ' + str(ntypes_suffix3) + "\r\n"
+    msg_intro_17= ''
+    if c.mode == "montecarlo":
+        msg_intro_17= 'Seed used for the random samples (--seed): ' + str(c.sample3.seed) + "\r\n"
+    if c.sample3.sampler not in (None, "tokens"):
+        msg_intro_17 += 'Random samples drawn with --sampler ' + c.sample3.sampler + "\r\n"
+    if c.sample3.precision is not None:
+        msg_intro_17 += ('Iterations run to reach a standard error of ' + format(c.sample3.precision, 'g') + ' (--precision): ' +
+                         str(c.sample3.iterations) + ('' if c.sample3.converged else ' (all the iterations, the precision was not reached)') + "\r\n" +
+                         'Standard error of CRE in Sample 3: Prefixes ' + str(c.sample3.errors[0]) + ', Suffixes ' + str(c.sample3.errors[1]) + "\r\n" +
+                         'Largest standard error of the CRE of a morpheme in Sample 3: Prefixes ' + str(c.sample3.errors[2]) +
+                         ', Suffixes ' + str(c.sample3.errors[3]) + "\r\n")
+    msg_intro = msg_sep + msg_intro_01 + msg_intro_02 + msg_intro_03 + msg_intro_04 + msg_intro_05 + msg_intro_06 + msg_intro_07 + msg_intro_08 + msg_intro_10 + msg_intro_11 + msg_intro_12 + msg_intro_13 + msg_intro_14 + msg_intro_15 + msg_intro_16 + msg_intro_17 + msg_sep + "\r\n" + "\r\n"
+
+    msg_TRI_01= 'These are the values of Triteness [TRI] before controlling for anything:'
+    msg_TRI_02='(1a) TRI Prefixes in Sample 1= ' + str(TRI_Pre_1) + "\r\n"
+    msg_TRI_03='     Number of Prefixes in Sample 1 used with just one Suffix = ' + str(count_Tri_Pre_1) + ' out of ' + str(ntypes_prefix1) + "\r\n"
+    msg_TRI_04='     Percentage of Prefixes in Sample 1 used with just one Suffix = ' + str("{:.2f}".format(TRI_Pre_1_percent)) + "\r\n"
+    msg_TRI_05='(1b) TRI Suffixes in Sample 1= ' + str(TRI_Suf_1) + "\r\n"
+    msg_TRI_06='     Number of Suffixes in Sample 1 used with just one Prefix = ' + str(count_Tri_Suf_1) + ' out of ' + str(ntypes_suffix1) + "\r\n"
+    msg_TRI_07='     Percentage of Suffixes in Sample 1 used with just one Prefix = ' + str("{:.2f}".format(TRI_Suf_1_percent)) + "\r\n"
+    msg_TRI_08='(2a) TRI Prefixes in Sample 2= ' + str(TRI_Pre_2) + "\r\n"
+    msg_TRI_10='     Percentage of Prefixes in Sample 2 used with just one Suffix = ' + str("{:.2f}".format(TRI_Pre_2_percent)) + "\r\n"
+    msg_TRI_11='(2b) TRI Suffixes in Sample 2= ' + str(TRI_Suf_2) + "\r\n"
+    msg_TRI_12='     Number of Suffixes in Sample 2 used with just one Prefix = ' + str(count_Tri_Suf_2) + ' out of ' + str(ntypes_suffix2) + "\r\n"
+    msg_TRI_13='     Percentage of Suffixes in Sample 2 used with just one Prefix = ' + str("{:.2f}".format(TRI_Suf_2_percent)) + "\r\n"
+    msg_TRI_14= 'These are the values of Triteness [TRI] after controlling for vocabulary:' + "\r\n"
+    msg_TRI_15='(1a) TRI Prefixes in Sample 1= ' + str(TRI_Pre_1b) + "\r\n"
+    msg_TRI_16='     Number of Prefixes in Sample 1 used with just one Suffix = ' + str(count_Tri_Pre_1b) + ' out of ' + str(nFILT_pref_1) + "\r\n"
+    msg_TRI_17='     Percentage of Prefixes in Sample 1 used with just one Suffix = ' + str("{:.2f}".format(TRI_Pre_1b_percent)) + "\r\n"
+    msg_TRI_18='(1b) TRI Suffixes in Sample 1= ' + str(TRI_Suf_1b) + "\r\n"
+    msg_TRI_19='     Number of Suffixes in Sample 1 used with just one Prefix = ' + str(count_Tri_Suf_1b) + ' out of ' + str(nFILT_suff_1) + "\r\n"
+    msg_TRI_20='     Percentage of Suffixes in Sample 1 used with just one Prefix = ' + str("{:.2f}".format(TRI_Suf_1b_percent)) + "\r\n"
+    msg_TRI_21='(2a) TRI Prefixes in Sample 2= ' + str(TRI_Pre_2b) + "\r\n"
+    msg_TRI_22='     Number of Prefixes in Sample 1 used with just one Suffix = ' + str(count_Tri_Pre_2b) + ' out of ' + str(nFILT_pref_2) + "\r\n"
+    msg_TRI_23='     Percentage of Prefixes in Sample 2 used with just one Suffix = ' + str("{:.2f}".format(TRI_Pre_2b_percent)) + "\r\n"
+    msg_TRI_24='(2b) TRI Suffixes in Sample 2= ' + str(TRI_Suf_2b) + "\r\n"
+    msg_TRI_25='     Number of Suffixes in Sample 2 used with just one Prefix = ' + str(count_Tri_Suf_2b) + ' out of ' + str(nFILT_suff_2) + "\r\n"
+    msg_TRI_26='     Percentage of Suffixes in Sample 2 used with just one Prefix = ' + str("{:.2f}".format(TRI_Suf_2b_percent)) + "\r\n"
+    msg_TRI_27= 'These are the values of Triteness [TRI] after controlling for vocabulary:' + "\r\n"
+    msg_TRI_28= 'These are the values of Triteness [TRI] after controlling for vocabulary and sample size:' + "\r\n"
+    msg_TRI_29='(3a) TRI Prefixes in Sample 3= ' + str(TRI_Pre_3) + "\r\n"
+    # in the exact mode, both numbers of Sample 3 are the expected numbers for the random samples of {04}
+    count_Tri_3 = '' if c.mode == 'montecarlo' else ' (expected number)'
+    msg_TRI_30='     Number of Prefixes in Sample 3 used with just one Suffix' + count_Tri_3 + ' = ' + str(count_Tri_Pre_3) + ' out of ' + str(ntypes_prefix3) + "\r\n"
+    msg_TRI_31='     Percentage of Prefixes in Sample 3 used with just one Suffix = ' + str("{:.2f}".format(TRI_Pre_3_percent)) + "\r\n"
+    msg_TRI_32='(3b) TRI Suffixes in Sample 3= ' + str(TRI_Suf_3) + "\r\n"
+    msg_TRI_33='     Number of Suffixes in Sample 3 used with just one Prefix' + count_Tri_3 + ' = ' + str(count_Tri_Suf_3) + ' out of ' + str(ntypes_suffix3) + "\r\n"
+    msg_TRI_34='     Percentage of Suffixes in Sample 3 used with just one Prefix = ' + str("{:.2f}".format(TRI_Suf_3_percent)) + "\r\n"
+    msg_TRI = msg_sep + msg_TRI_01 + msg_TRI_02 + msg_TRI_03 + msg_TRI_04 + msg_TRI_05 + msg_TRI_06 + msg_TRI_07 + msg_TRI_08 + msg_TRI_10 + msg_TRI_11 + msg_TRI_12 + msg_TRI_13 + msg_TRI_14 + msg_TRI_15 + msg_TRI_16 + msg_TRI_17 + msg_TRI_18 + msg_TRI_19 + msg_TRI_20 + msg_TRI_21 + msg_TRI_22 + msg_TRI_23 + msg_TRI_24 + msg_TRI_25 + msg_TRI_26 + msg_TRI_27 + msg_TRI_28 + msg_TRI_29 + msg_TRI_30 + msg_TRI_31 + msg_TRI_32 + msg_TRI_33 + msg_TRI_34 + msg_sep + "\r\n" + "\r\n"
+
+    msg_CRE_01= 'These are the values of Creativity [CRE] before controlling for anything:' + "\r\n"
+    msg_CRE_02='(1a) CRE Prefixes in Sample 1= ' + str(CRE_Pre_Value_1) + "\r\n"
+    msg_CRE_03='(1b) CRE Suffixes in Sample 1= ' + str(CRE_Suf_Value_1) + "\r\n"
+    msg_CRE_04='(2a) CRE Prefixes in Sample 2= ' + str(CRE_Pre_Value_2) + "\r\n"
+    msg_CRE_05='(2b) CRE Suffixes in Sample 2= ' + str(CRE_Suf_Value_2) + "\r\n"
+    msg_CRE_06= 'These are the values of Creativity [CRE] after controlling for vocabulary:' + "\r\n"
+    msg_CRE_07='(1a) CRE Prefixes in Sample 1= ' + str(CRE_Pre_FILT_Value_1) + "\r\n"
+    msg_CRE_08='(1b) CRE Suffixes in Sample 1= ' + str(CRE_Suf_FILT_Value_1) + "\r\n"
+    msg_CRE_09='(2a) CRE Prefixes in Sample 2= ' + str(CRE_Pre_FILT_Value_2) + "\r\n"
+    msg_CRE_10='(2b) CRE Suffixes in Sample 2= ' + str(CRE_Suf_FILT_Value_2) + "\r\n"
+    msg_CRE_11= 'These are the values of Creativity [CRE] after controlling for sample size and vocabulary:' + "\r\n"
+    msg_CRE_12='(3a) CRE Prefixes in Sample 3= ' + str(CRE_Pre_Value_3) + "\r\n"
+    msg_CRE_13='(3b) CRE Suffixes in Sample 3= ' + str(CRE_Suf_Value_3) + "\r\n"
+    msg_CRE = msg_sep + msg_CRE_01 + msg_CRE_02 + msg_CRE_03 + msg_CRE_04 + msg_CRE_05 + msg_CRE_06 + msg_CRE_07 + msg_CRE_08 +  msg_CRE_09 + msg_CRE_10 + msg_CRE_11 + msg_CRE_12 + msg_CRE_13 + msg_sep + "\r\n" + "\r\n"
+
+    # {05.e} Bayesian estimation of the differences of CRE, when requested with --best
+    if c.best is not None:
+        Summary = c.best.Table[c.best.Table.Parameter.isin(['mu2-mu1', 'effect_size'])]
+        msg_CRE += (msg_sep + 'Bayesian estimation (BEST) of the differences of CRE between the samples (' + str(c.best.chains) +
+                    ' chains of ' + str(c.best.draws) + ' draws, seed ' + str(c.best.seed) + '), see best_summary.csv:' + "\r\n" +
+                    Summary.to_string(index=False) + "\r\n" + msg_sep + "\r\n" + "\r\n")
+    # {05.d} Tests of the difference between the samples, when requested with --tests
+    if c.tests is not None:
+        msg_CRE += (msg_sep + 'Difference (Sample 2 - Sample 1) after controlling for vocabulary: permutation test and ' +
+                    format(100 * c.tests.confidence, 'g') + '% basic bootstrap interval (' + str(c.tests.replicates) +
+                    ' replicates, seed ' + str(c.tests.seed) + '):' + "\r\n" + c.tests.Table.to_string(index=False) + "\r\n" +
+                    msg_sep + "\r\n" + "\r\n")
+
+    # Appendices: List of types and Creativity values
+    msg_APPEND_01 = 'List of prefix types in the FIRST file with values of CRE: ' + "\r\n" + str(CRE_Pre_Table_1) + "\r\n"
+    msg_APPEND_02 = 'List of suffix types in the FIRST file with values of CRE: ' + "\r\n" + str(CRE_Suf_Table_1) + "\r\n"
+    msg_APPEND_03 = 'List of prefix types in the SECOND file with values of CRE: ' + "\r\n" + str(CRE_Pre_Table_2) + "\r\n"
+    msg_APPEND_04 = 'List of suffix types in the SECOND file with values of CRE: ' + "\r\n" + str(CRE_Suf_Table_2) + "\r\n"
+    msg_APPEND_05 = 'List of prefix types in the SET OF RANDOM SAMPLES with MEAN values of CRE: ' + "\r\n" + str(CRE_Pre_Table_3) + "\r\n"
+    msg_APPEND_06 = 'List of suffix types in the SET OF RANDOM SAMPLES with MEAN values of CRE: ' + "\r\n" + str(CRE_Suf_Table_3) + "\r\n"
+    msg_APPEND = "\r\n" + msg_sep + msg_APPEND_01 + "\r\n" + msg_sep + "\r\n" + msg_APPEND_02 + "\r\n" + msg_sep + "\r\n"  + msg_APPEND_03 + "\r\n" + msg_sep + "\r\n"  + msg_APPEND_04 + "\r\n" + msg_sep + "\r\n"  + msg_APPEND_05 + "\r\n" + msg_sep + "\r\n"  + msg_APPEND_06 + "\r\n" + msg_sep + "\r\n"
+
+    return msg_intro + msg_TRI + msg_CRE + msg_APPEND
+
+# All the files of a comparison are written in output_dir:
+# feedback_file.txt, results_creativity.csv, summary_table.csv and (montecarlo) the summaries of the iterations
+# (the tables can also be written as npz, parquet or feather files, see eslipro/outputs.py)
+def write_outputs(comparison, output_dir=".", output_format="csv"):
+    """Write the feedback file and the tables of a Comparison in output_dir."""
+    c = comparison
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'feedback_file.txt'), 'w') as f:
+        f.write(feedback_text(c))
+    #CRE is kept as an integer for Samples 1 and 2 (and as a mean for Sample 3) when the tables are joined
+    tables = [c.cre1.Pre, c.cre1.Suf, c.cre2.Pre, c.cre2.Suf, c.sample3.cre.Pre, c.sample3.cre.Suf]
+    Creativity = pd.concat([table.astype({'CRE': object}) for table in tables], axis=0)
+    write_table(Creativity, output_dir, 'results_creativity', output_format)
+    #The summaries of the iterations only exist when random samples were drawn
+    #(the files with all iterations were already written during {04} when requested with --iterations-out)
+    if c.mode == "montecarlo":
+        write_table(c.sample3.Pre_Stats, output_dir, 'iterations_summary_Prefixes', output_format)
+        write_table(c.sample3.Suf_Stats, output_dir, 'iterations_summary_Suffixes', output_format)
+    write_table(build_results_table(c), output_dir, 'summary_table', output_format, index=True)
+    if c.best is not None:
+        write_best(c.best, output_dir)
+
+
+# The whole analysis of two txt files, from the reading of {00.b} to the files of {7}
+def run_comparison(txtfile1, txtfile2, output_dir=".", mode="montecarlo", numiter=1000, seed=None, workers=1,
+                   iterations_out=False, quantiles=(), normalization="ascii", cache_dir=None, histograms=True,
+                   precision=None, per_morpheme=False, sampler="tokens", tests=0, confidence=0.95, best=False,
+                   profile=None, hook=None, plots=False, output_format="csv", cache_size=None):
+    """Compare two prefix_suffix files and write all the outputs in output_dir; return the Comparison."""
+    # every section is measured, and the section profile (e.g. "04") is profiled with cProfile (see eslipro/instrument.py)
+    report = RunReport(profile, hook)
+    with report.stage("00.b", "data reading") as counts:
+        data1 = load_corpus(txtfile1, normalization, cache_dir, cache_size)
+        data2 = load_corpus(txtfile2, normalization, cache_dir, cache_size)
+        counts.update(tokens=data1.ntokens + data2.ntokens, prefixes=len(data1.prefixes) + len(data2.prefixes),
+                      suffixes=len(data1.suffixes) + len(data2.suffixes),
+                      constructions=data1.nconstructions + data2.nconstructions)
+    iteration_files = None
+    if iterations_out and mode == "montecarlo":
+        os.makedirs(output_dir, exist_ok=True)
+        iteration_files = (output_path(output_dir, 'iterations_Prefixes', output_format),
+                           output_path(output_dir, 'iterations_Suffixes', output_format))
+    # {01}-{05} are taken from the cache of results when the same samples were already compared with the same parameters
+    # (and a seed), so the report of {6} and {7} is written at once (cache_size limits the size of the cache, in bytes)
+    key = comparison = None
+    cached = False
+    if cache_dir is not None and cacheable(mode, seed, iteration_files, tests, best):
+        parameters = dict(normalization=normalization, mode=mode, numiter=numiter, seed=seed,
+                          quantiles=list(quantiles), precision=precision, per_morpheme=per_morpheme, sampler=sampler,
+                          tests=tests, confidence=confidence if tests > 0 else None, best=best)
+        key = result_key(data1, data2, **parameters)
+        comparison = load_result(cache_dir, key, data1, data2, (txtfile1, txtfile2))
+        cached = comparison is not None
+        if cached:
+            print('Results found in the cache (' + key + '): {01}-{05} are not computed again')
+    if comparison is None:
+        comparison = compare(data1, data2, mode=mode, numiter=numiter, seed=seed, workers=workers,
+                             iteration_files=iteration_files, quantiles=quantiles, names=(txtfile1, txtfile2),
+                             precision=precision, per_morpheme=per_morpheme, sampler=sampler, tests=tests,
+                             confidence=confidence, report=report, iteration_format=output_format)
+        if best:
+            # {05.e} with the same master seed as the random samples of {04}
+            with report.stage("05.e", "Bayesian estimation (BEST)") as counts:
+                comparison = comparison._replace(best=best_comparison(comparison, seed if seed is not None else comparison.sample3.seed))
+                counts["chains"] = comparison.best.chains
+        if key is not None:
+            store_result(cache_dir, key, comparison, cache_size, **parameters)
+    # {6} the bins of the histograms are written at once, and the images (plots) are drawn while {7} runs
+    drawing = None
+    if histograms:
+        with report.stage("6", "histograms") as counts:
+            drawing = start_histograms(comparison, output_dir, plots)
+            counts["images"] = plots
+    with report.stage("7", "feedback file and tables"):
+        write_outputs(comparison, output_dir, output_format)
+    if drawing is not None:
+        with report.stage("6.b", "images of the histograms"):
+            drawing.join()
+        if drawing.exitcode != 0:
+            print('The images of the histograms could not be drawn (is matplotlib installed?)')
+    # the manifest of the run is written next to summary_table.csv, and its summary is the last line of feedback_file.txt
+    write_manifest(report, output_dir, files=[txtfile1, txtfile2], mode=mode, iterations=numiter, seed=comparison.sample3.seed,
+                   workers=workers, sampler=sampler, precision=precision, tests=tests, best=best, normalization=normalization,
+                   output_format=output_format, cached=cached, cache_key=key)
+    with open(os.path.join(output_dir, 'feedback_file.txt'), 'a') as f:
+        f.write(report.summary() + "\r\n")
+    return comparison
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Batch mode: comparisons of every pair of samples in a directory (and of every sample with a reference sample)
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# Batch mode: all the pairs of a directory of samples
+# =============================================================================
+
+# Import os.path to find the samples of the directory and write the outputs
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import multiprocessing to compare several pairs at the same time
+# https://docs.python.org/3/library/multiprocessing.html
+import multiprocessing as mp
+# import itertools to list the pairs of samples
+# https://docs.python.org/3/library/itertools.html
+import itertools
+
+from .corpus import load_corpus
+from .cre import CREResult, compute_cre, cre_summary
+from .analysis import EqualSamplesError, build_results_table, compare
+from .resampling import derived_seed
+from .memo import cacheable, load_result, result_key, store_result
+
+
+# Every sample of the directory is read (or opened from the cache) only once, and its CRE and TRI ({01}/{02}) are
+# computed only once too: every pair only computes the vocabulary control ({03}) and Sample 3 ({04})
+def load_directory(directory, normalization="ascii", cache_dir=None, extension=".txt", cache_size=None):
+    """Return a dict with the Corpus of every file of a directory with the given extension (by file name)."""
+    names = sorted(name for name in os.listdir(directory)
+                   if name.endswith(extension) and os.path.isfile(os.path.join(directory, name)))
+    return {name: load_corpus(os.path.join(directory, name), normalization, cache_dir, cache_size) for name in names}
+
+def sample_summary(corpora, cres):
+    """Return a table with the tokens, types, CRE and TRI of every sample before any control ({01}/{02})."""
+    rows = []
+    for name, corpus in corpora.items():
+        for analysis, table, count_Tri, ntypes in (('Prefix/Suffix', cres[name].Pre, cres[name].count_Tri_Pre, len(corpus.suffixes)),
+                                                   ('Suffix/Prefix', cres[name].Suf, cres[name].count_Tri_Suf, len(corpus.prefixes))):
+            CRE, sd, ntypes_table, TRI, TRI_percent = cre_summary(table, count_Tri)
+            rows.append([name, analysis, CRE, sd, corpus.ntokens, ntypes, TRI, TRI_percent])
+    return pd.DataFrame(rows, columns=['Name', 'Analysis', 'CRE', 'sd', 'Tokens', 'Types', 'TRI', 'TRI%'])
+
+# The pairs are every two samples of the directory (all_pairs) and/or every sample against the reference sample
+# A pair is compared only once, whatever the order of its samples (the first one is kept)
+def batch_pairs(names, reference=None, all_pairs=True):
+    """Return the list of (name1, name2) pairs to compare."""
+    pairs = list(itertools.combinations(names, 2)) if all_pairs else []
+    if reference is not None:
+        pairs += [(name, reference) for name in names if name != reference]
+    unique = {}
+    for pair in pairs:
+        unique.setdefault(frozenset(pair), pair)
+    return list(unique.values())
+
+# A Corpus keeps the number 1 or 2 of the sample in its CRE tables, so the CREResult computed once is relabelled
+def as_sample(cre, sample):
+    """Return a CREResult with the column 'Sample' of its tables set to sample."""
+    return CREResult(cre.Pre.assign(Sample=sample), cre.Suf.assign(Sample=sample), cre.count_Tri_Pre, cre.count_Tri_Suf)
+
+# Every pair gives the ten rows of the ResultsTable (summary_table.csv), preceded by the names of both samples, the seed
+# of the pair and its Status: "compared", or "equal sizes" (one row without results) when both samples have the same
+# number of tokens after the vocabulary control, so that nothing can be compared (see EqualSamplesError)
+# With a cache directory, the Comparison of a pair already compared (same contents, parameters and seed of the pair) is
+# taken from the cache of results (see eslipro/memo.py), so adding a sample to a batch only computes its new pairs
+def compare_pair(corpora, cres, name1, name2, mode, numiter, seed, sampler="tokens", cache_dir=None, cache_size=None):
+    """Return the rows of the ResultsTable of the pair (name1, name2), or one "equal sizes" row if both have the same size."""
+    key = comparison = None
+    if cache_dir is not None:
+        parameters = dict(mode=mode, numiter=numiter, seed=seed, sampler=sampler)
+        key = result_key(corpora[name1], corpora[name2], **parameters)
+        comparison = load_result(cache_dir, key, corpora[name1], corpora[name2], (name1, name2))
+    if comparison is None:
+        try:
+            comparison = compare(corpora[name1], corpora[name2], mode=mode, numiter=numiter, seed=seed,
+                                 names=(name1, name2), cre1=as_sample(cres[name1], 1), cre2=as_sample(cres[name2], 2),
+                                 progress=False, sampler=sampler)
+        except EqualSamplesError:
+            return pd.DataFrame({'Sample1': [name1], 'Sample2': [name2], 'Seed': [seed], 'Status': ['equal sizes']})
+        if key is not None:
+            store_result(cache_dir, key, comparison, cache_size, **parameters)
+    ResultsTable = build_results_table(comparison)
+    ResultsTable.insert(0, 'Status', 'compared')
+    ResultsTable.insert(0, 'Seed', comparison.sample3.seed)
+    ResultsTable.insert(0, 'Sample2', name2)
+    ResultsTable.insert(0, 'Sample1', name1)
+    return ResultsTable
+
+# The workers receive the samples and their CRE once, when they start, and then compare one pair per task
+batch_state = {}
+
+def attach_batch(corpora, cres, mode, numiter, sampler="tokens", cache_dir=None, cache_size=None):
+    """Initializer of every worker: keep the samples, their CRE and the parameters of the comparisons."""
+    batch_state.update(corpora=corpora, cres=cres, mode=mode, numiter=numiter, sampler=sampler, cache_dir=cache_dir,
+                       cache_size=cache_size)
+
+def batch_task(task):
+    """Compare the pair task = (name1, name2, seed) in a worker."""
+    name1, name2, seed = task
+    return compare_pair(batch_state["corpora"], batch_state["cres"], name1, name2,
+                        batch_state["mode"], batch_state["numiter"], seed, batch_state["sampler"],
+                        batch_state["cache_dir"], batch_state["cache_size"])
+
+def run_batch(corpora, pairs, mode="montecarlo", numiter=1000, seed=None, workers=1, sampler="tokens", cache_dir=None,
+              cache_size=None):
+    """Return the long table with the ResultsTable rows of every pair, and the table of every sample ({01}/{02})."""
+    cres = {name: compute_cre(corpus, 1) for name, corpus in corpora.items()}
+    entropy = np.random.SeedSequence(seed).entropy
+    # without a master seed, the seeds of the pairs are new in every batch, so their results are not kept in the cache
+    if not cacheable(mode, seed):
+        cache_dir = None
+    # the seed of a pair depends on the master seed and on the names of both samples, and not on the order of the pairs,
+    # so a pair gives the same results in any batch (and can be run again alone with --seed)
+    tasks = [(name1, name2, derived_seed(entropy, name1, name2)) for name1, name2 in pairs]
+    results = []
+    if workers <= 1:
+        for number, task in enumerate(tasks, 1):
+            name1, name2, pair_seed_value = task
+            results.append(compare_pair(corpora, cres, name1, name2, mode, numiter, pair_seed_value, sampler, cache_dir, cache_size))
+            print('pair: ' + str(number) + ' of ' + str(len(tasks)))
+    else:
+        with mp.get_context().Pool(workers, initializer=attach_batch,
+                                   initargs=(corpora, cres, mode, numiter, sampler, cache_dir, cache_size)) as pool:
+            # imap returns the pairs in the order of the tasks, whatever the worker that finished first
+            for number, result in enumerate(pool.imap(batch_task, tasks, chunksize=max(1, len(tasks) // (8 * workers))), 1):
+                results.append(result)
+                print('pair: ' + str(number) + ' of ' + str(len(tasks)))
+    Long = (pd.concat(results, axis=0, ignore_index=True) if results
+            else pd.DataFrame(columns=['Sample1', 'Sample2', 'Seed', 'Status']))
+    return Long, sample_summary(corpora, cres), entropy
+
+# The summary matrices have one row and one column per sample: the cell (A, B) is the value of A after controlling for
+# vocabulary and sample size in the comparison with B (the lexical value of the smallest sample, and Sample 3 for the
+# largest one), so every row can be read as the productivity of a sample against every other one
+def summary_matrices(Long, names):
+    """Return a dict of matrices (CRE and TRI of prefixes and suffixes) of every sample against every other one."""
+    matrices = {}
+    for analysis, position in (('Prefix/Suffix', 'Prefix'), ('Suffix/Prefix', 'Suffix')):
+        for value in ('CRE', 'TRI'):
+            matrices[value + '_' + position] = pd.DataFrame(np.nan, index=list(names), columns=list(names))
+    # the pairs that could not be compared (equal sizes) have no value: their cells stay empty
+    for (name1, name2), rows in Long[Long.Status == 'compared'].groupby(['Sample1', 'Sample2'], sort=False):
+        lexical = rows[rows.Control == 'Lexical']
+        both = rows[rows.Control == 'Both']
+        # the smallest sample after the vocabulary control keeps its lexical values, and the largest one gets Sample 3
+        tokens1 = lexical[lexical.Sample == 1].Tokens.iloc[0]
+        tokens2 = lexical[lexical.Sample == 2].Tokens.iloc[0]
+        small, large, small_sample = (name1, name2, 1) if tokens1 < tokens2 else (name2, name1, 2)
+        for analysis, position in (('Prefix/Suffix', 'Prefix'), ('Suffix/Prefix', 'Suffix')):
+            small_row = lexical[(lexical.Sample == small_sample) & (lexical.Analysis == analysis)].iloc[0]
+            large_row = both[both.Analysis == analysis].iloc[0]
+            for value in ('CRE', 'TRI'):
+                matrices[value + '_' + position].loc[small, large] = small_row[value]
+                matrices[value + '_' + position].loc[large, small] = large_row[value]
+    return matrices
+
+def write_batch(Long, Samples, matrices, output_dir="."):
+    """Write the long table, the table of every sample and the summary matrices of a batch in output_dir."""
+    os.makedirs(output_dir, exist_ok=True)
+    Long.to_csv(os.path.join(output_dir, 'batch_results.csv'), header=True, index=False)
+    Samples.to_csv(os.path.join(output_dir, 'batch_samples.csv'), header=True, index=False)
+    for name, matrix in matrices.items():
+        matrix.to_csv(os.path.join(output_dir, 'batch_matrix_' + name + '.csv'))
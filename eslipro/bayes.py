@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+{05.e} Bayesian estimation of the differences of CRE between the samples (BEST, Kruschke 2013), computed with NumPy
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# {05.e} Bayesian estimation (BEST) of the differences of CRE
+# =============================================================================
+
+# Import os.path to write the outputs in the output directory
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import the log-gamma function of SciPy for the density of the t distribution
+# https://docs.scipy.org/doc/scipy/reference/special.html
+from scipy.special import gammaln
+# import namedtuple to keep the table of the posterior summaries with its parameters
+# https://docs.python.org/3/library/collections.html
+from collections import namedtuple
+
+
+# The model of BEST (Bayesian estimation supersedes the t test): the CRE values of the morphemes of every group follow a
+# t distribution with their own mean (mu) and scale (sigma), and a common normality parameter (nu)
+# The priors are the broad priors of Kruschke (2013), set from the pooled data: mu ~ Normal(mean, (1000 sd)^2),
+# sigma ~ Uniform(sd / 1000, 1000 sd) and nu - 1 ~ Exponential(mean 29)
+# The parameters of a chain are (mu1, mu2, log sigma1, log sigma2, log(nu - 1)), so every proposal is valid
+# Many morphemes have the same CRE, so every group is given as its distinct values and the number of morphemes of each
+def log_posterior(theta, y1, y2, M, S):
+    """Return the log posterior (up to a constant) of an array of parameters (chains x 5) for the (values, counts) y1 and y2."""
+    mu1, mu2, log_sigma1, log_sigma2, log_nu1 = theta.T
+    nu = 1 + np.exp(log_nu1)
+    logp = -0.5 * ((mu1 - M) / (1000 * S)) ** 2 - 0.5 * ((mu2 - M) / (1000 * S)) ** 2
+    # uniform prior on sigma, with the Jacobian of log sigma, and exponential prior on nu - 1 with the Jacobian of log(nu - 1)
+    logp += log_sigma1 + log_sigma2 + log_nu1 - (nu - 1) / 29
+    outside = (np.abs(log_sigma1 - np.log(S)) > np.log(1000)) | (np.abs(log_sigma2 - np.log(S)) > np.log(1000))
+    constant = gammaln((nu + 1) / 2) - gammaln(nu / 2) - 0.5 * np.log(nu * np.pi)
+    for (values, counts), mu, log_sigma in ((y1, mu1, log_sigma1), (y2, mu2, log_sigma2)):
+        z = (values[None, :] - mu[:, None]) / np.exp(log_sigma)[:, None]
+        logp += counts.sum() * (constant - log_sigma) - (nu + 1) / 2 * (counts * np.log1p(z * z / nu[:, None])).sum(axis=1)
+    return np.where(outside, -np.inf, logp)
+
+# All the chains are moved at once (random-walk Metropolis): the log posterior of every chain is one row of array operations
+# During the warm-up, the size of the steps is adapted to accept about a quarter of the proposals, and the proposals then
+# follow the covariance of the parameters found in the warm-up (so correlated parameters are explored as fast as the others)
+def metropolis(y1, y2, rng, chains=16, warmup=1000, draws=1000):
+    """Return an array (draws x chains x 5) of draws of the posterior of (mu1, mu2, log sigma1, log sigma2, log(nu - 1))."""
+    pooled = np.concatenate([y1, y2])
+    M = pooled.mean()
+    S = pooled.std() if pooled.std() > 0 else 1.0
+    start = np.array([y1.mean(), y2.mean(), np.log(max(y1.std(), S / 100)), np.log(max(y2.std(), S / 100)), np.log(29)])
+    scale = np.array([S / np.sqrt(len(y1)), S / np.sqrt(len(y2)), 0.1, 0.1, 0.5])
+    y1, y2 = np.unique(y1, return_counts=True), np.unique(y2, return_counts=True)
+    theta = start + 0.1 * scale * rng.standard_normal((chains, 5))
+    logp = log_posterior(theta, y1, y2, M, S)
+    step = np.full(chains, 0.5)
+    cholesky = np.diag(scale)
+    kept = []
+    for iteration in range(2 * warmup + draws):
+        if iteration == warmup:
+            # the second half of the warm-up uses the covariance of the first half
+            history = np.concatenate(kept[warmup // 2:])
+            cholesky = np.linalg.cholesky(np.cov(history.T) + 1e-12 * np.eye(5))
+            step[:] = 2.38 / np.sqrt(5)
+        if iteration == 2 * warmup:
+            kept = []
+        proposal = theta + step[:, None] * rng.standard_normal((chains, 5)) @ cholesky.T
+        logp_proposal = log_posterior(proposal, y1, y2, M, S)
+        accept = np.log(rng.random(chains)) < logp_proposal - logp
+        theta = np.where(accept[:, None], proposal, theta)
+        logp = np.where(accept, logp_proposal, logp)
+        if iteration < 2 * warmup:
+            step *= np.exp(0.05 * (accept - 0.25))
+        kept.append(theta)
+    return np.stack(kept)
+
+# The posterior of every quantity is summarised by its mean, sd and 95% highest density interval (HDI),
+# and for the differences by the probability that they are above 0
+def hdi(values, mass=0.95):
+    """Return the narrowest interval with a proportion mass of the values."""
+    values = np.sort(values)
+    width = int(np.ceil(mass * len(values)))
+    lows = values[:len(values) - width + 1]
+    highs = values[width - 1:]
+    narrowest = np.argmin(highs - lows)
+    return lows[narrowest], highs[narrowest]
+
+# Rhat compares the variance within and between the chains (Gelman and Rubin): values near 1 mean that all the chains
+# found the same posterior
+def rhat(values):
+    """Return the potential scale reduction factor of an array of draws (draws x chains)."""
+    ndraws = len(values)
+    within = values.var(axis=0, ddof=1).mean()
+    between = ndraws * values.mean(axis=0).var(ddof=1)
+    if within == 0:
+        return np.nan
+    return np.sqrt(((ndraws - 1) / ndraws * within + between / ndraws) / within)
+
+def best(y1, y2, rng, chains=16, warmup=1000, draws=1000):
+    """Return a table with the posterior summary of the means, scales, nu, difference of means and of scales, and effect size."""
+    y1 = np.asarray(y1, dtype=float)
+    y2 = np.asarray(y2, dtype=float)
+    mu1, mu2, log_sigma1, log_sigma2, log_nu1 = np.moveaxis(metropolis(y1, y2, rng, chains, warmup, draws), 2, 0)
+    sigma1, sigma2 = np.exp(log_sigma1), np.exp(log_sigma2)
+    quantities = {"mu1": mu1, "mu2": mu2, "sigma1": sigma1, "sigma2": sigma2, "nu": 1 + np.exp(log_nu1),
+                  "mu2-mu1": mu2 - mu1, "sigma2-sigma1": sigma2 - sigma1,
+                  "effect_size": (mu2 - mu1) / np.sqrt((sigma1 ** 2 + sigma2 ** 2) / 2)}
+    rows = []
+    for parameter, values in quantities.items():
+        low, high = hdi(values.ravel())
+        rows.append([parameter, values.mean(), values.std(), low, high,
+                     (values > 0).mean() if parameter in ("mu2-mu1", "sigma2-sigma1", "effect_size") else np.nan, rhat(values)])
+    return pd.DataFrame(rows, columns=['Parameter', 'Mean', 'sd', 'HDI_low', 'HDI_high', 'P(>0)', 'Rhat'])
+
+# The CRE of every morpheme of Samples 1 and 2 (before any control) and of Sample 3 (mean of the iterations) are the data
+# of results_creativity.csv: every pair of samples is compared for prefixes and for suffixes
+BayesianComparison = namedtuple("BayesianComparison", ["Table", "seed", "chains", "draws"])
+
+def best_comparison(comparison, seed=None, chains=16, warmup=1000, draws=1000):
+    """Return the BayesianComparison (posterior summaries of BEST) of every pair of Samples 1, 2 and 3, prefixes and suffixes."""
+    c = comparison
+    samples = {1: c.cre1, 2: c.cre2, 3: c.sample3.cre}
+    tables = []
+    entropy = np.random.SeedSequence(seed).entropy
+    for number, (first, second) in enumerate(((1, 2), (1, 3), (2, 3))):
+        for position, name in (("Pre", "Prefix"), ("Suf", "Suffix")):
+            # every analysis has its own random generator, so its results do not depend on the other analyses
+            rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(number, position == "Suf")))
+            y1 = getattr(samples[first], position).CRE.to_numpy(dtype=float)
+            y2 = getattr(samples[second], position).CRE.to_numpy(dtype=float)
+            if len(y1) < 2 or len(y2) < 2:
+                continue
+            Table = best(y1, y2, rng, chains, warmup, draws)
+            Table.insert(0, 'Sample2', second)
+            Table.insert(0, 'Sample1', first)
+            Table.insert(0, 'Position', name)
+            tables.append(Table)
+    Table = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=['Position', 'Sample1', 'Sample2', 'Parameter'])
+    return BayesianComparison(Table, entropy, chains, draws)
+
+def write_best(Best, output_dir="."):
+    """Write the posterior summaries of a BayesianComparison (best_summary.csv) in output_dir."""
+    os.makedirs(output_dir, exist_ok=True)
+    Best.Table.to_csv(os.path.join(output_dir, 'best_summary.csv'), header=True, index=False)
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks: synthetic Zipfian prefix_suffix samples and the time and memory of every stage of the comparison
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# Benchmarks of the stages {00.b}-{7}
+# =============================================================================
+
+# Import os.path to write the samples and the results in the output directory
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import time to measure the wall time of every stage and to date the results
+# https://docs.python.org/3/library/time.html
+import time
+# import platform and subprocess to label the results with the Python version and the commit of the code
+# https://docs.python.org/3/library/platform.html
+# https://docs.python.org/3/library/subprocess.html
+import platform
+import subprocess
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+
+from .corpus import read_corpus
+from .cre import compute_cre
+from .vocabulary import shared_vocabulary, vocabulary_filter
+from .analysis import Comparison, resample, build_results_table, write_outputs
+from .instrument import peak_rss, reset_peak_rss
+
+
+# {B.a} Synthetic samples
+# Prefixes and suffixes are drawn independently with Zipfian frequencies (the morpheme of rank r has a frequency
+# proportional to 1 / r^exponent), so a few constructions are very frequent and most of them are rare, as in real samples
+# Every morpheme is written with the same number of characters (p0000012, s0003), so the lines of a whole block of
+# tokens are written at once as a matrix of bytes
+def zipf_ranks(rng, size, ntypes, exponent):
+    """Return size random ranks (0 to ntypes - 1) with Zipfian probabilities."""
+    weights = 1.0 / np.arange(1, ntypes + 1) ** exponent
+    return np.searchsorted(np.cumsum(weights / weights.sum()), rng.random(size), side="right").clip(0, ntypes - 1)
+
+def morpheme_bytes(letter, ids, width):
+    """Return a matrix of bytes (len(ids) x (width + 1)) with the morphemes letter + id, written with width digits."""
+    digits = (ids[:, None] // 10 ** np.arange(width - 1, -1, -1)) % 10
+    return np.column_stack([np.full(len(ids), ord(letter)), ord("0") + digits]).astype(np.uint8)
+
+# The vocabulary of the second sample is the same as the one of the first for its most frequent ranks (a proportion
+# overlap of the ranks), and new morphemes for the rest, so the vocabulary control of {03} removes the rare ones
+def synthetic_sample(txtfile, ntokens, nprefixes, nsuffixes, rng, exponent=1.0, shift=(0, 0), shared=None, block=1 << 20):
+    """Write a synthetic sample of ntokens prefix_suffix lines; ranks beyond shared are moved by shift."""
+    pre_width = len(str(nprefixes + shift[0]))
+    suf_width = len(str(nsuffixes + shift[1]))
+    with open(txtfile, "wb") as f:
+        for start in range(0, ntokens, block):
+            size = min(block, ntokens - start)
+            columns = []
+            for (letter, ntypes, width), move, limit in zip((("p", nprefixes, pre_width), ("s", nsuffixes, suf_width)),
+                                                            shift, shared or (None, None)):
+                ids = zipf_ranks(rng, size, ntypes, exponent)
+                if limit is not None:
+                    ids = np.where(ids < limit, ids, ids + move)
+                columns.append(morpheme_bytes(letter, ids, width))
+            lines = np.column_stack([columns[0], np.full(size, ord("_"), dtype=np.uint8), columns[1],
+                                     np.full(size, ord("\n"), dtype=np.uint8)])
+            f.write(lines.tobytes())
+
+# Real vocabularies grow with the size of the sample, so by default the number of prefixes grows as its square root
+# (and there are ten times fewer suffixes)
+def synthetic_pair(directory, ntokens, ratio=2.0, overlap=0.8, exponent=1.0, nprefixes=None, nsuffixes=None, seed=None):
+    """Write two synthetic samples (a.txt with ntokens, b.txt with ratio * ntokens tokens) in directory; return their paths."""
+    if nprefixes is None:
+        nprefixes = max(10, int(2 * np.sqrt(ntokens)))
+    if nsuffixes is None:
+        nsuffixes = max(5, nprefixes // 10)
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    txtfile1 = os.path.join(directory, "a.txt")
+    txtfile2 = os.path.join(directory, "b.txt")
+    synthetic_sample(txtfile1, ntokens, nprefixes, nsuffixes, rng, exponent)
+    shared = (int(round(overlap * nprefixes)), int(round(overlap * nsuffixes)))
+    shift = (nprefixes - shared[0], nsuffixes - shared[1])
+    synthetic_sample(txtfile2, max(1, int(round(ratio * ntokens))), nprefixes, nsuffixes, rng, exponent, shift, shared)
+    return txtfile1, txtfile2
+
+
+# {B.b} Time and memory of every stage
+# The memory is the peak resident memory (RSS) of the process, as in run_manifest.json (see eslipro/instrument.py), so it
+# includes the buffers of Numpy and SciPy and the pages of memory-mapped files that were read. On Linux the peak is set
+# back before every stage, so PeakRSSMB is the peak of that stage (with what was already in memory before it); elsewhere
+# it is the peak of the process until the end of the stage. The worker processes of {04} are counted apart
+# (WorkersPeakRSSMB: the largest peak of a worker that has finished, since the start of the process)
+class StageTimer:
+    """Measure the wall time and the peak resident memory of the stages of a run."""
+
+    def __init__(self):
+        self.rows = []
+
+    def run(self, stage, function, *args, **kwargs):
+        """Run function(*args, **kwargs) as the stage; return its result."""
+        reset_peak_rss()
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        self.rows.append((stage, seconds, peak_rss(), peak_rss(children=True)))
+        return result
+
+# The stages of compare() and run_comparison() are run one by one: the sample size control of {04} uses the random
+# samples (or the exact compute), and {7} writes all the tables and the feedback file (without the histograms of {6})
+# With a token_limit, the sampler "tokens" is replaced by "counts" when the sample reduced in {04} has more tokens
+def benchmark_stages(txtfile1, txtfile2, output_dir, mode="montecarlo", numiter=100, seed=None, sampler="tokens", workers=1,
+                     token_limit=None):
+    """Return a table with the wall time (Seconds) and the peak resident memory (PeakRSSMB) of every stage of the comparison of two files."""
+    timer = StageTimer()
+    data1, data2 = timer.run("{00.b} ingest", lambda: (read_corpus(txtfile1), read_corpus(txtfile2)))
+    cre1, cre2 = timer.run("{01}-{02} CRE", lambda: (compute_cre(data1, 1), compute_cre(data2, 2)))
+
+    def control():
+        vocabulary = shared_vocabulary(data1, data2)
+        FILT_1 = vocabulary_filter(data1, vocabulary)
+        FILT_2 = vocabulary_filter(data2, vocabulary)
+        return vocabulary, FILT_1, FILT_2, compute_cre(FILT_1, 1), compute_cre(FILT_2, 2)
+    vocabulary, FILT_1, FILT_2, cre1b, cre2b = timer.run("{03} vocabulary control", control)
+    tokendiff = FILT_2.ntokens - FILT_1.ntokens
+    FILT_sample, nsample = (FILT_2, FILT_1.ntokens) if tokendiff > 0 else (FILT_1, FILT_2.ntokens)
+    if sampler == "tokens" and mode == "montecarlo" and token_limit is not None and FILT_sample.ntokens > token_limit:
+        sampler = "counts"
+        print('The sampler "counts" is used (' + str(FILT_sample.ntokens) + ' tokens in the sample reduced in {04}, more than ' +
+              str(token_limit) + ' for the sampler "tokens")')
+    sample3 = timer.run("{04} resampling", resample, FILT_sample, nsample, mode=mode, numiter=numiter, seed=seed,
+                        workers=workers, vocabulary=vocabulary, progress=False, sampler=sampler)
+    comparison = Comparison((txtfile1, txtfile2), mode, data1, data2, cre1, cre2, vocabulary, FILT_1, FILT_2, cre1b, cre2b,
+                            tokendiff, sample3)
+    timer.run("{05} TRI", build_results_table, comparison)
+    timer.run("{7} output", write_outputs, comparison, output_dir)
+    Table = pd.DataFrame(timer.rows, columns=["Stage", "Seconds", "PeakRSSMB", "WorkersPeakRSSMB"])
+    Table["Sampler"] = sampler
+    Table["Tokens1"] = data1.ntokens
+    Table["Tokens2"] = data2.ntokens
+    Table["Constructions"] = data1.nconstructions + data2.nconstructions
+    return Table
+
+# The results are labelled with the commit of the code (when it is a git repository), so the results of several
+# versions can be kept in the same file and compared
+def code_label():
+    """Return the short commit of the code of eslipro, or "unknown" outside a git repository."""
+    try:
+        return subprocess.run(["git", "-C", os.path.dirname(os.path.abspath(__file__)), "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+# The token sampler of {04} keeps the construction code of every token of the sample and draws a random key for each of
+# them in every iteration, so its memory and time grow with the number of tokens. Above TOKEN_SAMPLER_LIMIT tokens in
+# the sample that is reduced (after the vocabulary control of {03}), the benchmark uses the sampler "counts" instead (the
+# same draws without replacement, in count space), unless strict is True; the column Sampler of the results says which
+# one was used
+TOKEN_SAMPLER_LIMIT = 10 ** 7
+
+# Every size is run on a new synthetic pair (the first sample has that number of tokens), with the same seed
+def run_benchmark(sizes, output_dir=".", mode="montecarlo", numiter=100, seed=1, sampler="tokens", workers=1, ratio=2.0,
+                  overlap=0.8, exponent=1.0, label=None, strict=False):
+    """Benchmark the stages for synthetic samples of every size; return the table of the results."""
+    label = label or code_label()
+    tables = []
+    for size in sizes:
+        directory = os.path.join(output_dir, "benchmark_data", str(size))
+        txtfile1, txtfile2 = synthetic_pair(directory, size, ratio, overlap, exponent, seed=seed)
+        Table = benchmark_stages(txtfile1, txtfile2, directory, mode, numiter, seed, sampler, workers,
+                                 token_limit=None if strict else TOKEN_SAMPLER_LIMIT)
+        Table.insert(0, "Size", size)
+        tables.append(Table)
+        print('Size ' + str(size) + ': ' + ', '.join(stage + ' ' + format(seconds, '.3f') + 's'
+                                                      for stage, seconds in zip(Table.Stage, Table.Seconds)))
+    Results = pd.concat(tables, ignore_index=True)
+    Results.insert(0, "Date", time.strftime("%Y-%m-%d %H:%M:%S"))
+    Results.insert(0, "Label", label)
+    for column, value in (("Mode", mode), ("Iterations", numiter), ("Workers", workers),
+                          ("Python", platform.python_version()), ("Numpy", np.__version__), ("Pandas", pd.__version__)):
+        Results[column] = value
+    return Results
+
+# The results are added to benchmark_results.csv, and every stage is compared with the last run of another label
+# (same size, mode, sampler and number of iterations): Ratio above 1 means that the stage is now slower
+def store_benchmark(Results, output_dir="."):
+    """Add the results to benchmark_results.csv in output_dir; return the comparison with the previous label (or None)."""
+    path = os.path.join(output_dir, "benchmark_results.csv")
+    previous = pd.read_csv(path, dtype={"Label": str}) if os.path.isfile(path) else None
+    os.makedirs(output_dir, exist_ok=True)
+    if previous is not None and list(previous.columns) != list(Results.columns):
+        # a file written by another version (e.g. with the column PeakMB of tracemalloc) keeps all its rows: it is written
+        # again with the columns of both (empty where a version has no value), in another file first and then renamed,
+        # so the old rows are never lost if the run stops
+        tmpfile = path + ".tmp"
+        pd.concat([previous, Results], ignore_index=True).to_csv(tmpfile, index=False)
+        os.replace(tmpfile, path)
+    else:
+        Results.to_csv(path, mode="a", header=previous is None, index=False)
+    if previous is None:
+        return None
+    previous = previous.reindex(columns=previous.columns.union(Results.columns, sort=False))
+    label = Results.Label.iloc[0]
+    previous = previous[previous.Label != label]
+    if len(previous) == 0:
+        return None
+    keys = ["Size", "Stage", "Mode", "Sampler", "Iterations"]
+    previous = previous.drop_duplicates(keys, keep="last")
+    Change = Results.merge(previous[keys + ["Label", "Seconds", "PeakRSSMB"]], on=keys, suffixes=("", "_previous"))
+    Change["Ratio"] = Change.Seconds / Change.Seconds_previous
+    return Change[["Size", "Stage", "Label_previous", "Seconds_previous", "Seconds", "Ratio", "PeakRSSMB_previous", "PeakRSSMB"]]
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+"""
+Command line of EsLiPro: python EsLiPro.py [FIRST SECOND] [options], or python -m eslipro [FIRST SECOND] [options]
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# Command line
+# =============================================================================
+
+# Only the modules of the standard library are imported here: Pandas, Numpy and SciPy are imported by the modules of
+# eslipro when a command needs them, so --help or a wrong option answer at once
+# import os.path to check if files exist
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import argparse to read the options given in the command line (e.g. --mode exact)
+# https://docs.python.org/3/library/argparse.html
+import argparse
+
+
+#Options of the command line
+#The two files, the number of iterations, the seed and the output directory can be given as arguments,
+#so that the script can be run without any question (e.g. by a scheduler)
+#--mode montecarlo (default) extracts a series of random samples from the largest sample in {04}
+#--mode exact computes the expected values of those random samples directly, without any random draw
+def build_parser():
+    """Return the parser of the options of the command line."""
+    parser = argparse.ArgumentParser(description="Estimations of Linguistic Productivity (CRE and TRI) for two samples.")
+    parser.add_argument("files", nargs="*", metavar="FILE",
+                        help="the FIRST and SECOND prefix_suffix files (both are asked for when they are not given); "
+                             "with more files, all of them are compared at once")
+    parser.add_argument("-n", "--iterations", type=int, default=None,
+                        help="number of random samples of {04} (asked for when the files are not given)")
+    parser.add_argument("-o", "--output-dir", default=".",
+                        help="directory where the feedback file and the tables are written (the current directory by default)")
+    parser.add_argument("--mode", choices=["montecarlo", "exact"], default="montecarlo",
+                        help="how Sample 3 is computed in {04}: random samples (montecarlo) or hypergeometric rarefaction (exact)")
+    parser.add_argument("--sampler", choices=["tokens", "counts", "bootstrap"], default="tokens",
+                        help="how the random samples of {04} are drawn: random tokens without replacement (tokens), the number of "
+                             "tokens of every construction type without replacement (counts, faster for large samples), "
+                             "or with replacement (bootstrap)")
+    parser.add_argument("--precision", type=float, metavar="SE",
+                        help="adaptive mode: stop the random samples of {04} when the standard error of the CRE of prefixes and "
+                             "suffixes in Sample 3 is at most SE (checked every 100 iterations); --iterations is then the largest number")
+    parser.add_argument("--precision-morphemes", action="store_true",
+                        help="with --precision, also wait until the mean CRE of every morpheme has a standard error of at most SE")
+    parser.add_argument("--tests", type=int, default=0, metavar="N",
+                        help="permutation test and basic bootstrap interval of the difference in CRE and TRI between both samples "
+                             "after the vocabulary control, with N replicates (written in summary_table.csv)")
+    parser.add_argument("--confidence", type=float, default=0.95,
+                        help="with --tests, level of the basic bootstrap interval (0.95 by default)")
+    parser.add_argument("--best", action="store_true",
+                        help="Bayesian estimation (BEST) of the differences of CRE between Samples 1, 2 and 3, for prefixes and "
+                             "suffixes (posterior summaries in best_summary.csv)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes for the iterations of {04} (the results do not depend on this number)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="master seed for the random samples of {04}, so that a run can be reproduced")
+    parser.add_argument("--iterations-out", action="store_true",
+                        help="write the CRE of every morpheme in every iteration (iterations_Prefixes.csv and iterations_Suffixes.csv)")
+    parser.add_argument("--quantiles", type=float, nargs="*", default=[],
+                        help="quantiles of the CRE of every morpheme across iterations (e.g. 0.025 0.5 0.975)")
+    parser.add_argument("--normalization", choices=["ascii", "unicode", "none"], default="ascii",
+                        help='characters replaced by "xx": anything but a-z/0-9 (ascii), anything but letters/digits (unicode), or nothing (none)')
+    parser.add_argument("--output-format", choices=["csv", "npz", "parquet", "feather"], default="csv",
+                        help="format of results_creativity, summary_table and the iteration tables: csv, compressed NumPy "
+                             "archive (npz) or Parquet/Feather (need pyarrow); with --iterations-out, every iteration is "
+                             "written as a row of a dense matrix (iterations x morphemes) in npz, parquet and feather")
+    parser.add_argument("--plots", action="store_true",
+                        help="draw the histograms of {6} as png files (their bins are always written in histograms_CRE.csv)")
+    parser.add_argument("--no-histograms", action="store_true",
+                        help="skip the histograms of {6} (neither histograms_CRE.csv nor images)")
+    parser.add_argument("--profile", choices=["00.b", "01-02", "03", "04", "05.d", "05.e", "6", "6.b", "7"], metavar="SECTION",
+                        help="profile one section with cProfile (00.b, 01-02, 03, 04, 05.d, 05.e, 6, 6.b or 7): "
+                             "profile_SECTION.prof is written next to run_manifest.json")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="compare every pair of .txt files of a directory (batch_results.csv and summary matrices)")
+    parser.add_argument("--reference", metavar="FILE",
+                        help="with --batch, also compare every file of the directory with this file; "
+                             "with --trajectory, keep only the prefixes and suffixes found in this file")
+    parser.add_argument("--reference-only", action="store_true",
+                        help="with --batch and --reference, compare every file only with the reference file")
+    parser.add_argument("--trajectory", type=int, metavar="SIZE",
+                        help="trajectory mode: CRE and TRI in a window of SIZE tokens (or sessions, see --by) moving along the "
+                             "files, taken as the sessions of one time-ordered sample (trajectory.csv)")
+    parser.add_argument("--step", type=int, default=None,
+                        help="with --trajectory, number of tokens (or sessions) the window moves at every step (SIZE/10 by default)")
+    parser.add_argument("--by", choices=["tokens", "sessions"], default="tokens",
+                        help="with --trajectory, whether SIZE and --step count tokens or sessions (files)")
+    parser.add_argument("--update", metavar="STATE_DIR",
+                        help="incremental mode: add the lines appended to the two files since the last update to the state "
+                             "kept in STATE_DIR, and write the CRE and TRI before and after the vocabulary control (incremental_summary.csv)")
+    parser.add_argument("--check", nargs="+", metavar="FILE",
+                        help="list the malformed lines of these files (lines that are not prefix_suffix, skipped when a sample is read) and exit")
+    parser.add_argument("--benchmark", nargs="+", type=lambda size: int(float(size)), metavar="SIZE",
+                        help="benchmark every stage on synthetic Zipfian samples of these numbers of tokens (e.g. 1e3 1e5 1e7), "
+                             "with --iterations (100 by default); the results are added to benchmark_results.csv")
+    parser.add_argument("--ratio", type=float, default=2.0,
+                        help="with --benchmark, size of the second synthetic sample relative to the first one")
+    parser.add_argument("--overlap", type=float, default=0.8,
+                        help="with --benchmark, proportion of the prefixes and suffixes of the first sample also used in the second")
+    parser.add_argument("--zipf", type=float, default=1.0,
+                        help="with --benchmark, exponent of the Zipfian frequencies of prefixes and suffixes")
+    parser.add_argument("--label", default=None,
+                        help="with --benchmark, label of the results (the git commit of the code by default)")
+    parser.add_argument("--cache-dir", default=os.environ.get("ESLIPRO_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "eslipro")),
+                        help="directory of the cache of samples already read (also set with the ESLIPRO_CACHE variable)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always read the txt files and compute the results, without using or updating the cache")
+    parser.add_argument("--cache-size", type=float, default=2048, metavar="MB",
+                        help="largest size of the cache in MB (2048 by default): the entries used the longest time ago are removed")
+    parser.add_argument("--cache-list", action="store_true",
+                        help="list the samples and results in the cache and exit")
+    parser.add_argument("--cache-warm", nargs="+", metavar="FILE",
+                        help="read these txt files into the cache (with the chosen --normalization) and exit")
+    parser.add_argument("--cache-evict", nargs="*", metavar="KEY",
+                        help="remove these entries (samples or results) from the cache (all of them if no KEY is given) and exit")
+    return parser
+
+#A few of lines to ask for the name of a file to read and check that it is typed correctly
+#(used when the files are not given in the command line)
+def ask_file(order, sample):
+    """Ask for the name of the FIRST or SECOND file, with a second (last) option if it cannot be found."""
+    txtfile = input('Enter name of ' + order + ' file:')
+    if os.path.isfile(txtfile):
+        print("File for Sample " + str(sample) + " found. ")
+    else:
+        print("File for Sample " + str(sample) + " could not be found. Try again: ")
+        txtfile = input('Enter name of ' + order + ' file:')
+    return txtfile
+
+#The commands of the cache are run without reading any sample
+def cache_command(args):
+    """Run --cache-list, --cache-warm or --cache-evict."""
+    from .corpus import cache_entries, corpus_key, evict_cache, load_corpus
+    from .memo import evict_results, result_entries
+    if args.cache_list:
+        entries = cache_entries(args.cache_dir)
+        print('Cache directory: ' + args.cache_dir + ' (' + str(len(entries)) + ' entries)')
+        for meta in entries:
+            print(meta["key"] + '  ' + meta["normalization"] + '  tokens=' + str(meta["tokens"]) + '  prefixes=' + str(meta["prefixes"])
+                  + '  suffixes=' + str(meta["suffixes"]) + '  bytes=' + str(meta["bytes"]) + '  ' + meta["created"] + '  ' + meta["source"])
+        results = result_entries(args.cache_dir)
+        print('Results (' + str(len(results)) + ' entries):')
+        for meta in results:
+            print(meta["key"] + '  ' + meta["parameters"].get("mode", "") + '  seed=' + str(meta["parameters"].get("seed")) +
+                  '  bytes=' + str(meta["bytes"]) + '  ' + meta["created"] + '  ' + ' / '.join(meta["names"]))
+    elif args.cache_warm:
+        for txtfile in args.cache_warm:
+            load_corpus(txtfile, args.normalization, args.cache_dir, int(args.cache_size * 2 ** 20))
+            print('Cached: ' + txtfile + ' -> ' + corpus_key(txtfile, args.normalization))
+    else:
+        for key in evict_cache(args.cache_dir, args.cache_evict or None) + evict_results(args.cache_dir, args.cache_evict or None):
+            print('Evicted: ' + key)
+
+#The malformed lines are skipped when a sample is read (only the first ones are printed): --check lists all of them
+def check_command(args):
+    """Run --check: print every malformed line of the files; return 1 if there is any."""
+    from .tokenizer import Tokenizer, map_file
+    status = 0
+    for txtfile in args.check:
+        tokenizer = Tokenizer()
+        for block in tokenizer.lines(map_file(txtfile)):
+            pass
+        print(txtfile + ': ' + str(len(tokenizer.malformed)) + ' malformed lines')
+        for line, problem, text in tokenizer.malformed:
+            print('  line ' + str(line) + ': ' + problem + ': ' + text)
+        if tokenizer.malformed:
+            status = 1
+    return status
+
+#The batch mode reads every sample of the directory once, and then compares the pairs (several at the same time with --workers)
+def batch_command(args):
+    """Run --batch: compare the pairs of samples of a directory and write the long table and the summary matrices."""
+    from .batch import load_directory, batch_pairs, run_batch, summary_matrices, write_batch
+    from .corpus import load_corpus
+    cache_dir = None if args.no_cache else args.cache_dir
+    cache_size = int(args.cache_size * 2 ** 20)
+    corpora = load_directory(args.batch, args.normalization, cache_dir, cache_size=cache_size)
+    names = list(corpora)
+    reference = None
+    if args.reference is not None:
+        # the reference is always read from its own path, with a name that no file of the directory can have
+        reference = 'reference:' + os.path.basename(args.reference)
+        corpora[reference] = load_corpus(args.reference, args.normalization, cache_dir, cache_size)
+    pairs = batch_pairs(names, reference, all_pairs=not args.reference_only)
+    print('Samples: ' + str(len(corpora)) + ', pairs to compare: ' + str(len(pairs)))
+    Long, Samples, seed_used = run_batch(corpora, pairs, mode=args.mode, numiter=args.iterations, seed=args.seed,
+                                         workers=args.workers, sampler=args.sampler, cache_dir=cache_dir,
+                                         cache_size=cache_size)
+    write_batch(Long, Samples, summary_matrices(Long, list(corpora)), args.output_dir)
+    skipped = Long[Long.Status != 'compared']
+    if len(skipped) > 0:
+        print('Pairs not compared (same number of tokens after the vocabulary control, Status in batch_results.csv): ' +
+              ', '.join(name1 + ' / ' + name2 for name1, name2 in zip(skipped.Sample1, skipped.Sample2)))
+    if args.mode == "montecarlo":
+        print('Seed used for the random samples (--seed): ' + str(seed_used))
+
+#The benchmarks write synthetic samples in the output directory and time every stage of their comparison
+def benchmark_command(args):
+    """Run --benchmark: time every stage for synthetic samples of every size and add the results to benchmark_results.csv."""
+    from .benchmark import run_benchmark, store_benchmark
+    Results = run_benchmark(args.benchmark, args.output_dir, mode=args.mode, numiter=args.iterations or 100,
+                            seed=1 if args.seed is None else args.seed, sampler=args.sampler, workers=args.workers,
+                            ratio=args.ratio, overlap=args.overlap, exponent=args.zipf, label=args.label)
+    Change = store_benchmark(Results, args.output_dir)
+    print(Results[["Size", "Stage", "Sampler", "Seconds", "PeakRSSMB", "WorkersPeakRSSMB"]].to_string(index=False))
+    if Change is not None:
+        print('Compared with the last run of another label (Ratio above 1: slower now):')
+        print(Change.to_string(index=False))
+
+#With more than two files, all of them are compared at once (see eslipro/nway.py)
+def nway_command(args, numiter):
+    """Compare all the files of the command line, controlled for the vocabulary of all of them and the smallest size."""
+    from .corpus import load_corpus
+    from .nway import compare_many, write_nway_outputs
+    cache_dir = None if args.no_cache else args.cache_dir
+    corpora = {}
+    for txtfile in args.files:
+        corpora[txtfile] = load_corpus(txtfile, args.normalization, cache_dir, int(args.cache_size * 2 ** 20))
+    comparison = compare_many(corpora, mode=args.mode, numiter=numiter, seed=args.seed, workers=args.workers,
+                              quantiles=args.quantiles, sampler=args.sampler)
+    write_nway_outputs(comparison, args.output_dir, args.output_format)
+
+def main(argv=None):
+    """Run EsLiPro with the options of the command line (argv, or sys.argv when None); return the exit status."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.cache_list or args.cache_warm or args.cache_evict is not None:
+        cache_command(args)
+        return 0
+    if args.check:
+        return check_command(args)
+    if args.benchmark is not None:
+        if args.files or min(args.benchmark) < 1 or args.ratio <= 0 or not 0 <= args.overlap <= 1:
+            parser.error("--benchmark needs sizes of at least 1 token, a positive --ratio and an --overlap between 0 and 1 (and no files)")
+        benchmark_command(args)
+        return 0
+    if args.batch is not None:
+        if args.files:
+            parser.error("the files are not given with --batch")
+        if args.mode == "montecarlo" and args.iterations is None:
+            parser.error("--iterations is needed with --mode montecarlo and --batch")
+        if args.reference_only and args.reference is None:
+            parser.error("--reference-only needs --reference")
+        batch_command(args)
+        print('End of code reached.')
+        return 0
+    if args.trajectory is not None:
+        if not args.files:
+            parser.error("--trajectory needs the files of the sessions, in order")
+        if args.trajectory < 1 or (args.step is not None and args.step < 1):
+            parser.error("--trajectory SIZE and --step must be at least 1")
+        from .trajectory import trajectory, write_trajectory
+        reference = None
+        if args.reference is not None:
+            from .corpus import load_corpus
+            reference = load_corpus(args.reference, args.normalization, None if args.no_cache else args.cache_dir,
+                                    int(args.cache_size * 2 ** 20))
+        Trajectory = trajectory(args.files, args.trajectory, args.step, args.by, args.normalization, reference)
+        write_trajectory(Trajectory, args.output_dir)
+        print('Windows: ' + str(len(Trajectory)))
+        print('End of code reached.')
+        return 0
+    if args.update is not None:
+        if len(args.files) != 2:
+            parser.error("--update needs the two files (FIRST and SECOND)")
+        from .incremental import update_state
+        try:
+            comparison = update_state(args.update, args.files[0], args.files[1], args.normalization)
+        except ValueError as error:
+            print(error)
+            return 1
+        ResultsTable = comparison.results_table()
+        os.makedirs(args.output_dir, exist_ok=True)
+        ResultsTable.to_csv(os.path.join(args.output_dir, 'incremental_summary.csv'))
+        print(ResultsTable.to_string())
+        return 0
+    if len(args.files) == 1:
+        parser.error("two files or more are needed (FIRST and SECOND...), or none to be asked for them")
+    if len(args.files) > 2 and args.iterations_out:
+        parser.error("--iterations-out is only available for the comparison of two files")
+    if args.precision is not None and (len(args.files) > 2 or args.mode != "montecarlo"):
+        parser.error("--precision is only available for the random samples (--mode montecarlo) of two files")
+    if args.tests < 0 or not 0 < args.confidence < 1:
+        parser.error("--tests must be at least 0 and --confidence between 0 and 1")
+    if (args.tests > 0 or args.best) and len(args.files) > 2:
+        parser.error("--tests and --best are only available for the comparison of two files")
+    if (args.plots or args.no_histograms) and len(args.files) > 2:
+        parser.error("--plots and --no-histograms are only available for the comparison of two files")
+    if args.output_format in ("parquet", "feather"):
+        import importlib.util
+        if importlib.util.find_spec("pyarrow") is None:
+            parser.error("--output-format " + args.output_format + " needs pyarrow (pip install pyarrow)")
+    if args.plots and args.no_histograms:
+        parser.error("--plots and --no-histograms cannot be used together")
+    if args.precision_morphemes and args.precision is None:
+        parser.error("--precision-morphemes needs --precision")
+    if args.iterations is not None and args.iterations < 1:
+        parser.error("--iterations must be at least 1")
+    interactive = len(args.files) == 0
+    if interactive:
+        #Print list of files in current working directory, and ask for the names of both files
+        print(os.listdir(os.getcwd()))
+        txtfile1 = ask_file('FIRST', 1)
+        txtfile2 = ask_file('SECOND', 2)
+    else:
+        txtfile1, txtfile2 = args.files[:2]
+    #The number of iterations is only needed for the random samples (--mode montecarlo)
+    numiter = args.iterations
+    if args.mode == "montecarlo" and numiter is None:
+        if not interactive:
+            parser.error("--iterations is needed with --mode montecarlo when the files are given")
+        numiter = int(input("number of iterations to run: "))
+    if len(args.files) > 2:
+        nway_command(args, numiter)
+        print('End of code reached.')
+        return 0
+
+    from .analysis import EqualSamplesError, run_comparison
+    try:
+        run_comparison(txtfile1, txtfile2, output_dir=args.output_dir, mode=args.mode, numiter=numiter, seed=args.seed,
+                       workers=args.workers, iterations_out=args.iterations_out, quantiles=args.quantiles,
+                       normalization=args.normalization, cache_dir=None if args.no_cache else args.cache_dir,
+                       precision=args.precision, per_morpheme=args.precision_morphemes, sampler=args.sampler,
+                       tests=args.tests, confidence=args.confidence, best=args.best, profile=args.profile,
+                       histograms=not args.no_histograms, plots=args.plots, output_format=args.output_format,
+                       cache_size=int(args.cache_size * 2 ** 20))
+    except EqualSamplesError as error:
+        print(error)
+        return 0
+    print('End of code reached.')
+    return 0
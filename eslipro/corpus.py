@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+{00.b} Data reading: the prefix x suffix matrix of every sample (Corpus) and the cache of samples already read
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# {00.b} Data reading
+# =============================================================================
+
+# Import os.path to build the paths of the cache
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import the sparse matrices of SciPy to store the prefix x suffix table of every sample
+# https://docs.scipy.org/doc/scipy/reference/sparse.html
+from scipy import sparse
+# import hashlib, json, shutil, tempfile and time for the cache of samples already read
+# https://docs.python.org/3/library/hashlib.html
+import hashlib
+import json
+import shutil
+import tempfile
+import time
+
+from .tokenizer import Tokenizer, map_file, report_malformed
+from .memo import trim_cache
+
+
+#it is better to have only letters, so non-letters are replaced by "xx" using RegEX
+#Different rules can be chosen with --normalization, and new rules can be added to NORMALIZATION_RULES
+#(every rule receives a Series of strings and returns the Series with the normalized strings)
+#The rules are applied only once to every distinct string, because most tokens repeat the same prefixes and suffixes
+def ascii_letters(values):
+    """Replace every sequence of characters other than a-z, A-Z and 0-9 by "xx" (e.g. "niño" becomes "nixxo")."""
+    return values.str.replace('[^0-9a-zA-Z]+', 'xx', regex=True)
+
+def unicode_letters(values):
+    """Replace every sequence of characters other than letters and digits of any alphabet by "xx" ("niño" is kept)."""
+    return values.str.replace(r'[\W_]+', 'xx', regex=True)
+
+def keep_all(values):
+    """Keep the strings as they are."""
+    return values
+
+NORMALIZATION_RULES = {"ascii": ascii_letters, "unicode": unicode_letters, "none": keep_all}
+
+#Every sample is stored as a sparse matrix with one row per prefix type and one column per suffix type:
+#the value of a cell is the number of tokens of that construction (e.g. 3 tokens of a_x), and empty cells take no memory
+#Every analysis of CRE and TRI is a query of that matrix:
+#the CRE of a prefix is the number of non-empty cells in its row, and the CRE of a suffix in its column,
+#TRI counts the rows and columns with only one non-empty cell, and the vocabulary control keeps some rows and columns
+class Corpus:
+    """Sparse prefix x suffix matrix with the number of tokens of every construction type of a sample."""
+
+    def __init__(self, prefixes, suffixes, matrix):
+        self.prefixes = pd.Index(prefixes)
+        self.suffixes = pd.Index(suffixes)
+        self.matrix = sparse.csr_matrix(matrix, dtype=np.int64)
+        self.matrix.sum_duplicates()
+        self.matrix.eliminate_zeros()
+
+    @classmethod
+    def from_table(cls, data):
+        """Build the matrix from a table with one row per construction: "prefix", "suffix", "count"."""
+        pre_codes, prefixes = pd.factorize(data["prefix"], sort=True)
+        suf_codes, suffixes = pd.factorize(data["suffix"], sort=True)
+        matrix = sparse.coo_matrix((np.asarray(data["count"], dtype=np.int64), (pre_codes, suf_codes)),
+                                   shape=(len(prefixes), len(suffixes)))
+        return cls(prefixes, suffixes, matrix)
+
+    @property
+    def ntokens(self):
+        """Number of tokens in the sample."""
+        return int(self.matrix.sum())
+
+    @property
+    def nconstructions(self):
+        """Number of construction types in the sample."""
+        return int(self.matrix.nnz)
+
+    def prefix_frequencies(self):
+        """Number of tokens of every prefix."""
+        return pd.Series(np.asarray(self.matrix.sum(axis=1)).ravel(), index=self.prefixes)
+
+    def suffix_frequencies(self):
+        """Number of tokens of every suffix."""
+        return pd.Series(np.asarray(self.matrix.sum(axis=0)).ravel(), index=self.suffixes)
+
+    def cre(self):
+        """Return two Series (prefixes, suffixes) with the CRE of every morpheme, sorted by morpheme."""
+        return (pd.Series(self.matrix.getnnz(axis=1), index=self.prefixes),
+                pd.Series(self.matrix.getnnz(axis=0), index=self.suffixes))
+
+    def pairs(self):
+        """Return the prefix code, suffix code and number of tokens of every construction type (by prefix, then suffix)."""
+        coo = self.matrix.tocoo()
+        return coo.row.astype(np.int64), coo.col.astype(np.int64), coo.data
+
+    def constructions(self):
+        """Return the list of construction types (e.g. "a_x")."""
+        pair_pre, pair_suf, pair_freq = self.pairs()
+        return (self.prefixes.to_numpy(dtype=object)[pair_pre] + "_" + self.suffixes.to_numpy(dtype=object)[pair_suf]).tolist()
+
+    def restrict(self, prefixes, suffixes):
+        """Return the sample with only the given prefixes and suffixes (rows and columns without tokens are dropped)."""
+        rows = self.prefixes.get_indexer(prefixes)
+        cols = self.suffixes.get_indexer(suffixes)
+        rows = rows[rows >= 0]
+        cols = cols[cols >= 0]
+        matrix = self.matrix[rows][:, cols]
+        # only the prefixes and suffixes that still have some construction are kept
+        keep_rows = matrix.getnnz(axis=1) > 0
+        keep_cols = matrix.getnnz(axis=0) > 0
+        return Corpus(self.prefixes[rows][keep_rows], self.suffixes[cols][keep_cols], matrix[keep_rows][:, keep_cols])
+
+    def save(self, directory):
+        """Write the vocabularies and the arrays of the matrix as .npy files in a directory."""
+        np.save(os.path.join(directory, "prefixes.npy"), np.asarray(self.prefixes, dtype=str))
+        np.save(os.path.join(directory, "suffixes.npy"), np.asarray(self.suffixes, dtype=str))
+        np.save(os.path.join(directory, "indptr.npy"), self.matrix.indptr)
+        np.save(os.path.join(directory, "indices.npy"), self.matrix.indices)
+        np.save(os.path.join(directory, "data.npy"), self.matrix.data)
+
+    @classmethod
+    def load(cls, directory):
+        """Open a Corpus saved with save(); the arrays are memory-mapped, so nothing is read until it is used."""
+        arrays = {name: np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+                  for name in ("prefixes", "suffixes", "indptr", "indices", "data")}
+        corpus = cls.__new__(cls)
+        corpus.prefixes = pd.Index(arrays["prefixes"], dtype=object)
+        corpus.suffixes = pd.Index(arrays["suffixes"], dtype=object)
+        corpus.matrix = sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]),
+                                          shape=(len(corpus.prefixes), len(corpus.suffixes)), copy=False)
+        return corpus
+
+#The txt files are memory-mapped and split at the byte level (see eslipro/tokenizer.py): the prefixes and suffixes get
+#integer codes, and only the number of tokens of every construction type is kept, so memory depends on the vocabulary
+#and not on the tokens. The lines that are not prefix_suffix are skipped and reported with their number
+def read_corpus(txtfile, normalization="ascii"):
+    """Read a prefix_suffix file and return its Corpus (number of tokens of every construction type)."""
+    tokenizer = Tokenizer()
+    pair_pre, pair_suf, pair_freq = tokenizer.count_pairs(map_file(txtfile))
+    report_malformed(txtfile, tokenizer.malformed)
+    #two different strings may become the same after normalization (e.g. "a-b" and "a+b"): their tokens are added in the matrix
+    return Corpus.from_table(construction_table(tokenizer, pair_pre, pair_suf, pair_freq, normalization))
+
+#When the order of the tokens matters (e.g. the windows of eslipro/trajectory.py), every token is kept, as the codes of
+#its prefix and its suffix, instead of the number of tokens of every construction type
+def read_tokens(txtfile, normalization="ascii"):
+    """Read a prefix_suffix file and return the codes of the prefix and suffix of every token and both vocabularies."""
+    tokenizer = Tokenizer()
+    blocks = [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))] + list(tokenizer.tokens(map_file(txtfile)))
+    report_malformed(txtfile, tokenizer.malformed)
+    #the codes of the tokenizer are replaced by the codes of the normalized strings (in alphabetical order)
+    rule = NORMALIZATION_RULES[normalization]
+    pre_map, prefixes = pd.factorize(rule(tokenizer.vocabulary(0)), sort=True)
+    suf_map, suffixes = pd.factorize(rule(tokenizer.vocabulary(1)), sort=True)
+    pre_codes = pre_map[np.concatenate([block[0] for block in blocks])]
+    suf_codes = suf_map[np.concatenate([block[1] for block in blocks])]
+    return pre_codes.astype(np.int64), suf_codes.astype(np.int64), pd.Index(prefixes, dtype=object), pd.Index(suffixes, dtype=object)
+
+#The same table is used for a whole file and for the lines appended to a file (see eslipro/incremental.py)
+def construction_table(tokenizer, pair_pre, pair_suf, pair_freq, normalization="ascii"):
+    """Return the "prefix","suffix","count" table (normalized) of the construction codes counted by a Tokenizer."""
+    #the prefixes and suffixes are normalized once per distinct string
+    #(the _ character is not part of the prefix or the suffix, so it is kept between them in the construction)
+    rule = NORMALIZATION_RULES[normalization]
+    prefixes = np.asarray(rule(tokenizer.vocabulary(0)), dtype=object)
+    suffixes = np.asarray(rule(tokenizer.vocabulary(1)), dtype=object)
+    return pd.DataFrame({"prefix": prefixes[pair_pre], "suffix": suffixes[pair_suf], "count": pair_freq})
+
+#Samples already read are kept in a cache on disk, so the same txt file does not have to be read again in later runs
+#Every entry is a directory named after a hash of the contents of the file and the normalization rule, so a file
+#that changes (or is read with another rule) gets a new entry
+CACHE_VERSION = 2
+
+def corpus_key(txtfile, normalization):
+    """Return the key of a txt file in the cache: a hash of its contents and of the normalization rule."""
+    digest = hashlib.sha256()
+    digest.update(("eslipro-%d-%s\n" % (CACHE_VERSION, normalization)).encode())
+    with open(txtfile, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:32]
+
+def cache_store(corpus, txtfile, normalization, key, cache_dir, max_bytes=None):
+    """Save a Corpus in the cache (written in a temporary directory first, so an entry is never left half written), then trim the cache to max_bytes."""
+    os.makedirs(cache_dir, exist_ok=True)
+    tmpdir = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp-")
+    corpus.save(tmpdir)
+    meta = {"key": key, "source": os.path.abspath(txtfile), "normalization": normalization,
+            "version": CACHE_VERSION, "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "tokens": corpus.ntokens, "prefixes": len(corpus.prefixes), "suffixes": len(corpus.suffixes),
+            "constructions": corpus.nconstructions}
+    with open(os.path.join(tmpdir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=1)
+    try:
+        os.replace(tmpdir, os.path.join(cache_dir, key))
+    except OSError:
+        # another run stored the same entry in the meantime
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    if max_bytes is not None:
+        trim_cache(cache_dir, max_bytes)
+
+def load_corpus(txtfile, normalization="ascii", cache_dir=None, cache_size=None):
+    """Return the Corpus of a txt file, from the cache when it was already read (cache_dir=None disables the cache, cache_size limits its size in bytes)."""
+    if cache_dir is None:
+        return read_corpus(txtfile, normalization)
+    key = corpus_key(txtfile, normalization)
+    entry = os.path.join(cache_dir, key)
+    if os.path.isfile(os.path.join(entry, "meta.json")):
+        # the time of the last use of the entry (see the size limit of the cache in eslipro/memo.py)
+        os.utime(os.path.join(entry, "meta.json"))
+        return Corpus.load(entry)
+    corpus = read_corpus(txtfile, normalization)
+    cache_store(corpus, txtfile, normalization, key, cache_dir, cache_size)
+    return corpus
+
+def cache_entries(cache_dir):
+    """Return the description (meta.json) of every entry of the cache."""
+    if not os.path.isdir(cache_dir):
+        return []
+    entries = []
+    for name in sorted(os.listdir(cache_dir)):
+        metafile = os.path.join(cache_dir, name, "meta.json")
+        if os.path.isfile(metafile):
+            with open(metafile) as f:
+                meta = json.load(f)
+            meta["bytes"] = sum(entry.stat().st_size for entry in os.scandir(os.path.join(cache_dir, name)))
+            entries.append(meta)
+    return entries
+
+def evict_cache(cache_dir, keys=None):
+    """Remove the given entries from the cache (all of them when keys is None) and return the keys removed."""
+    if keys is None:
+        keys = [meta["key"] for meta in cache_entries(cache_dir)]
+    removed = []
+    for key in keys:
+        # only the entries of samples (the results are removed by evict_results, see eslipro/memo.py)
+        entry = os.path.join(cache_dir, os.path.basename(key))
+        if os.path.isfile(os.path.join(entry, "meta.json")):
+            shutil.rmtree(entry, ignore_errors=True)
+            removed.append(key)
+    return removed
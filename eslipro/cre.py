@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+{00.c} Functions for the computes of CRE and TRI
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# {00.c} Functions for the computes of CRE and TRI
+# =============================================================================
+
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import namedtuple to keep the tables and the TRI counts of a sample together
+# https://docs.python.org/3/library/collections.html
+from collections import namedtuple
+
+
+# CRE is the number of different partners that a morpheme is used with (e.g. "a" used with x, y and earth has CRE = 3)
+# Instead of searching each type in the whole set of constructions, the number of non-empty cells of every row (prefixes)
+# and every column (suffixes) of the matrix of the sample is counted (see the class Corpus)
+
+# The CRE values are converted into the table with four columns 'Sample','Position','Morpheme','CRE' used everywhere
+def cre_table(CRE, sample, position):
+    """Return the 'Sample','Position','Morpheme','CRE' table for a Series of CRE values."""
+    return pd.DataFrame({"Sample": sample,
+                         "Position": position,
+                         "Morpheme": CRE.index.to_numpy(),
+                         "CRE": CRE.to_numpy()})
+
+# Both tables (prefixes and suffixes) and the counts for TRI (morphemes used with only one partner) come from the same pass
+def cre_tri_tables(corpus, sample):
+    """Return the CRE tables for prefixes and suffixes and their TRI counts (morphemes with CRE == 1)."""
+    CRE_Pre, CRE_Suf = corpus.cre()
+    count_Tri_Pre = int((CRE_Pre == 1).sum())
+    count_Tri_Suf = int((CRE_Suf == 1).sum())
+    return cre_table(CRE_Pre, sample, 'Prefix'), cre_table(CRE_Suf, sample, 'Suffix'), count_Tri_Pre, count_Tri_Suf
+
+# The result of compute_cre keeps the two tables and the two TRI counts of a sample together
+# (Sample 3 uses the same structure, see resample in {00.d})
+CREResult = namedtuple("CREResult", ["Pre", "Suf", "count_Tri_Pre", "count_Tri_Suf"])
+
+def compute_cre(corpus, sample):
+    """Return the CREResult (CRE tables for prefixes and suffixes, and TRI counts) of a Corpus."""
+    return CREResult(*cre_tri_tables(corpus, sample))
+
+# The overall level of creativity of a position is the mean (and sd) of the CRE of its morphemes,
+# and TRI is the proportion of its morphemes used with just one partner (out of ntypes morphemes when the number is not
+# the one of the table, e.g. the expected number of morphemes drawn in the exact mode of Sample 3)
+def cre_summary(table, count_Tri, ntypes=None):
+    """Return the mean CRE, sd of CRE, number of types, TRI and TRI% of one CRE table."""
+    ntypes = len(table) if ntypes is None else ntypes
+    TRI = count_Tri / ntypes
+    return table['CRE'].mean(), table['CRE'].std(), ntypes, TRI, TRI * 100
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+{00.e} Functions for the exact (rarefaction) compute of Sample 3
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# {00.e} Functions for the exact (rarefaction) compute of Sample 3
+# =============================================================================
+
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+
+from .resampling import encode_corpus
+
+
+# When n tokens are drawn without replacement from N tokens, the probability that none of the k tokens of a type is drawn
+# is C(N-k, n) / C(N, n) (hypergeometric rarefaction). The logarithms of the factorials are computed once for all types
+def log_factorials(ntokens):
+    """Return an array with log(k!) for k = 0..ntokens."""
+    return np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, ntokens + 1)))))
+
+def prob_absent(k, ntokens, n, logfact):
+    """Return the probability that none of k tokens is drawn in a sample of n out of ntokens (without replacement)."""
+    k = np.asarray(k, dtype=np.int64)
+    rest = ntokens - k
+    absent = np.zeros(k.shape)
+    ok = rest >= n
+    absent[ok] = np.exp(logfact[rest[ok]] - logfact[rest[ok] - n] - logfact[ntokens] + logfact[ntokens - n])
+    return absent
+
+# The expected CRE of every morpheme in a random sample of n tokens is computed from the frequency of each construction:
+# E[CRE | morpheme drawn] = sum of P(construction drawn) / P(morpheme drawn), which is what the average over the
+# iterations of {04} estimates. For TRI, the probabilities that a morpheme is drawn with exactly one partner and that it
+# is not drawn at all are kept (see expected_tri)
+def exact_positional(pair_pos, pair_freq, npos, ntokens, n, logfact):
+    """Return the expected CRE, the probability of being drawn with exactly one partner and the probability of not being drawn of every morpheme of one position."""
+    pos_freq = np.bincount(pair_pos, weights=pair_freq, minlength=npos).astype(np.int64)
+    present_pair = 1.0 - prob_absent(pair_freq, ntokens, n, logfact)
+    present_pos = 1.0 - prob_absent(pos_freq, ntokens, n, logfact)
+    expected = np.bincount(pair_pos, weights=present_pair, minlength=npos)
+    # only this construction of the morpheme is drawn: no token of the other constructions, minus no token at all
+    only_pair = prob_absent(pos_freq[pair_pos] - pair_freq, ntokens, n, logfact) - prob_absent(pos_freq[pair_pos], ntokens, n, logfact)
+    only_one = np.bincount(pair_pos, weights=only_pair, minlength=npos)
+    # the morphemes of the vocabulary without tokens in this sample (never drawn) are removed by exact_cre
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return expected / present_pos, only_one, 1.0 - present_pos
+
+# In {04}, TRI counts the morphemes whose mean CRE over the iterations where they were drawn is 1, out of the morphemes
+# drawn at least once (as in the original script). A morpheme counts when, in every one of the numiter iterations, it is
+# either not drawn (q) or drawn with exactly one partner (p1), and it was drawn at least once: the expected numbers are
+# sum of (p1 + q)^numiter - q^numiter, out of sum of 1 - q^numiter morphemes drawn. Without a number of iterations, the
+# limit of many iterations is given: the morphemes with only one partner in the sample, out of all of them
+def expected_tri(only_one, absent, npartners, numiter=None):
+    """Return the expected number of morphemes with a mean CRE of 1 and the expected number of morphemes drawn in numiter iterations."""
+    if numiter is None:
+        return float((npartners == 1).sum()), float(len(npartners))
+    single = np.clip(only_one + absent, 0.0, 1.0) ** numiter - absent ** numiter
+    return float(single.sum()), float((1.0 - absent ** numiter).sum())
+
+def exact_cre(corpus, n, vocabulary=None, numiter=None):
+    """Return the expected CRE tables ("Morpheme","CRE") of Sample 3, the expected TRI counts and numbers of morphemes drawn in numiter iterations, without random draws."""
+    pair_pre, pair_suf, pair_freq, pre_vocab, suf_vocab = encode_corpus(corpus, vocabulary)
+    ntokens = int(pair_freq.sum())
+    n = min(n, ntokens)
+    logfact = log_factorials(ntokens)
+    CRE_Pre, only_Pre, absent_Pre = exact_positional(pair_pre, pair_freq, len(pre_vocab), ntokens, n, logfact)
+    CRE_Suf, only_Suf, absent_Suf = exact_positional(pair_suf, pair_freq, len(suf_vocab), ntokens, n, logfact)
+    # a shared morpheme may have no tokens in this sample (e.g. its partners were not shared), so it is not included
+    partners_Pre = np.bincount(pair_pre, minlength=len(pre_vocab))
+    partners_Suf = np.bincount(pair_suf, minlength=len(suf_vocab))
+    pre_found = partners_Pre > 0
+    suf_found = partners_Suf > 0
+    CRE_Pre_Table = pd.DataFrame({"Morpheme": np.asarray(pre_vocab)[pre_found], "CRE": CRE_Pre[pre_found]})
+    CRE_Suf_Table = pd.DataFrame({"Morpheme": np.asarray(suf_vocab)[suf_found], "CRE": CRE_Suf[suf_found]})
+    count_Tri_Pre, ntypes_Pre = expected_tri(only_Pre[pre_found], absent_Pre[pre_found], partners_Pre[pre_found], numiter)
+    count_Tri_Suf, ntypes_Suf = expected_tri(only_Suf[suf_found], absent_Suf[suf_found], partners_Suf[suf_found], numiter)
+    return CRE_Pre_Table, CRE_Suf_Table, count_Tri_Pre, count_Tri_Suf, ntypes_Pre, ntypes_Suf
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental mode: CRE and TRI of two samples that grow (e.g. one session after another), updated with the new tokens only
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# Incremental updates of CRE and TRI
+# =============================================================================
+
+# Import os.path to keep the state of the samples on disk
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import hashlib and json to check that the files were only appended to, and to keep the state of the files
+# https://docs.python.org/3/library/hashlib.html
+import hashlib
+import json
+# import sqlite3 to keep the state on disk, so that an update only reads and writes what the new lines change
+# https://docs.python.org/3/library/sqlite3.html
+import sqlite3
+# import math to compute the sd of CRE from the running sums
+# https://docs.python.org/3/library/math.html
+import math
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+
+from .corpus import Corpus, construction_table
+from .vocabulary import shared_vocabulary, vocabulary_filter
+from .tokenizer import Tokenizer, report_malformed
+
+
+# The state of both samples is kept in a SQLite database (STATE_DIR/state.sqlite): the number of tokens of every
+# construction type of every sample, the CRE of every morpheme of every view (both samples, and their versions filtered
+# with the shared vocabulary) and the shared vocabulary, all indexed by morpheme. The sums of every view (tokens, types,
+# sum of CRE, sum of squares and TRI) are kept in the table meta with the position reached in every file
+# An update only looks up and changes the rows of the constructions and morphemes of the new lines, and the changes are
+# saved at once (a single transaction), so the state is never half updated
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS pairs (sample INTEGER, prefix TEXT, suffix TEXT, count INTEGER NOT NULL,
+                                  PRIMARY KEY (sample, prefix, suffix)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pairs_suffix ON pairs (sample, suffix);
+CREATE TABLE IF NOT EXISTS cre (view TEXT, position TEXT, morpheme TEXT, cre INTEGER NOT NULL,
+                                PRIMARY KEY (view, position, morpheme)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS shared (position TEXT, morpheme TEXT, PRIMARY KEY (position, morpheme)) WITHOUT ROWID;
+"""
+
+# Version of the format of the database of the state, and its name in STATE_DIR
+STATE_VERSION = 1
+STATE_FILE = "state.sqlite"
+
+# The CRE of a morpheme only changes when a new construction type appears: a new partner adds 1 to its CRE
+# So every position (prefixes or suffixes) of a view keeps the CRE of every morpheme (in the table cre) and the sums needed
+# for the mean and sd of CRE (sum of CRE and sum of squares) and for TRI (number of morphemes with CRE = 1), updated with
+# one lookup of the morpheme for every new partner
+class CREStats:
+    """Running CRE of every morpheme of one position of a view, with the sums for the mean, sd and TRI."""
+
+    def __init__(self, db, view, position, sums=None):
+        self.db = db
+        self.view = view
+        self.position = position
+        self.ntypes, self.total, self.squares, self.tri = sums or (0, 0, 0, 0)
+
+    def get(self, morpheme):
+        """Return the CRE of a morpheme (0 when it is not in the view)."""
+        row = self.db.execute("SELECT cre FROM cre WHERE view = ? AND position = ? AND morpheme = ?",
+                              (self.view, self.position, morpheme)).fetchone()
+        return 0 if row is None else row[0]
+
+    def add_partner(self, morpheme):
+        """Add one partner to a morpheme (a new construction type)."""
+        c = self.get(morpheme)
+        self.db.execute("INSERT OR REPLACE INTO cre VALUES (?, ?, ?, ?)", (self.view, self.position, morpheme, c + 1))
+        self.total += 1
+        # (c + 1)^2 - c^2
+        self.squares += 2 * c + 1
+        if c == 0:
+            self.ntypes += 1
+            self.tri += 1
+        elif c == 1:
+            self.tri -= 1
+
+    def sums(self):
+        """Return the number of types, sum of CRE, sum of squares and TRI count (kept in the table meta)."""
+        return [self.ntypes, self.total, self.squares, self.tri]
+
+    def summary(self):
+        """Return the mean CRE, sd of CRE, number of types, TRI and TRI% (as cre_summary does for a CRE table)."""
+        ntypes = self.ntypes
+        if ntypes == 0:
+            return np.nan, np.nan, 0, np.nan, np.nan
+        mean = self.total / ntypes
+        sd = math.sqrt(max(self.squares - self.total * mean, 0) / (ntypes - 1)) if ntypes > 1 else np.nan
+        TRI = self.tri / ntypes
+        return mean, sd, ntypes, TRI, TRI * 100
+
+# The stats of a sample (or of its version filtered with the shared vocabulary): tokens, and CRE of prefixes and suffixes
+class ViewStats:
+    """Running number of tokens and CRE of prefixes and suffixes of a view of a sample."""
+
+    def __init__(self, db, view, sums=None):
+        sums = sums or {"ntokens": 0, "Pre": None, "Suf": None}
+        self.ntokens = sums["ntokens"]
+        self.Pre = CREStats(db, view, "Pre", sums["Pre"])
+        self.Suf = CREStats(db, view, "Suf", sums["Suf"])
+
+    def add_pair(self, prefix, suffix, count):
+        """Add a new construction type with count tokens."""
+        self.Pre.add_partner(prefix)
+        self.Suf.add_partner(suffix)
+        self.ntokens += count
+
+    def sums(self):
+        """Return the sums of the view (kept in the table meta)."""
+        return {"ntokens": self.ntokens, "Pre": self.Pre.sums(), "Suf": self.Suf.sums()}
+
+# Every sample keeps the number of tokens of every construction type (the table pairs); the partners of a morpheme are
+# found with the index of the table (they are needed when a morpheme becomes shared and all its constructions enter the
+# filtered sample)
+class IncrementalCorpus:
+    """Construction counts and partners of every morpheme of a growing sample."""
+
+    def __init__(self, db, sample, sums=None):
+        self.db = db
+        self.sample = sample
+        self.stats = ViewStats(db, "sample" + str(sample), sums)
+
+    def add(self, prefix, suffix, count):
+        """Add count tokens of a construction; return True if it is a new construction type."""
+        row = self.db.execute("SELECT count FROM pairs WHERE sample = ? AND prefix = ? AND suffix = ?",
+                              (self.sample, prefix, suffix)).fetchone()
+        self.db.execute("INSERT OR REPLACE INTO pairs VALUES (?, ?, ?, ?)",
+                        (self.sample, prefix, suffix, count + (0 if row is None else row[0])))
+        if row is None:
+            self.stats.add_pair(prefix, suffix, count)
+        else:
+            self.stats.ntokens += count
+        return row is None
+
+    def has(self, morpheme, position):
+        """Return True when a prefix (position "Pre") or suffix ("Suf") is used in the sample."""
+        return (self.stats.Pre if position == "Pre" else self.stats.Suf).get(morpheme) > 0
+
+    def partners(self, morpheme, position):
+        """Return the (partner, count) of every construction of a prefix (position "Pre") or suffix ("Suf")."""
+        if position == "Pre":
+            query = "SELECT suffix, count FROM pairs WHERE sample = ? AND prefix = ?"
+        else:
+            query = "SELECT prefix, count FROM pairs WHERE sample = ? AND suffix = ?"
+        return self.db.execute(query, (self.sample, morpheme)).fetchall()
+
+    def corpus(self):
+        """Return the Corpus (sparse matrix) with the current counts."""
+        data = pd.read_sql_query("SELECT prefix, suffix, count FROM pairs WHERE sample = ?", self.db, params=(self.sample,))
+        return Corpus.from_table(data.astype({"count": np.int64}))
+
+# Two samples and their versions filtered with the shared vocabulary ({03}), updated with every batch of new tokens
+# A construction enters the filtered sample when its prefix and its suffix are both shared: either when it appears and
+# both are already shared, or when the last of them becomes shared (then all the constructions of that morpheme in both
+# samples whose partner is shared enter at once). Morphemes never leave, because tokens are only appended
+# The state is kept in the database path (":memory:" keeps it in memory only); nothing is written before save()
+class IncrementalComparison:
+    """CRE and TRI of two growing samples, before and after the vocabulary control, updated with the new tokens only."""
+
+    def __init__(self, path=":memory:", normalization="ascii"):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        meta = dict(self.db.execute("SELECT key, value FROM meta").fetchall())
+        if meta:
+            meta = {key: json.loads(value) for key, value in meta.items()}
+            if meta["version"] != STATE_VERSION:
+                raise ValueError(path + " is a state of another version of EsLiPro: start a new state")
+        else:
+            meta = {"version": STATE_VERSION, "normalization": normalization, "files": [None, None],
+                    "samples": [None, None], "filtered": [None, None], "shared": [0, 0]}
+        self.normalization = meta["normalization"]
+        self.files = meta["files"]
+        self.samples = [IncrementalCorpus(self.db, k + 1, sums) for k, sums in enumerate(meta["samples"])]
+        self.filtered = [ViewStats(self.db, "filtered" + str(k + 1), sums) for k, sums in enumerate(meta["filtered"])]
+        self.nshared = meta["shared"]
+        self.new = not any(self.files)
+
+    def is_shared(self, morpheme, position):
+        """Return True when a prefix (position "Pre") or suffix ("Suf") is in the shared vocabulary."""
+        return self.db.execute("SELECT 1 FROM shared WHERE position = ? AND morpheme = ?", (position, morpheme)).fetchone() is not None
+
+    def share(self, morpheme, position):
+        """Add a morpheme to the shared vocabulary, and its constructions with shared partners to the filtered samples."""
+        self.db.execute("INSERT INTO shared VALUES (?, ?)", (position, morpheme))
+        self.nshared[0 if position == "Pre" else 1] += 1
+        other = "Suf" if position == "Pre" else "Pre"
+        for sample, filtered in zip(self.samples, self.filtered):
+            for partner, count in sample.partners(morpheme, position):
+                if self.is_shared(partner, other):
+                    if position == "Pre":
+                        filtered.add_pair(morpheme, partner, count)
+                    else:
+                        filtered.add_pair(partner, morpheme, count)
+
+    def append(self, k, data):
+        """Add the tokens of a "prefix","suffix","count" table to sample k (0 or 1), in time proportional to the table."""
+        sample, other, filtered = self.samples[k], self.samples[1 - k], self.filtered[k]
+        for prefix, suffix, count in zip(data["prefix"], data["suffix"], data["count"]):
+            prefix, suffix, count = str(prefix), str(suffix), int(count)
+            new_pre = not sample.has(prefix, "Pre")
+            new_suf = not sample.has(suffix, "Suf")
+            new = sample.add(prefix, suffix, count)
+            shares_pre = new_pre and other.has(prefix, "Pre")
+            shares_suf = new_suf and other.has(suffix, "Suf")
+            if shares_pre:
+                self.share(prefix, "Pre")
+            if shares_suf:
+                self.share(suffix, "Suf")
+            # when a morpheme became shared, this construction already entered the filtered sample (if it had to)
+            if not (shares_pre or shares_suf) and self.is_shared(prefix, "Pre") and self.is_shared(suffix, "Suf"):
+                if new:
+                    filtered.add_pair(prefix, suffix, count)
+                else:
+                    filtered.ntokens += count
+
+    # A new state (nothing added yet) is filled at once with both samples: the CRE of every view is computed with the
+    # matrices of the samples, as in {01}-{03}, and the rows and the sums are written together
+    def initialize(self, tables):
+        """Fill a new state with the "prefix","suffix","count" tables of both samples."""
+        corpora = [Corpus.from_table(data) for data in tables]
+        vocabulary = shared_vocabulary(*corpora)
+        views = []
+        for k, corpus in enumerate(corpora):
+            pair_pre, pair_suf, pair_freq = corpus.pairs()
+            self.db.executemany("INSERT INTO pairs VALUES (?, ?, ?, ?)",
+                                zip([k + 1] * len(pair_freq), corpus.prefixes[pair_pre].astype(str), corpus.suffixes[pair_suf].astype(str),
+                                    pair_freq.tolist()))
+            views.append((self.samples[k].stats, corpus))
+            views.append((self.filtered[k], vocabulary_filter(corpus, vocabulary)))
+        for stats, corpus in views:
+            stats.ntokens = corpus.ntokens
+            for cre_stats, CRE in zip((stats.Pre, stats.Suf), corpus.cre()):
+                CRE = CRE[CRE > 0].astype(np.int64)
+                self.db.executemany("INSERT INTO cre VALUES (?, ?, ?, ?)",
+                                    zip([cre_stats.view] * len(CRE), [cre_stats.position] * len(CRE), CRE.index.astype(str),
+                                        CRE.tolist()))
+                cre_stats.ntypes, cre_stats.total = len(CRE), int(CRE.sum())
+                cre_stats.squares, cre_stats.tri = int((CRE * CRE).sum()), int((CRE == 1).sum())
+        for position, morphemes in (("Pre", vocabulary.prefixes), ("Suf", vocabulary.suffixes)):
+            self.db.executemany("INSERT INTO shared VALUES (?, ?)", zip([position] * len(morphemes), morphemes.astype(str)))
+        self.nshared = [len(vocabulary.prefixes), len(vocabulary.suffixes)]
+        self.new = False
+
+    # Only the lines added to a file since the last update are read: the state keeps the position (in bytes) where the
+    # last complete line ended, and a hash of the bytes before it, to check that the file was not changed in between
+    def update_file(self, k, txtfile):
+        """Read the lines appended to txtfile since the last update and add their tokens to sample k; return the tokens."""
+        data = self.read_lines(k, txtfile)
+        self.append(k, data)
+        return int(data["count"].sum())
+
+    def read_lines(self, k, txtfile):
+        """Return the "prefix","suffix","count" table of the lines appended to txtfile (sample k) since the last update."""
+        state = self.files[k]
+        offset = 0
+        if state is not None and state["path"] == os.path.abspath(txtfile) and file_tail(txtfile, state["offset"]) == state["tail"]:
+            offset = state["offset"]
+        elif state is not None:
+            raise ValueError(txtfile + " is not the file of sample " + str(k + 1) + " with some lines appended: start a new state")
+        with open(txtfile, "rb") as f:
+            f.seek(offset)
+            new = f.read()
+        # only complete lines are read; the rest is read in the next update
+        end = new.rfind(b"\n") + 1
+        # the lines are numbered from the first line of the file in the report of malformed lines
+        lines = state.get("lines", 0) if offset > 0 else 0
+        tokenizer = Tokenizer()
+        pair_pre, pair_suf, pair_freq = tokenizer.count_pairs(np.frombuffer(new, dtype=np.uint8, count=end), lines + 1)
+        report_malformed(txtfile, tokenizer.malformed)
+        self.files[k] = {"path": os.path.abspath(txtfile), "offset": offset + end, "tail": file_tail(txtfile, offset + end),
+                         "lines": lines + new.count(b"\n", 0, end)}
+        return construction_table(tokenizer, pair_pre, pair_suf, pair_freq, self.normalization)
+
+    def results_table(self):
+        """Return the rows 'None' and 'Lexical' of the summary table (as in build_results_table)."""
+        rows = []
+        for k, sample in enumerate(self.samples):
+            stats = sample.stats
+            rows.append(['None', k + 1, 'Prefix/Suffix', stats.Pre, stats.ntokens, stats.Suf.ntypes])
+            rows.append(['None', k + 1, 'Suffix/Prefix', stats.Suf, stats.ntokens, stats.Pre.ntypes])
+        for k, filtered in enumerate(self.filtered):
+            # the Types column follows the layout of the original table (shared prefixes for Sample 1, shared suffixes for Sample 2)
+            rows.append(['Lexical', k + 1, 'Prefix/Suffix', filtered.Pre, filtered.ntokens, self.nshared[k]])
+            rows.append(['Lexical', k + 1, 'Suffix/Prefix', filtered.Suf, filtered.ntokens, self.nshared[k]])
+        ResultsTable = pd.DataFrame(columns=['Control','Sample','Analysis','CRE','sd','Tokens','Types','TRI', 'TRI%'])
+        for control, sample, analysis, stats, ntokens, ntypes in rows:
+            CRE, sd, ntypes_stats, TRI, TRI_percent = stats.summary()
+            ResultsTable.loc[len(ResultsTable)] = [control, sample, analysis, CRE, sd, ntokens, ntypes, TRI, TRI_percent]
+        return ResultsTable
+
+    # The sums and the position reached in every file are written with the rows changed since the last save, in the
+    # same transaction
+    def save(self):
+        """Write the changes of the state in its database."""
+        meta = {"version": STATE_VERSION, "normalization": self.normalization, "files": self.files,
+                "samples": [sample.stats.sums() for sample in self.samples],
+                "filtered": [filtered.sums() for filtered in self.filtered], "shared": self.nshared}
+        self.db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [(key, json.dumps(value)) for key, value in meta.items()])
+        self.db.commit()
+
+    def close(self):
+        """Close the database of the state (the changes not saved are lost)."""
+        self.db.close()
+
+    @classmethod
+    def load(cls, directory):
+        """Return the IncrementalComparison kept in a directory (STATE_DIR/state.sqlite)."""
+        path = os.path.join(directory, STATE_FILE)
+        if not os.path.isfile(path):
+            raise FileNotFoundError("no state in " + directory)
+        return cls(path)
+
+def file_tail(txtfile, offset, size=4096):
+    """Return a hash of the size bytes of a file before offset."""
+    with open(txtfile, "rb") as f:
+        f.seek(max(offset - size, 0))
+        return hashlib.sha256(f.read(min(offset, size))).hexdigest()
+
+# Update (or create) the state of two files in state_dir with the lines appended to them since the last update
+# The normalization of a state cannot change (the counts already kept were normalized with it)
+# The database is closed when the update is saved; the sums (and results_table) are still available
+def update_state(state_dir, txtfile1, txtfile2, normalization="ascii"):
+    """Return the IncrementalComparison of two files after reading their new lines, and save it in state_dir."""
+    if os.path.isfile(os.path.join(state_dir, STATE_FILE)):
+        comparison = IncrementalComparison.load(state_dir)
+        if comparison.normalization != normalization:
+            comparison.close()
+            raise ValueError("the state in " + state_dir + " uses --normalization " + comparison.normalization +
+                             ", not " + normalization + ": use the same normalization or start a new state")
+    else:
+        os.makedirs(state_dir, exist_ok=True)
+        comparison = IncrementalComparison(os.path.join(state_dir, STATE_FILE), normalization)
+    try:
+        tables = [comparison.read_lines(k, txtfile) for k, txtfile in enumerate((txtfile1, txtfile2))]
+        if comparison.new:
+            comparison.initialize(tables)
+        else:
+            for k, data in enumerate(tables):
+                comparison.append(k, data)
+        for k, (txtfile, data) in enumerate(zip((txtfile1, txtfile2), tables)):
+            print('New tokens in Sample ' + str(k + 1) + ' (' + txtfile + '): ' + str(int(data["count"].sum())))
+        comparison.save()
+    finally:
+        comparison.close()
+    return comparison
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+{05.d} Tests of the difference between the samples: permutation test and bootstrap interval for the difference in
+CRE and TRI after controlling for vocabulary
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# {05.d} Tests of the difference in CRE and TRI between the samples
+# =============================================================================
+
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import namedtuple to keep the table of the tests with its parameters
+# https://docs.python.org/3/library/collections.html
+from collections import namedtuple
+
+from .resampling import derived_seed, draw_counts, encode_corpus, iteration_generators, seen_cre
+
+
+# The statistics compared are the mean CRE and the TRI of prefixes and of suffixes (the columns CRE and TRI of the rows
+# Prefix/Suffix and Suffix/Prefix of summary_table.csv), and the difference is always Sample 2 - Sample 1
+STATISTICS = [('Prefix/Suffix', 'CRE'), ('Suffix/Prefix', 'CRE'), ('Prefix/Suffix', 'TRI'), ('Suffix/Prefix', 'TRI')]
+
+# Both filtered samples are written with the codes of the shared vocabulary, over the construction types of both
+def paired_counts(FILT_1, FILT_2, vocabulary):
+    """Return the prefix/suffix codes of the construction types of both samples and the number of tokens of each in every sample."""
+    encoded = [encode_corpus(FILT, vocabulary) for FILT in (FILT_1, FILT_2)]
+    nsuf = len(vocabulary.suffixes)
+    keys = [pair_pre * nsuf + pair_suf for pair_pre, pair_suf, pair_freq, pre_vocab, suf_vocab in encoded]
+    pairs = np.unique(np.concatenate(keys))
+    counts = []
+    for key, (pair_pre, pair_suf, pair_freq, pre_vocab, suf_vocab) in zip(keys, encoded):
+        freq = np.zeros(len(pairs), dtype=np.int64)
+        freq[np.searchsorted(pairs, key)] = pair_freq
+        counts.append(freq)
+    return pairs // nsuf, pairs % nsuf, counts[0], counts[1]
+
+# Every replicate is an array with the number of tokens of every construction type, so the CRE of every morpheme in
+# a whole batch of replicates is computed at once (as the iterations of {04}, see seen_cre)
+def count_statistics(counts, pair_pre, pair_suf, npre, nsuf):
+    """Return an array (replicates x 4) with the mean CRE and TRI of prefixes and suffixes of every row of counts."""
+    iters, pairs = np.nonzero(counts)
+    values = []
+    for CRE in seen_cre(iters, pairs, pair_pre, pair_suf, npre, nsuf, len(counts)):
+        ntypes = (CRE > 0).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values += [CRE.sum(axis=1) / ntypes, (CRE == 1).sum(axis=1) / ntypes]
+    CRE_Pre, TRI_Pre, CRE_Suf, TRI_Suf = values
+    return np.column_stack([CRE_Pre, CRE_Suf, TRI_Pre, TRI_Suf])
+
+# Permutation test: the tokens of both samples are pooled and split again at random into two samples of the same sizes,
+# so the differences of the replicates are the differences expected if both samples came from the same population.
+# In count space, the tokens of the first sample are a multivariate hypergeometric draw from the pooled counts
+# Bootstrap: the tokens of every sample are drawn again with replacement (multinomial), and the interval is the basic
+# bootstrap interval (2 * observed - upper quantile, 2 * observed - lower quantile of the differences of the replicates,
+# Davison & Hinkley 1997, eq. 5.6). Tokens drawn with replacement repeat, so the replicates find fewer types and their
+# CRE is lower than the observed one: the basic interval reflects that bias around the observed difference, where the
+# percentile interval would keep it. Its coverage is approximate (below the nominal level for small samples), and the
+# permutation p-value is the test of the difference
+# Every replicate has its own random generator (as the iterations of {04}), so the results do not depend on the batches
+DifferenceTests = namedtuple("DifferenceTests", ["Table", "replicates", "confidence", "seed"])
+
+def difference_tests(FILT_1, FILT_2, vocabulary, replicates=1000, seed=None, confidence=0.95, batch_counts=4000000):
+    """Return the DifferenceTests: difference (Sample 2 - Sample 1) in CRE and TRI, permutation p-value and bootstrap interval."""
+    pair_pre, pair_suf, freq1, freq2 = paired_counts(FILT_1, FILT_2, vocabulary)
+    npre, nsuf = len(vocabulary.prefixes), len(vocabulary.suffixes)
+    n1, n2 = int(freq1.sum()), int(freq2.sum())
+    pooled = freq1 + freq2
+    observed = count_statistics(np.vstack([freq1, freq2]), pair_pre, pair_suf, npre, nsuf)
+    difference = observed[1] - observed[0]
+    entropy = np.random.SeedSequence(seed).entropy
+    permutation_seed = derived_seed(entropy, "permutation")
+    bootstrap_seed = derived_seed(entropy, "bootstrap")
+    batch = max(1, batch_counts // max(len(pooled), 1))
+    permuted = []
+    bootstrapped = []
+    for start in range(0, replicates, batch):
+        stop = min(start + batch, replicates)
+        first = draw_counts(iteration_generators(permutation_seed, start, stop), pooled, n1)
+        permuted.append(count_statistics(pooled - first, pair_pre, pair_suf, npre, nsuf) -
+                        count_statistics(first, pair_pre, pair_suf, npre, nsuf))
+        generators = iteration_generators(bootstrap_seed, start, stop)
+        # the generator of every replicate draws Sample 1 and then Sample 2
+        draws1 = np.empty((stop - start, len(pooled)), dtype=np.int64)
+        draws2 = np.empty((stop - start, len(pooled)), dtype=np.int64)
+        for row, rng in enumerate(generators):
+            draws1[row] = draw_counts([rng], freq1, n1, replace=True)[0]
+            draws2[row] = draw_counts([rng], freq2, n2, replace=True)[0]
+        bootstrapped.append(count_statistics(draws2, pair_pre, pair_suf, npre, nsuf) -
+                            count_statistics(draws1, pair_pre, pair_suf, npre, nsuf))
+    permuted = np.concatenate(permuted)
+    bootstrapped = np.concatenate(bootstrapped)
+    # two-sided p-value: the proportion of replicates with a difference at least as large as the observed one
+    # (the observed split counts as one of the replicates, so the p-value is never 0)
+    extreme = (np.abs(permuted) >= np.abs(difference)) | np.isclose(np.abs(permuted), np.abs(difference))
+    p_value = (1 + extreme.sum(axis=0)) / (1 + replicates)
+    alpha = (1 - confidence) / 2
+    quantile_low, quantile_high = np.nanquantile(bootstrapped, [alpha, 1 - alpha], axis=0)
+    low, high = 2 * difference - quantile_high, 2 * difference - quantile_low
+    Table = pd.DataFrame({"Analysis": [analysis for analysis, statistic in STATISTICS],
+                          "Statistic": [statistic for analysis, statistic in STATISTICS],
+                          "Sample1": observed[0], "Sample2": observed[1], "Difference": difference,
+                          "p_permutation": p_value, "CI_low": low, "CI_high": high})
+    return DifferenceTests(Table, replicates, confidence, entropy)
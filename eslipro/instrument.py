@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Run report: wall time, CPU time, peak memory and counts of every section ({00}-{7}) of a comparison (run_manifest.json)
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# Run report of the sections {00}-{7}
+# =============================================================================
+
+# Import os to measure the CPU time (also of the worker processes) and os.path to write the manifest
+# https://docs.python.org/3/library/os.html
+import os
+import os.path
+# import sys to know how the operating system gives the peak memory
+# https://docs.python.org/3/library/sys.html
+import sys
+# import time to measure the wall time of every section and to date the run
+# https://docs.python.org/3/library/time.html
+import time
+# import json to write the manifest of the run
+# https://docs.python.org/3/library/json.html
+import json
+# import contextlib to run every section inside a "with" block
+# https://docs.python.org/3/library/contextlib.html
+import contextlib
+# import cProfile to profile one section when requested (--profile)
+# https://docs.python.org/3/library/profile.html
+import cProfile
+# import resource to read the peak memory of the process (it only exists on Unix: the peak memory is None elsewhere)
+# https://docs.python.org/3/library/resource.html
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Version of the format of run_manifest.json
+MANIFEST_VERSION = 1
+
+# The CPU time includes the worker processes of {04} (when they have finished), so it can be larger than the wall time
+def cpu_time():
+    """Return the CPU time (user and system) of the process and of its finished child processes, in seconds."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+# The peak memory is the largest resident set size (RSS) of the process since it started, so it never decreases from
+# one section to the next: the section where it grows is the one that needed the memory
+# With children, it is the largest peak of the worker processes that have finished (e.g. the pool of {04})
+def peak_rss(children=False):
+    """Return the peak resident memory of the process (or of its finished child processes) in MB (None when it cannot be known)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # in bytes on macOS, and in kilobytes on Linux
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+# On Linux, the peak resident memory of the process can be set back to its current memory (/proc/self/clear_refs), so
+# the peak of a stage can be measured from its start; elsewhere the peak of the process since it started is kept
+def reset_peak_rss():
+    """Set the peak resident memory of the process back to its current memory when possible; return True if it was."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+# Every section is run inside "with report.stage(...) as counts:", and the counts of what it processed (tokens, types,
+# constructions, iterations...) are added to the dict counts
+# One section can be profiled: with cProfile (profile=section), or with any other profiler given as a hook, a function
+# that receives the name of every section and returns a context manager to run it in (or None), e.g. to start and stop
+# a sampling profiler
+class RunReport:
+    """Wall time, CPU time, peak memory and counts of the sections of a run."""
+
+    def __init__(self, profile=None, hook=None):
+        self.profile = profile
+        self.hook = hook
+        self.profiler = None
+        self.stages = []
+        self.created = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.wall = time.perf_counter()
+        self.cpu = cpu_time()
+
+    @contextlib.contextmanager
+    def stage(self, stage, description):
+        """Measure the section run inside the with block; the dict it yields takes the counts of the section."""
+        counts = {}
+        context = self.hook(stage) if self.hook is not None else None
+        wall, cpu = time.perf_counter(), cpu_time()
+        with context if context is not None else contextlib.nullcontext():
+            if stage == self.profile:
+                self.profiler = cProfile.Profile()
+                self.profiler.enable()
+            try:
+                yield counts
+            finally:
+                if stage == self.profile:
+                    self.profiler.disable()
+                self.stages.append({"stage": stage, "description": description,
+                                    "wall_seconds": time.perf_counter() - wall, "cpu_seconds": cpu_time() - cpu,
+                                    "peak_rss_mb": peak_rss(), "counts": counts})
+
+    def totals(self):
+        """Return the wall time, CPU time and peak memory of the whole run until now."""
+        return {"wall_seconds": time.perf_counter() - self.wall, "cpu_seconds": cpu_time() - self.cpu, "peak_rss_mb": peak_rss()}
+
+    def summary(self):
+        """Return the one-line summary of the run: total time and peak memory, and the time of every section."""
+        totals = self.totals()
+        peak = '' if totals["peak_rss_mb"] is None else ', peak memory ' + format(totals["peak_rss_mb"], '.0f') + ' MB'
+        return ('Run: ' + format(totals["wall_seconds"], '.2f') + ' s (CPU ' + format(totals["cpu_seconds"], '.2f') + ' s)' + peak +
+                '; ' + ', '.join('{' + stage["stage"] + '} ' + format(stage["wall_seconds"], '.2f') + ' s' for stage in self.stages))
+
+    def manifest(self, **parameters):
+        """Return the manifest of the run: the parameters, the totals and every section."""
+        return {"version": MANIFEST_VERSION, "created": self.created, "parameters": parameters,
+                "totals": self.totals(), "stages": self.stages}
+
+# The manifest is written next to summary_table.csv, and the profile of the section (if any) as profile_SECTION.prof,
+# to be read with pstats or snakeviz
+def write_manifest(report, output_dir=".", **parameters):
+    """Write run_manifest.json (and the profile of the profiled section) in output_dir."""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'run_manifest.json'), 'w') as f:
+        json.dump(report.manifest(**parameters), f, indent=1, default=str)
+    if report.profiler is not None:
+        report.profiler.dump_stats(os.path.join(output_dir, 'profile_' + report.profile + '.prof'))
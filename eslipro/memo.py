@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Cache of results: the Comparison of two samples ({01}-{05}) kept on disk, keyed by the contents of both samples and
+the parameters of the analysis, so a report can be written again without computing anything
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# Cache of results of {01}-{05}
+# =============================================================================
+
+# Import os and os.path to find the entries of the cache and to update the time of their last use
+# https://docs.python.org/3/library/os.html
+import os
+import os.path
+# import hashlib, json, pickle, shutil, tempfile and time to write, read and remove the entries of the cache
+# https://docs.python.org/3/library/pickle.html
+import hashlib
+import json
+import pickle
+import shutil
+import tempfile
+import time
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+
+
+# Version of the entries of the cache of results: entries of another version are never used
+RESULT_CACHE_VERSION = 3
+
+# The entries of the results are kept in the subdirectory results of the cache of samples (see {00.b} in eslipro/corpus.py)
+RESULTS_DIR = "results"
+
+# A sample is identified by its contents after the normalization (prefixes, suffixes and number of tokens of every
+# construction type), so the key of a result changes as soon as a file changes, whatever its name
+def corpus_fingerprint(corpus):
+    """Return a hash of the contents of a Corpus."""
+    digest = hashlib.sha256()
+    for morphemes in (corpus.prefixes, corpus.suffixes):
+        digest.update("\n".join(map(str, morphemes)).encode("utf-8"))
+        digest.update(b"\0")
+    for array in (corpus.matrix.indptr, corpus.matrix.indices, corpus.matrix.data):
+        digest.update(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+# Only the parameters that change the results are part of the key (not the output directory, the names of the files,
+# or the number of workers, which never changes the results)
+def result_key(corpus1, corpus2, **parameters):
+    """Return the key of the Comparison of two Corpus objects with the given parameters of the analysis."""
+    digest = hashlib.sha256()
+    digest.update(("eslipro-results-%d\n" % RESULT_CACHE_VERSION).encode())
+    digest.update(corpus_fingerprint(corpus1).encode() + b"\n" + corpus_fingerprint(corpus2).encode() + b"\n")
+    digest.update(json.dumps(parameters, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:32]
+
+# Without a seed, the random samples of {04} are different in every run, so they are not kept, nor are the runs that
+# write every iteration (--iterations-out), because those files are written by {04}. The exact mode has no random
+# samples, but the replicates of --tests ({05.d}) and the chains of --best ({05.e}) are random: without a seed, an
+# exact run is only kept when neither of them was requested
+def cacheable(mode, seed, iteration_files=None, tests=0, best=False):
+    """Return True when the Comparison of a run can be kept in (and taken from) the cache."""
+    deterministic = mode == "exact" and tests == 0 and not best
+    return (deterministic or seed is not None) and iteration_files is None
+
+# Both samples are not kept with the result (they are already in the cache of samples, and they are given again when the
+# result is used), so an entry only has the tables of CRE, the filtered samples and Sample 3
+# The time of the last use of every entry is the modification time of its meta.json, updated at every use
+def load_result(cache_dir, key, data1, data2, names):
+    """Return the Comparison kept with key (with the samples data1 and data2 and names), or None when it is not in the cache."""
+    entry = os.path.join(cache_dir, RESULTS_DIR, key)
+    try:
+        with open(os.path.join(entry, "comparison.pickle"), "rb") as f:
+            comparison = pickle.load(f)
+        os.utime(os.path.join(entry, "meta.json"))
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    return comparison._replace(names=tuple(names), data1=data1, data2=data2)
+
+def store_result(cache_dir, key, comparison, max_bytes=None, **parameters):
+    """Keep a Comparison in the cache with key (written in a temporary directory first), then trim the cache to max_bytes."""
+    results = os.path.join(cache_dir, RESULTS_DIR)
+    os.makedirs(results, exist_ok=True)
+    tmpdir = tempfile.mkdtemp(dir=results, prefix=".tmp-")
+    with open(os.path.join(tmpdir, "comparison.pickle"), "wb") as f:
+        pickle.dump(comparison._replace(data1=None, data2=None), f, protocol=pickle.HIGHEST_PROTOCOL)
+    meta = {"key": key, "version": RESULT_CACHE_VERSION, "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "names": list(comparison.names), "parameters": parameters}
+    with open(os.path.join(tmpdir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=1, default=str)
+    try:
+        os.replace(tmpdir, os.path.join(results, key))
+    except OSError:
+        # another run stored the same entry in the meantime
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    if max_bytes is not None:
+        trim_cache(cache_dir, max_bytes)
+
+
+# The size of the cache is limited: when it is larger than max_bytes, the entries used the longest time ago (samples and
+# results) are removed until it fits (least recently used, LRU)
+def directory_bytes(directory):
+    """Return the size of the files of a directory."""
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+def cache_usage(cache_dir):
+    """Return the (last use, bytes, path) of every entry of the cache, samples and results."""
+    entries = []
+    for parent in (cache_dir, os.path.join(cache_dir, RESULTS_DIR)):
+        if not os.path.isdir(parent):
+            continue
+        for name in os.listdir(parent):
+            metafile = os.path.join(parent, name, "meta.json")
+            if os.path.isfile(metafile):
+                entries.append((os.path.getmtime(metafile), directory_bytes(os.path.join(parent, name)), os.path.join(parent, name)))
+    return sorted(entries)
+
+def trim_cache(cache_dir, max_bytes):
+    """Remove the least recently used entries of the cache until its size is at most max_bytes; return the paths removed."""
+    entries = cache_usage(cache_dir)
+    total = sum(size for used, size, path in entries)
+    removed = []
+    for used, size, path in entries:
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed.append(path)
+    return removed
+
+def result_entries(cache_dir):
+    """Return the description (meta.json) of every result in the cache."""
+    results = os.path.join(cache_dir, RESULTS_DIR)
+    entries = []
+    for used, size, path in cache_usage(cache_dir):
+        if os.path.dirname(path) == results:
+            with open(os.path.join(path, "meta.json")) as f:
+                meta = json.load(f)
+            meta["bytes"] = size
+            entries.append(meta)
+    return entries
+
+def evict_results(cache_dir, keys=None):
+    """Remove the given results from the cache (all of them when keys is None) and return the keys removed."""
+    if keys is None:
+        keys = [meta["key"] for meta in result_entries(cache_dir)]
+    removed = []
+    for key in keys:
+        entry = os.path.join(cache_dir, RESULTS_DIR, os.path.basename(key))
+        if os.path.isdir(entry):
+            shutil.rmtree(entry, ignore_errors=True)
+            removed.append(key)
+    return removed
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+N-way comparison: any number of samples, controlled for the vocabulary shared by all of them and for the size of the
+smallest one
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# N-way comparison of several samples
+# =============================================================================
+
+# Import os.path to write the outputs in the output directory
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import namedtuple to keep the results of every stage together
+# https://docs.python.org/3/library/collections.html
+from collections import namedtuple
+
+from .cre import compute_cre, cre_summary
+from .vocabulary import shared_vocabulary, vocabulary_filter
+from .resampling import derived_seed
+from .analysis import resample, sample3_types
+from .outputs import write_table
+
+
+# The same stages as the comparison of two samples ({01}-{05}), for every sample k = 1..N:
+# {01}/{02} CRE and TRI of every sample, {03} the vocabulary found in all the samples, and {04} every sample larger than
+# the smallest one (after the vocabulary control) reduced to its size. The smallest sample is not resampled, so its
+# values after both controls are its values after the vocabulary control
+NWayComparison = namedtuple("NWayComparison", ["names", "mode", "corpora", "cres", "vocabulary", "filtered",
+                                               "cres_filtered", "size", "samples3", "entropy"])
+
+# The seed of a sample is derived from its file name, so a.txt and ./a.txt (or the same file given from another working
+# directory) are resampled the same way; two files with the same name in different directories use their whole paths
+def seed_names(names):
+    """Return the name the seed of every sample is derived from (by name of the sample)."""
+    basenames = [os.path.basename(os.path.normpath(name)) for name in names]
+    return {name: basename if basenames.count(basename) == 1 else os.path.normpath(name)
+            for name, basename in zip(names, basenames)}
+
+def compare_many(corpora, mode="montecarlo", numiter=1000, seed=None, workers=1, quantiles=(), sampler="tokens"):
+    """Return the NWayComparison of a dict of Corpus objects (by name), controlled for vocabulary and sample size."""
+    names = list(corpora)
+    cres = {name: compute_cre(corpora[name], k) for k, name in enumerate(names, 1)}
+    # {03} a single vocabulary, found in all the samples
+    vocabulary = shared_vocabulary(*corpora.values())
+    filtered = {name: vocabulary_filter(corpora[name], vocabulary) for name in names}
+    cres_filtered = {name: compute_cre(filtered[name], k) for k, name in enumerate(names, 1)}
+    # {04} every sample is reduced to the size of the smallest one after the vocabulary control
+    # (each sample gets its own seed, derived from the master seed and its file name)
+    size = min(corpus.ntokens for corpus in filtered.values())
+    entropy = np.random.SeedSequence(seed).entropy
+    seeds = seed_names(names)
+    samples3 = {}
+    for number, name in enumerate(names, 1):
+        if filtered[name].ntokens > size:
+            print('sample: ' + str(number) + ' of ' + str(len(names)) + ' (' + name + ')')
+            samples3[name] = resample(filtered[name], size, mode=mode, numiter=numiter,
+                                      seed=derived_seed(entropy, seeds[name]) if mode == "montecarlo" else None,
+                                      workers=workers, quantiles=quantiles, vocabulary=vocabulary, progress=False,
+                                      sampler=sampler)
+    return NWayComparison(names, mode, corpora, cres, vocabulary, filtered, cres_filtered, size, samples3, entropy)
+
+# The results table has the same columns as summary_table.csv, with the name of every sample:
+# Control None (before any control), Lexical (after the vocabulary control) and Both (vocabulary and sample size)
+# The Types column is the number of partners (suffixes for Prefix/Suffix, prefixes for Suffix/Prefix)
+def build_nway_table(comparison):
+    """Return the results table of an NWayComparison, with two rows per sample and control."""
+    c = comparison
+    rows = []
+    for k, name in enumerate(c.names, 1):
+        both = c.samples3[name].cre if name in c.samples3 else c.cres_filtered[name]
+        # in the exact mode, TRI of a resampled sample is divided by the expected numbers of morphemes drawn
+        types = sample3_types(c.samples3[name]) if name in c.samples3 else (None, None)
+        for control, cre, ntokens, (ntypes_Pre, ntypes_Suf) in (
+                ('None', c.cres[name], c.corpora[name].ntokens, (None, None)),
+                ('Lexical', c.cres_filtered[name], c.filtered[name].ntokens, (None, None)),
+                ('Both', both, c.size, types)):
+            for analysis, table, count_Tri, partners, ntypes_Tri in (('Prefix/Suffix', cre.Pre, cre.count_Tri_Pre, cre.Suf, ntypes_Pre),
+                                                                     ('Suffix/Prefix', cre.Suf, cre.count_Tri_Suf, cre.Pre, ntypes_Suf)):
+                CRE, sd, ntypes, TRI, TRI_percent = cre_summary(table, count_Tri, ntypes_Tri)
+                rows.append([name, control, k, analysis, CRE, sd, ntokens, len(partners), TRI, TRI_percent])
+    return pd.DataFrame(rows, columns=['Name', 'Control', 'Sample', 'Analysis', 'CRE', 'sd', 'Tokens', 'Types', 'TRI', 'TRI%'])
+
+def nway_feedback_text(comparison):
+    """Return the text of feedback_file.txt for an NWayComparison."""
+    c = comparison
+    msg_sep = "————————————————————————————————————————————————————————————————————" + "\r\n"
+    msg = msg_sep
+    for k, name in enumerate(c.names, 1):
+        msg += ("Sample " + str(k) + " is " + name + ": " + str(c.corpora[name].ntokens) + " tokens, " +
+                str(len(c.corpora[name].prefixes)) + " prefix types, " + str(len(c.corpora[name].suffixes)) + " suffix types" + "\r\n")
+    msg += 'Shared prefixes between all samples: ' + "\r\n" + str(c.vocabulary.prefixes.tolist()) + "\r\n"
+    msg += 'Shared sufffixes between all samples: ' + "\r\n" + str(c.vocabulary.suffixes.tolist()) + "\r\n"
+    for k, name in enumerate(c.names, 1):
+        msg += ("After filtering Sample " + str(k) + " with the lexical items of all samples, the number of tokens is now " +
+                str(c.filtered[name].ntokens) + "\r\n")
+    msg += 'Number of tokens in the samples extracted from the larger samples: ' + str(c.size) + "\r\n"
+    if c.mode == "montecarlo":
+        msg += 'Seed used for the random samples (--seed): ' + str(c.entropy) + "\r\n"
+    msg += msg_sep + "\r\n"
+    msg += 'Values of Creativity [CRE] and Triteness [TRI] of every sample (see summary_table.csv):' + "\r\n"
+    msg += build_nway_table(c).to_string(index=False) + "\r\n" + msg_sep
+    return msg
+
+def write_nway_outputs(comparison, output_dir=".", output_format="csv"):
+    """Write the feedback file, results_creativity.csv and summary_table.csv (or another format) of an NWayComparison in output_dir."""
+    c = comparison
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'feedback_file.txt'), 'w') as f:
+        f.write(nway_feedback_text(c))
+    #CRE of every morpheme of every sample, before any control (None) and after both controls (Both)
+    tables = []
+    for name in c.names:
+        both = c.samples3[name].cre if name in c.samples3 else c.cres_filtered[name]
+        for control, cre in (('None', c.cres[name]), ('Both', both)):
+            for table in (cre.Pre, cre.Suf):
+                tables.append(table.astype({'CRE': object}).drop(columns='Sample').assign(Name=name, Control=control))
+    Creativity = pd.concat(tables, axis=0)[['Name', 'Control', 'Position', 'Morpheme', 'CRE']]
+    write_table(Creativity, output_dir, 'results_creativity', output_format)
+    write_table(build_nway_table(c), output_dir, 'summary_table', output_format, index=True)
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+{7} Formats of the output tables: csv, compressed NumPy archives (npz), Parquet and Feather (Arrow)
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# {7} Formats of the output tables
+# =============================================================================
+
+# Import os.path to name the outputs in the output directory
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import zipfile to add the blocks of iterations to a compressed NumPy archive while the iterations run, and json to
+# keep their vocabulary in the parquet and feather files
+# https://docs.python.org/3/library/zipfile.html
+import zipfile
+import json
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+
+
+# Every format and the extension of its files. Parquet and Feather need pyarrow, which is only imported when one of them
+# is chosen (https://arrow.apache.org/docs/python/)
+FORMATS = {"csv": ".csv", "npz": ".npz", "parquet": ".parquet", "feather": ".feather"}
+
+def output_path(output_dir, name, output_format="csv"):
+    """Return the path of the output name (e.g. "summary_table") in output_dir, with the extension of the format."""
+    return os.path.join(output_dir, name + FORMATS[output_format])
+
+def import_pyarrow():
+    """Return the modules pyarrow, pyarrow.parquet and pyarrow.ipc, with a clear error when pyarrow is not installed."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.ipc
+    except ImportError:
+        raise ImportError('the formats parquet and feather need pyarrow (pip install pyarrow)') from None
+    return pyarrow, pyarrow.parquet, pyarrow.ipc
+
+# The columns of the tables become arrays of an npz file: the columns with mixed values (e.g. the CRE of
+# results_creativity.csv, integers for Samples 1 and 2 and means for Sample 3) are written as numbers, and the text
+# columns as unicode arrays, so the archive is read without pickle (np.load(path))
+def table_arrays(Table):
+    """Return the columns of a table as a dict of arrays that can be saved without pickle."""
+    arrays = {}
+    for column in Table.columns:
+        values = Table[column]
+        if not isinstance(values.dtype, np.dtype) or values.dtype == object:
+            try:
+                values = pd.to_numeric(values)
+            except (ValueError, TypeError):
+                arrays[str(column)] = np.asarray(values.astype(str), dtype=str)
+                continue
+        # the nullable integers (e.g. Iterations, empty in some rows) are written as floats with NaN
+        arrays[str(column)] = values.to_numpy() if isinstance(values.dtype, np.dtype) else values.to_numpy(dtype=float, na_value=np.nan)
+    return arrays
+
+def write_table(Table, output_dir, name, output_format="csv", index=False):
+    """Write a table as output_dir/name in the format (the index is kept as its first column when index is True)."""
+    path = output_path(output_dir, name, output_format)
+    if output_format == "csv":
+        Table.to_csv(path, header=True, index=index)
+        return path
+    if index:
+        Table = Table.reset_index(names=Table.index.name or "")
+    if output_format == "npz":
+        np.savez_compressed(path, **table_arrays(Table))
+    elif output_format == "parquet":
+        import_pyarrow()
+        Table.to_parquet(path, index=False, compression="zstd")
+    elif output_format == "feather":
+        import_pyarrow()
+        Table.reset_index(drop=True).to_feather(path, compression="zstd")
+    else:
+        raise ValueError('output_format must be one of ' + ', '.join(FORMATS) + ', not ' + repr(output_format))
+    return path
+
+
+# The CRE of every morpheme in every iteration (--iterations-out) is a dense matrix (iterations x morphemes) of small
+# integers (CRE = 0 when the morpheme was not drawn), of the smallest type that holds the largest possible CRE, and the
+# morphemes are kept once, as the vocabulary of its columns. The rows are added as every block of iterations finishes:
+# npz: the archive has vocabulary.npy and one member rows_FIRST.npy for every block (the iterations FIRST, FIRST + 1...),
+#      read as one matrix with read_iterations
+# parquet and feather: a column Iteration and one column CRE_MORPHEME per morpheme (so a morpheme named Iteration is
+#      another column), written one row group (or record batch) per block; the vocabulary is kept in the metadata of the
+#      schema (JSON list), and read_iterations reads it from there
+class IterationWriter:
+    """Write the CRE of every morpheme in every iteration as a dense matrix, one block of iterations at a time."""
+
+    def __init__(self, path, vocab, maxcre, output_format):
+        self.path = path
+        self.output_format = output_format
+        self.vocab = [str(morpheme) for morpheme in vocab]
+        self.dtype = np.min_scalar_type(max(int(np.max(maxcre, initial=0)), 1))
+        self.done = 0
+        if output_format == "npz":
+            self.archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+            self.add_member("vocabulary", np.array(self.vocab, dtype=str))
+        elif output_format in ("parquet", "feather"):
+            pa, pq, ipc = import_pyarrow()
+            self.pa = pa
+            self.schema = pa.schema([("Iteration", pa.int64())] +
+                                    [("CRE_" + morpheme, pa.from_numpy_dtype(self.dtype)) for morpheme in self.vocab],
+                                    metadata={"vocabulary": json.dumps(self.vocab)})
+            if output_format == "parquet":
+                self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+            else:
+                self.writer = ipc.new_file(path, self.schema, options=ipc.IpcWriteOptions(compression="zstd"))
+        else:
+            raise ValueError('the iterations are written as npz, parquet or feather, not ' + repr(output_format))
+
+    def add_member(self, name, array):
+        """Add an array to the npz archive as name.npy."""
+        with self.archive.open(name + ".npy", "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+
+    def write(self, Long, stop):
+        """Add the iterations done..stop-1, given as a list of (iteration, morpheme code, CRE) arrays, to the file."""
+        rows = np.zeros((stop - self.done, len(self.vocab)), dtype=self.dtype)
+        for iters, morphs, CRE in Long:
+            rows[iters - self.done, morphs] = CRE
+        if self.output_format == "npz":
+            self.add_member("rows_%012d" % self.done, rows)
+        else:
+            columns = [self.pa.array(np.arange(self.done, stop, dtype=np.int64))] + [self.pa.array(rows[:, j]) for j in range(rows.shape[1])]
+            self.writer.write_table(self.pa.Table.from_arrays(columns, schema=self.schema))
+        self.done = stop
+
+    def close(self):
+        """Finish the file."""
+        if self.output_format == "npz":
+            self.archive.close()
+        else:
+            self.writer.close()
+
+def read_iterations(path):
+    """Return the matrix (iterations x morphemes) of CRE and the vocabulary of an iterations file (npz, parquet or feather)."""
+    if path.endswith(".npz"):
+        with np.load(path) as archive:
+            blocks = sorted(name for name in archive.files if name.startswith("rows_"))
+            vocab = archive["vocabulary"]
+            matrix = np.concatenate([archive[name] for name in blocks]) if blocks else np.zeros((0, len(vocab)), dtype=np.uint8)
+        return matrix, pd.Index(vocab)
+    pa, pq, ipc = import_pyarrow()
+    if path.endswith(".parquet"):
+        Table, schema = pd.read_parquet(path), pq.read_schema(path)
+    else:
+        Table, schema = pd.read_feather(path), ipc.open_file(path).schema
+    vocab = json.loads(schema.metadata[b"vocabulary"])
+    return Table.drop(columns="Iteration").to_numpy(), pd.Index(vocab)
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+{00.d} Functions for the random samples of Sample 3 (Monte Carlo engine)
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# {00.d} Functions for the random samples of Sample 3
+# =============================================================================
+
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import hashlib to derive the seeds of several samples from the master seed
+# https://docs.python.org/3/library/hashlib.html
+import hashlib
+# import multiprocessing to split the iterations across several workers, sharing the corpus in memory
+# https://docs.python.org/3/library/multiprocessing.html
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+from .outputs import IterationWriter
+
+
+# The filtered sample is converted into integer codes only once: every construction type (e.g. a_x) gets a number,
+# and every construction type points to the number of its prefix and the number of its suffix (the cells of the matrix)
+# When the shared vocabulary of {03} is given, its codes are used for the prefixes and suffixes (see {00.f})
+def encode_corpus(corpus, vocabulary=None):
+    """Return the prefix/suffix codes and number of tokens of every construction, and the prefix/suffix vocabularies."""
+    pair_pre, pair_suf, pair_freq = corpus.pairs()
+    pre_vocab, suf_vocab = corpus.prefixes, corpus.suffixes
+    if vocabulary is not None:
+        pair_pre = vocabulary.prefixes.get_indexer(pre_vocab)[pair_pre].astype(np.int64)
+        pair_suf = vocabulary.suffixes.get_indexer(suf_vocab)[pair_suf].astype(np.int64)
+        pre_vocab, suf_vocab = vocabulary.prefixes, vocabulary.suffixes
+    return pair_pre, pair_suf, pair_freq, pre_vocab, suf_vocab
+
+# Every iteration has its own random generator: the i-th child of a single master seed (numpy SeedSequence)
+# In this way, the draws of an iteration are the same whatever the batch or the worker where it is computed
+def iteration_generators(entropy, start, stop):
+    """Return the random generators of iterations start..stop-1 for the master seed entropy."""
+    return [np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(i,))) for i in range(start, stop)]
+
+# When several samples are resampled in the same run (e.g. the pairs of --batch), every sample gets a seed derived from
+# the master seed and its names, so its results do not depend on the other samples of the run
+def derived_seed(entropy, *names):
+    """Return the seed of the random samples identified by names for the master seed entropy."""
+    key = int.from_bytes(hashlib.sha256("\0".join(names).encode()).digest()[:8], "little")
+    state = np.random.SeedSequence(entropy, spawn_key=(key,)).generate_state(4)
+    return int.from_bytes(state.tobytes(), "little")
+
+# Each iteration draws n tokens without replacement: a random key is given to every token and the n smallest keys are kept
+def draw_batch(generators, ntokens, n):
+    """Return an array (iterations x n) with the token positions drawn in every iteration."""
+    keys = np.empty((len(generators), ntokens))
+    for row, rng in enumerate(generators):
+        keys[row] = rng.random(ntokens)
+    if n >= ntokens:
+        return np.broadcast_to(np.arange(ntokens), (len(generators), ntokens))
+    return np.argpartition(keys, n - 1, axis=1)[:, :n]
+
+# With the count-space samplers, every iteration draws the number of tokens of every construction type directly from the
+# number of tokens of every construction type of the sample, so it costs O(construction types) instead of O(tokens):
+# "counts" draws n tokens without replacement (multivariate hypergeometric), as the token sampler does,
+# and "bootstrap" draws n tokens with replacement (multinomial)
+SAMPLERS = ("tokens", "counts", "bootstrap")
+
+def draw_counts(generators, pair_freq, n, replace=False):
+    """Return an array (iterations x constructions) with the number of tokens of every construction drawn in every iteration."""
+    counts = np.empty((len(generators), len(pair_freq)), dtype=np.int64)
+    ntokens = int(pair_freq.sum())
+    for row, rng in enumerate(generators):
+        if replace:
+            counts[row] = rng.multinomial(n, pair_freq / ntokens)
+        elif n >= ntokens:
+            counts[row] = pair_freq
+        else:
+            counts[row] = rng.multivariate_hypergeometric(pair_freq, n, method="marginals")
+    return counts
+
+# CRE for every iteration of a batch: the number of constructions per (iteration, prefix) and (iteration, suffix)
+# is counted with bincount, for the distinct (iteration, construction) pairs drawn
+def seen_cre(seen_iter, seen_pair, pair_pre, pair_suf, npre, nsuf, niter):
+    """Return two arrays (iterations x prefixes, iterations x suffixes) with the CRE of the (iteration, construction) pairs."""
+    CRE_Pre = np.bincount(seen_iter * npre + pair_pre[seen_pair], minlength=niter * npre).reshape(niter, npre)
+    CRE_Suf = np.bincount(seen_iter * nsuf + pair_suf[seen_pair], minlength=niter * nsuf).reshape(niter, nsuf)
+    return CRE_Pre, CRE_Suf
+
+# With the token sampler, the distinct (iteration, construction) pairs are found by sorting
+def batch_cre(pair_codes, pair_pre, pair_suf, npre, nsuf, draws):
+    """Return two arrays (iterations x prefixes, iterations x suffixes) with the CRE of every morpheme in every iteration."""
+    niter = draws.shape[0]
+    npairs = len(pair_pre)
+    rows = np.arange(niter, dtype=np.int64)[:, None]
+    # a construction drawn 20 times in the same iteration is still one type
+    seen = np.unique(rows * npairs + pair_codes[draws])
+    return seen_cre(seen // npairs, seen % npairs, pair_pre, pair_suf, npre, nsuf, niter)
+
+# Only the morphemes observed in each iteration are kept (CRE = 0 means that the morpheme was not drawn),
+# as three arrays: iteration, code of the morpheme and CRE
+def long_codes(CRE, first_iteration):
+    """Return the (iteration, morpheme code, CRE) arrays for an array (iterations x morphemes) of CRE values."""
+    iters, morphs = np.nonzero(CRE)
+    return iters + first_iteration, morphs, CRE[iters, morphs]
+
+# The long tables have one row per morpheme observed in each iteration, with columns "Iteration","Morpheme","CRE"
+def long_table(codes, vocab):
+    """Return the "Iteration","Morpheme","CRE" table for the (iteration, morpheme code, CRE) arrays."""
+    iters, morphs, CRE = codes
+    return pd.DataFrame({"Iteration": iters,
+                         "Morpheme": np.asarray(vocab)[morphs],
+                         "CRE": CRE})
+
+# Instead of keeping every iteration, the accumulator keeps for every morpheme the number of iterations where it was drawn,
+# the sum of its CRE and the sum of squares, so memory depends on the number of types and not on the number of iterations
+# Since CRE values are integers, the sums are exact: merging the accumulators of several workers gives the same result
+# in any order. Optionally, a histogram of the CRE values of every morpheme is kept to compute quantiles; its size is the
+# number of construction types, because the CRE of a morpheme is never larger than its number of partners
+# The overall CRE of every iteration (mean CRE of the morphemes drawn) is also kept, in the order of the iterations,
+# to know how precise the mean of the iterations already is (see converged)
+class CREAccumulator:
+    """Running count, mean and variance (and optional quantiles) of the CRE of every morpheme across iterations."""
+
+    def __init__(self, maxcre, histogram=False):
+        nmorph = len(maxcre)
+        self.count = np.zeros(nmorph, dtype=np.int64)
+        self.total = np.zeros(nmorph, dtype=np.int64)
+        self.squares = np.zeros(nmorph, dtype=np.int64)
+        self.overall = []
+        self.offsets = None
+        self.histogram = None
+        if histogram:
+            sizes = np.asarray(maxcre, dtype=np.int64) + 1
+            self.offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+            self.histogram = np.zeros(int(sizes.sum()), dtype=np.int64)
+
+    def update(self, CRE):
+        """Add an array (iterations x morphemes) of CRE values; CRE = 0 means that the morpheme was not drawn."""
+        CRE = CRE.astype(np.int64, copy=False)
+        self.count += (CRE > 0).sum(axis=0)
+        self.total += CRE.sum(axis=0)
+        self.squares += (CRE * CRE).sum(axis=0)
+        drawn = (CRE > 0).sum(axis=1)
+        self.overall.append(np.divide(CRE.sum(axis=1), drawn, out=np.full(len(drawn), np.nan), where=drawn > 0))
+        if self.histogram is not None:
+            iters, morphs = np.nonzero(CRE)
+            self.histogram += np.bincount(self.offsets[morphs] + CRE[iters, morphs], minlength=len(self.histogram))
+
+    def merge(self, other):
+        """Add the iterations of another accumulator (e.g. the one of a worker)."""
+        self.count += other.count
+        self.total += other.total
+        self.squares += other.squares
+        self.overall.extend(other.overall)
+        if self.histogram is not None:
+            self.histogram += other.histogram
+
+    def iterations(self):
+        """Return the number of iterations added."""
+        return sum(len(values) for values in self.overall)
+
+    def standard_error(self):
+        """Return the standard error of the mean of the overall CRE of the iterations (NaN with less than two)."""
+        values = np.concatenate([np.zeros(0)] + self.overall)
+        values = values[~np.isnan(values)]
+        if len(values) < 2:
+            return np.nan
+        return float(np.std(values, ddof=1) / np.sqrt(len(values)))
+
+    def morpheme_standard_error(self):
+        """Return the largest standard error of the mean CRE of a morpheme (morphemes drawn in two iterations or more)."""
+        several = self.count > 1
+        if not several.any():
+            return np.nan
+        count = self.count[several].astype(float)
+        mean = self.total[several] / count
+        variance = np.maximum((self.squares[several] - self.total[several] * mean) / (count - 1), 0)
+        return float(np.sqrt(variance / count).max())
+
+    def quantile(self, q):
+        """Return the q-quantile of the CRE of every morpheme (NaN for morphemes never drawn)."""
+        cumulative = np.cumsum(self.histogram)
+        before = np.where(self.offsets > 0, cumulative[self.offsets - 1], 0)
+        # the first CRE value where the cumulative count of the morpheme reaches q of its iterations
+        target = before + np.maximum(np.ceil(q * self.count), 1).astype(np.int64)
+        values = np.searchsorted(cumulative, target) - self.offsets
+        return np.where(self.count > 0, values, np.nan)
+
+    def table(self, vocab, quantiles=()):
+        """Return a table with "Morpheme","Iterations","CRE" (mean) and "sd" for the morphemes drawn at least once."""
+        drawn = self.count > 0
+        count = self.count[drawn].astype(float)
+        mean = self.total[drawn] / count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variance = (self.squares[drawn] - self.total[drawn] * mean) / (count - 1)
+        stats = pd.DataFrame({"Morpheme": np.asarray(vocab)[drawn],
+                              "Iterations": self.count[drawn],
+                              "CRE": mean,
+                              "sd": np.sqrt(np.maximum(variance, 0))})
+        for q in quantiles:
+            stats["q" + format(q, "g")] = self.quantile(q)[drawn]
+        return stats
+
+# The iterations start..stop-1 are drawn in batches (this is the work done by every worker), from the construction code
+# of every token (sampler "tokens") or from the number of tokens of every construction (samplers "counts" and "bootstrap")
+# Each batch updates the accumulators; the rows of every iteration are only kept when they have to be written to a file
+def run_iterations(population, pair_pre, pair_suf, maxcre_pre, maxcre_suf, n, entropy, start, stop, batch, keep_rows, histogram,
+                   sampler="tokens"):
+    """Return the accumulators for prefixes and suffixes of iterations start..stop-1 (and their rows if keep_rows)."""
+    Pre_Acc = CREAccumulator(maxcre_pre, histogram)
+    Suf_Acc = CREAccumulator(maxcre_suf, histogram)
+    Pre_Long = []
+    Suf_Long = []
+    for first in range(start, stop, batch):
+        last = min(first + batch, stop)
+        generators = iteration_generators(entropy, first, last)
+        if sampler == "tokens":
+            draws = draw_batch(generators, len(population), n)
+            CRE_Pre, CRE_Suf = batch_cre(population, pair_pre, pair_suf, len(maxcre_pre), len(maxcre_suf), draws)
+        else:
+            seen_iter, seen_pair = np.nonzero(draw_counts(generators, population, n, replace=sampler == "bootstrap"))
+            CRE_Pre, CRE_Suf = seen_cre(seen_iter, seen_pair, pair_pre, pair_suf, len(maxcre_pre), len(maxcre_suf), last - first)
+        Pre_Acc.update(CRE_Pre)
+        Suf_Acc.update(CRE_Suf)
+        if keep_rows:
+            Pre_Long.append(long_codes(CRE_Pre, first))
+            Suf_Long.append(long_codes(CRE_Suf, first))
+    return Pre_Acc, Suf_Acc, Pre_Long, Suf_Long
+
+# With several workers, the encoded corpus is placed once in shared memory, and every worker attaches to it when it starts
+# (instead of receiving a copy of the corpus with every task)
+def share_array(array):
+    """Copy an array into a new block of shared memory and return the block and the spec to attach to it."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+worker_state = {}
+
+def attach_worker(specs, params):
+    """Initializer of every worker: attach to the shared arrays and keep the parameters of the iterations."""
+    worker_state["blocks"] = [shared_memory.SharedMemory(name=name) for name, shape, dtype in specs]
+    worker_state["arrays"] = [np.ndarray(shape, dtype=dtype, buffer=block.buf)
+                              for block, (name, shape, dtype) in zip(worker_state["blocks"], specs)]
+    worker_state["params"] = params
+
+def worker_iterations(task):
+    """Compute the iterations task = (start, stop) in a worker."""
+    start, stop = task
+    maxcre_pre, maxcre_suf, n, entropy, batch, keep_rows, histogram, sampler = worker_state["params"]
+    return run_iterations(*worker_state["arrays"], maxcre_pre, maxcre_suf, n, entropy, start, stop, batch, keep_rows, histogram,
+                          sampler)
+
+# The rows of the iterations are appended to the csv files as soon as every block of iterations finishes
+def append_rows(Long, vocab, filename, header):
+    """Append the rows of a list of (iteration, morpheme code, CRE) arrays to a csv file."""
+    for codes in Long:
+        long_table(codes, vocab).to_csv(filename, mode="w" if header else "a", header=header, index=False)
+        header = False
+    return header
+
+# Adaptive mode: instead of running all the iterations, the iterations stop as soon as the overall CRE of prefixes and
+# suffixes is known with a standard error of at most precision (and, with per_morpheme, the mean CRE of every morpheme)
+# The standard errors are only checked every CHECK_EVERY iterations, so the iteration where the run stops does not depend
+# on the batches or on the number of workers
+CHECK_EVERY = 100
+
+def converged(Pre_Acc, Suf_Acc, precision, per_morpheme=False):
+    """Return True when the standard errors of the accumulators are at most precision."""
+    errors = [Pre_Acc.standard_error(), Suf_Acc.standard_error()]
+    if per_morpheme:
+        errors += [Pre_Acc.morpheme_standard_error(), Suf_Acc.morpheme_standard_error()]
+    # NaN (too few iterations) is never below the target
+    return all(error <= precision for error in errors)
+
+# Monte Carlo engine for {04}: the corpus is encoded once, and the iterations are drawn in batches of index arrays
+# (or of construction counts, see SAMPLERS). Nothing is written to disk (unless the rows of every iteration are requested
+# in iteration_files), and the batch size is chosen so that each batch holds about 4 million random keys (or counts)
+# The iterations can be split across a pool of workers; for a given seed the results are identical for any number of workers
+# With a precision, numiter is the largest number of iterations (see converged)
+def resample_cre(corpus, n, numiter, seed=None, workers=1, iteration_files=None, quantiles=(), vocabulary=None,
+                 batch_keys=4000000, progress=True, precision=None, per_morpheme=False, sampler="tokens", iteration_format="csv"):
+    """Return the accumulators of CRE for prefixes and suffixes over numiter random samples of n tokens (or fewer, with a precision)."""
+    if sampler not in SAMPLERS:
+        raise ValueError('sampler must be one of ' + ', '.join(SAMPLERS) + ', not ' + repr(sampler))
+    pair_pre, pair_suf, pair_freq, pre_vocab, suf_vocab = encode_corpus(corpus, vocabulary)
+    if sampler == "tokens":
+        # the construction code of every token of the sample
+        population = np.repeat(np.arange(len(pair_freq)), pair_freq)
+    else:
+        population = np.asarray(pair_freq, dtype=np.int64)
+    entropy = np.random.SeedSequence(seed).entropy
+    batch = max(1, batch_keys // max(len(population), 1))
+    # the largest possible CRE of a morpheme is its number of partners
+    maxcre_pre = np.bincount(pair_pre, minlength=len(pre_vocab))
+    maxcre_suf = np.bincount(pair_suf, minlength=len(suf_vocab))
+    params = (maxcre_pre, maxcre_suf, n, entropy)
+    options = (batch, iteration_files is not None, len(quantiles) > 0, sampler)
+    Pre_Acc = CREAccumulator(maxcre_pre, len(quantiles) > 0)
+    Suf_Acc = CREAccumulator(maxcre_suf, len(quantiles) > 0)
+    header_pre = header_suf = True
+    # with another format than csv, the iterations are written as dense matrices (see eslipro/outputs.py)
+    writers = None
+    if iteration_files is not None and iteration_format != "csv":
+        writers = [IterationWriter(filename, vocab, maxcre, iteration_format)
+                   for filename, vocab, maxcre in zip(iteration_files, (pre_vocab, suf_vocab), (maxcre_pre, maxcre_suf))]
+
+    def collect(stop, result):
+        nonlocal header_pre, header_suf
+        #feedback about the progression of the iterations
+        if progress:
+            print('iteration: ' + str(stop) + ' of ' + str(numiter))
+        Pre_part, Suf_part, Pre_Long, Suf_Long = result
+        Pre_Acc.merge(Pre_part)
+        Suf_Acc.merge(Suf_part)
+        if writers is not None:
+            writers[0].write(Pre_Long, stop)
+            writers[1].write(Suf_Long, stop)
+        elif iteration_files is not None:
+            header_pre = append_rows(Pre_Long, pre_vocab, iteration_files[0], header_pre)
+            header_suf = append_rows(Suf_Long, suf_vocab, iteration_files[1], header_suf)
+        # with a precision, the iterations stop at the first check where it is reached
+        if precision is not None and converged(Pre_Acc, Suf_Acc, precision, per_morpheme):
+            if progress:
+                print('Precision ' + format(precision, 'g') + ' reached after ' + str(stop) + ' iterations')
+            return True
+        return False
+
+    try:
+        if workers <= 1:
+            step = CHECK_EVERY if precision is not None else batch
+            for start in range(0, numiter, step):
+                stop = min(start + step, numiter)
+                if collect(stop, run_iterations(population, pair_pre, pair_suf, *params, start, stop, *options)):
+                    break
+        else:
+            # about four tasks per worker, so that the workers that finish first can take more iterations
+            # (with a precision, one task per check, so that the run can stop at any check)
+            chunk = CHECK_EVERY if precision is not None else max(batch, -(-numiter // (4 * workers)))
+            tasks = [(start, min(start + chunk, numiter)) for start in range(0, numiter, chunk)]
+            shared = [share_array(array) for array in (population, pair_pre, pair_suf)]
+            try:
+                # the default start method of the system is used (the workers only import this module, never the command line)
+                with mp.get_context().Pool(workers, initializer=attach_worker,
+                                           initargs=([spec for shm, spec in shared], params + options)) as pool:
+                    # imap returns the results in the order of the tasks, so the rows are written in the order of the iterations
+                    for (start, stop), result in zip(tasks, pool.imap(worker_iterations, tasks)):
+                        if collect(stop, result):
+                            break
+            finally:
+                for shm, spec in shared:
+                    shm.close()
+                    shm.unlink()
+    finally:
+        if writers is not None:
+            for writer in writers:
+                writer.close()
+    # the csv files always exist when requested, even if no morpheme was drawn
+    if iteration_files is not None and writers is None:
+        for filename, header in zip(iteration_files, (header_pre, header_suf)):
+            if header:
+                pd.DataFrame(columns=["Iteration", "Morpheme", "CRE"]).to_csv(filename, header=True, index=False)
+    return Pre_Acc, Suf_Acc, pre_vocab, suf_vocab, entropy
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+{00.b} Data reading at the byte level: the prefix_suffix lines of a memory-mapped file are split and coded with arrays
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# {00.b} Data reading: byte-level tokenizer
+# =============================================================================
+
+# Import os.path to check the size of the files
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+
+
+# The bytes of the characters that split the file: "\n" between tokens, "_" between prefix and suffix ("\r" of "\r\n" is removed)
+NEWLINE = ord("\n")
+UNDERSCORE = ord("_")
+CARRIAGE_RETURN = ord("\r")
+
+# Every line must be prefix_suffix: the lines that are not are skipped and reported with their number
+# (empty lines are skipped without any report)
+MALFORMED = {1: "no _", 2: "several _", 3: "empty prefix", 4: "empty suffix"}
+
+# The file is not read into memory: it is memory-mapped, and the operating system reads the parts that are used
+def map_file(txtfile):
+    """Return the bytes of a file as a read-only array of uint8 (memory-mapped)."""
+    if os.path.getsize(txtfile) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(txtfile, dtype=np.uint8, mode="r")
+
+# The positions of every "\n" and "_" are found with array operations, one block of the file at a time, and a line is
+# well formed when it has exactly one "_" with something before and after it
+# The prefixes and suffixes are never converted into Python strings one by one: the bytes of every prefix (or suffix) of
+# a block are read as a row of 8-byte words, and equal rows get the same integer code. Only the distinct prefixes and
+# suffixes are kept as bytes, in a dict with their codes, so the codes are the same in every block
+class Tokenizer:
+    """Split prefix_suffix lines at the byte level and give integer codes to prefixes and suffixes."""
+
+    def __init__(self, block=1 << 26, cells=1 << 20):
+        self.block = block
+        self.cells = cells
+        self.codes = ({}, {})
+        self.malformed = []
+
+    def lines(self, buf, first_line=1):
+        """Yield every block of complete lines of buf (padded with 8 zero bytes) with the start, "_" and end positions of its well-formed lines."""
+        offset = 0
+        line = first_line
+        block = self.block
+        while offset < len(buf):
+            stop = min(offset + block, len(buf))
+            data = np.asarray(buf[offset:stop])
+            newlines = np.flatnonzero(data == NEWLINE)
+            if stop < len(buf):
+                if len(newlines) == 0:
+                    # a line longer than the block: the block is made larger
+                    block *= 2
+                    continue
+                # the block ends with its last complete line
+                stop = offset + int(newlines[-1]) + 1
+                data = data[:stop - offset]
+                ends = newlines
+            elif len(data) > 0 and data[-1] == NEWLINE:
+                ends = newlines
+            else:
+                # the last line of the file may have no "\n"
+                ends = np.append(newlines, len(data))
+            starts = np.concatenate(([0], newlines + 1))[:len(ends)]
+            numbers = line + np.arange(len(ends))
+            line += len(ends)
+            ends = ends - ((ends > starts) & (data[np.maximum(ends - 1, 0)] == CARRIAGE_RETURN))
+            filled = ends > starts
+            starts, ends, numbers = starts[filled], ends[filled], numbers[filled]
+            # the line of every "_", the number of "_" in every line and the position of the first one
+            underscores = np.flatnonzero(data == UNDERSCORE)
+            owner = np.searchsorted(ends, underscores, side="right")
+            count = np.bincount(owner, minlength=len(ends))
+            first = np.full(len(ends), -1, dtype=np.int64)
+            first[owner[::-1]] = underscores[::-1]
+            problem = np.zeros(len(ends), dtype=np.int64)
+            problem[first == ends - 1] = 4
+            problem[first == starts] = 3
+            problem[count > 1] = 2
+            problem[count == 0] = 1
+            for i in np.flatnonzero(problem):
+                self.malformed.append((int(numbers[i]), MALFORMED[int(problem[i])],
+                                       bytes(data[starts[i]:ends[i]]).decode("utf-8", "replace")))
+            ok = problem == 0
+            yield np.concatenate([data, np.zeros(8, dtype=np.uint8)]), starts[ok], first[ok], ends[ok]
+            offset = stop
+
+    def intern(self, data, starts, ends, position):
+        """Return the codes of the byte strings data[start:end] (0 for prefixes, 1 for suffixes), giving new codes to new strings."""
+        codes = np.empty(len(starts), dtype=np.int64)
+        if len(starts) == 0:
+            return codes
+        table = self.codes[position]
+        lengths = ends - starts
+        # the 8 bytes that start at every position of data, read as one word (data ends with 8 zero bytes)
+        words = np.ndarray((len(data) - 7,), dtype=np.dtype("<u8"), buffer=data, strides=(1,))
+        nwords = -(-int(lengths.max()) // 8)
+        columns = 8 * np.arange(nwords)
+        rows = max(1, self.cells // nwords)
+        for first in range(0, len(starts), rows):
+            part = slice(first, first + rows)
+            # the words of every string in a row of the matrix, without the bytes after its end
+            left = np.clip(lengths[part, None] - columns, 0, 8).astype(np.uint64)
+            mask = np.where(left == 8, np.uint64(0xFFFFFFFFFFFFFFFF), (np.uint64(1) << (np.uint64(8) * left)) - np.uint64(1))
+            matrix = words[np.minimum(starts[part, None] + columns, len(words) - 1)] & mask
+            # one number per row: the word itself for strings of up to 8 bytes, a hash of the words for longer strings
+            # (equal numbers are checked to be equal strings, and a collision falls back to comparing the whole rows)
+            number = matrix[:, 0].copy()
+            for column in range(1, nwords):
+                number = number * np.uint64(0x9E3779B97F4A7C15) ^ matrix[:, column]
+            where, uniques = pd.factorize(number)
+            firsts = np.empty(len(uniques), dtype=np.int64)
+            firsts[where[::-1]] = np.arange(len(where))[::-1]
+            if nwords > 1 and not (matrix == matrix[firsts[where]]).all():
+                uniques, firsts, where = np.unique(matrix, axis=0, return_index=True, return_inverse=True)
+            keys = np.ascontiguousarray(matrix[firsts]).view(np.uint8)
+            local = np.fromiter((table.setdefault(key.tobytes().rstrip(b"\0"), len(table)) for key in keys),
+                                dtype=np.int64, count=len(keys))
+            codes[part] = local[where.ravel()]
+        return codes
+
+    def tokens(self, buf, first_line=1):
+        """Yield the prefix and suffix codes of the tokens of buf, in the order of the file, one block at a time."""
+        for data, starts, underscores, ends in self.lines(buf, first_line):
+            yield self.intern(data, starts, underscores, 0), self.intern(data, underscores + 1, ends, 1)
+
+    def count_pairs(self, buf, first_line=1):
+        """Return the prefix code, suffix code and number of tokens of every construction type of buf."""
+        keys, counts = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+        for pre_codes, suf_codes in self.tokens(buf, first_line):
+            block_keys, block_counts = np.unique((pre_codes << 32) | suf_codes, return_counts=True)
+            keys.append(block_keys)
+            counts.append(block_counts)
+        pair_keys, where = np.unique(np.concatenate(keys), return_inverse=True)
+        pair_freq = np.bincount(where.ravel(), weights=np.concatenate(counts), minlength=len(pair_keys)).astype(np.int64)
+        return pair_keys >> 32, pair_keys & 0xFFFFFFFF, pair_freq
+
+    def vocabulary(self, position):
+        """Return the strings of the prefixes (0) or suffixes (1), in the order of their codes."""
+        return pd.Series([key.decode("utf-8", "replace") for key in self.codes[position]], dtype=object)
+
+    def malformed_table(self):
+        """Return a table with the number, problem and text of every malformed line."""
+        return pd.DataFrame(self.malformed, columns=["Line", "Problem", "Text"])
+
+# The malformed lines of a file are reported when it is read (the first ones, with the total)
+def report_malformed(txtfile, malformed, shown=10):
+    """Print the number of malformed lines of a file and the first of them."""
+    if len(malformed) == 0:
+        return
+    print('File ' + txtfile + ': ' + str(len(malformed)) + ' malformed lines were skipped (' +
+          ', '.join('line ' + str(line) + ': ' + problem for line, problem, *text in malformed[:shown]) +
+          (', ...' if len(malformed) > shown else '') + ')')
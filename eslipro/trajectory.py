@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Trajectory mode: CRE and TRI in a window of tokens (or sessions) that moves along a time-ordered sample
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# Sliding-window trajectory of CRE and TRI
+# =============================================================================
+
+# Import os.path to write the outputs in the output directory
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+
+from .corpus import read_tokens
+
+
+# The tokens of every session (file) are joined in the order given, with common codes for prefixes and suffixes,
+# and every token gets the code of its construction type
+def encode_sessions(txtfiles, normalization="ascii"):
+    """Return the construction code of every token, the prefix/suffix code of every construction, and the session bounds."""
+    sessions = [read_tokens(txtfile, normalization) for txtfile in txtfiles]
+    prefixes = pd.Index(np.unique(np.concatenate([np.asarray(s[2], dtype=object) for s in sessions])))
+    suffixes = pd.Index(np.unique(np.concatenate([np.asarray(s[3], dtype=object) for s in sessions])))
+    pre_codes = np.concatenate([prefixes.get_indexer(s[2])[s[0]] for s in sessions]).astype(np.int64)
+    suf_codes = np.concatenate([suffixes.get_indexer(s[3])[s[1]] for s in sessions]).astype(np.int64)
+    bounds = np.concatenate(([0], np.cumsum([len(s[0]) for s in sessions])))
+    token_pair, pairs = pd.factorize(pre_codes * len(suffixes) + suf_codes)
+    pairs = np.asarray(pairs, dtype=np.int64)
+    return token_pair.astype(np.int64), pairs // len(suffixes), pairs % len(suffixes), prefixes, suffixes, bounds
+
+# The CRE of every morpheme of one position in the window, with the sums for the mean, sd and TRI
+# The changes of a step are applied with array operations: only the morphemes that gain or lose a partner are touched
+class WindowCRE:
+    """CRE of every morpheme of one position in the current window, with the number of types, sums and TRI count."""
+
+    def __init__(self, nmorph):
+        self.cre = np.zeros(nmorph, dtype=np.int64)
+        self.ntypes = 0
+        self.total = 0
+        self.squares = 0
+        self.tri = 0
+
+    def update(self, morphemes, changes):
+        """Add changes (+1 a new partner, -1 a partner lost) to the CRE of the given morphemes."""
+        if len(morphemes) == 0:
+            return
+        touched, where = np.unique(morphemes, return_inverse=True)
+        old = self.cre[touched]
+        new = old + np.bincount(where, weights=changes, minlength=len(touched)).astype(np.int64)
+        self.cre[touched] = new
+        self.ntypes += int((new > 0).sum() - (old > 0).sum())
+        self.total += int(new.sum() - old.sum())
+        self.squares += int((new * new).sum() - (old * old).sum())
+        self.tri += int((new == 1).sum() - (old == 1).sum())
+
+    def summary(self):
+        """Return the mean CRE, sd of CRE, number of types and TRI of the window."""
+        if self.ntypes == 0:
+            return np.nan, np.nan, 0, np.nan
+        mean = self.total / self.ntypes
+        sd = np.sqrt(max(self.squares - self.total * mean, 0) / (self.ntypes - 1)) if self.ntypes > 1 else np.nan
+        return mean, sd, self.ntypes, self.tri / self.ntypes
+
+# The window keeps the number of tokens of every construction type; when a step moves the window, the tokens that leave
+# are removed and the tokens that enter are added, and only the constructions that appear (0 tokens before) or vanish
+# (0 tokens after) change the CRE of their prefix and suffix. So every step costs O(tokens entering + leaving)
+class Window:
+    """Construction counts and CRE of prefixes and suffixes of a window of tokens."""
+
+    def __init__(self, pair_pre, pair_suf, npre, nsuf):
+        self.pair_pre = pair_pre
+        self.pair_suf = pair_suf
+        self.count = np.zeros(len(pair_pre), dtype=np.int64)
+        self.ntokens = 0
+        self.nconstructions = 0
+        self.Pre = WindowCRE(npre)
+        self.Suf = WindowCRE(nsuf)
+
+    def move(self, entering, leaving):
+        """Add the tokens entering the window and remove the tokens leaving it (arrays of construction codes)."""
+        tokens = np.concatenate([entering, leaving])
+        if len(tokens) == 0:
+            return
+        signs = np.concatenate([np.ones(len(entering), dtype=np.int64), -np.ones(len(leaving), dtype=np.int64)])
+        touched, where = np.unique(tokens, return_inverse=True)
+        old = self.count[touched]
+        new = old + np.bincount(where, weights=signs, minlength=len(touched)).astype(np.int64)
+        self.count[touched] = new
+        self.ntokens += len(entering) - len(leaving)
+        appear = touched[(old == 0) & (new > 0)]
+        vanish = touched[(old > 0) & (new == 0)]
+        self.nconstructions += len(appear) - len(vanish)
+        changes = np.concatenate([np.ones(len(appear)), -np.ones(len(vanish))])
+        self.Pre.update(np.concatenate([self.pair_pre[appear], self.pair_pre[vanish]]), changes)
+        self.Suf.update(np.concatenate([self.pair_suf[appear], self.pair_suf[vanish]]), changes)
+
+# The windows are ranges of tokens [start, end): a window of size tokens every step tokens, or (by sessions) the tokens of
+# size sessions every step sessions. When the step does not reach the end exactly, one more window ends at the last
+# token (or session), so no token is left out: it is the last row of trajectory.csv, with its own Start and End
+def window_starts(total, size, step):
+    """Return the first token (or session) of every window, the last one ending at total."""
+    if size < 1 or step < 1:
+        raise ValueError("the size and the step of the windows must be at least 1, not " + str(size) + " and " + str(step))
+    last = max(total - size, 0)
+    starts = list(range(0, last + 1, step))
+    if starts[-1] != last:
+        starts.append(last)
+    return starts
+
+def window_ranges(bounds, size, step, by="tokens"):
+    """Return the list of (start, end, first session, last session) of every window."""
+    ntokens = int(bounds[-1])
+    if by == "sessions":
+        nsessions = len(bounds) - 1
+        ranges = [(int(bounds[first]), int(bounds[min(first + size, nsessions)])) for first in window_starts(nsessions, size, step)]
+    else:
+        ranges = [(start, min(start + size, ntokens)) for start in window_starts(ntokens, size, step)]
+    session = lambda position: int(np.searchsorted(bounds, position, side="right")) - 1
+    return [(start, end, session(start) + 1, session(max(end - 1, start)) + 1) for start, end in ranges]
+
+# With a reference Corpus, the vocabulary control keeps only the tokens whose prefix and suffix are both found in the
+# reference: that is the vocabulary shared by every window and the reference, so it is applied once to all the tokens
+def trajectory(txtfiles, size, step=None, by="tokens", normalization="ascii", reference=None):
+    """Return a table with the tokens, types, CRE and TRI of every window of a time-ordered sample (one file per session)."""
+    token_pair, pair_pre, pair_suf, prefixes, suffixes, bounds = encode_sessions(txtfiles, normalization)
+    if reference is not None:
+        kept = prefixes.isin(reference.prefixes)[pair_pre] & suffixes.isin(reference.suffixes)[pair_suf]
+        # the tokens of constructions with a morpheme not found in the reference do not count (code -1)
+        token_pair = np.where(kept[token_pair], token_pair, -1)
+    step = step or max(size // 10, 1)
+    window = Window(pair_pre, pair_suf, len(prefixes), len(suffixes))
+    rows = []
+    start = end = 0
+    for number, (new_start, new_end, first_session, last_session) in enumerate(window_ranges(bounds, size, step, by), 1):
+        leaving = token_pair[start:min(new_start, end)]
+        entering = token_pair[max(end, new_start):new_end]
+        window.move(entering[entering >= 0], leaving[leaving >= 0])
+        start, end = new_start, new_end
+        CRE_Pre, sd_Pre, ntypes_Pre, TRI_Pre = window.Pre.summary()
+        CRE_Suf, sd_Suf, ntypes_Suf, TRI_Suf = window.Suf.summary()
+        rows.append([number, start, end, first_session, last_session, window.ntokens, ntypes_Pre, ntypes_Suf,
+                     window.nconstructions, CRE_Pre, sd_Pre, CRE_Suf, sd_Suf, TRI_Pre, TRI_Suf])
+    return pd.DataFrame(rows, columns=['Window', 'Start', 'End', 'First_Session', 'Last_Session', 'Tokens',
+                                       'Prefix_Types', 'Suffix_Types', 'Constructions', 'CRE_Prefix', 'sd_Prefix',
+                                       'CRE_Suffix', 'sd_Suffix', 'TRI_Prefix', 'TRI_Suffix'])
+
+def write_trajectory(Trajectory, output_dir="."):
+    """Write the table of a trajectory (trajectory.csv) in output_dir."""
+    os.makedirs(output_dir, exist_ok=True)
+    Trajectory.to_csv(os.path.join(output_dir, 'trajectory.csv'), header=True, index=False)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+{00.f} Functions for the vocabulary control
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# =============================================================================
+# {00.f} Functions for the vocabulary control
+# =============================================================================
+
+# import Pandas to work with dataframes
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import Numpy to compute and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import namedtuple to keep the shared vocabulary of both samples together
+# https://docs.python.org/3/library/collections.html
+from collections import namedtuple
+
+
+# The shared vocabulary is kept as two sorted indexes: the prefixes and the suffixes found in all the samples
+# Every shared morpheme has a fixed code (its position in the index), so the random samples of {04} and the reports
+# can use the same codes without computing the intersection again
+SharedVocabulary = namedtuple("SharedVocabulary", ["prefixes", "suffixes"])
+
+# With any number of samples, the vocabularies of all of them are joined and coded in a single pass (a hash table,
+# pd.factorize), and a morpheme is shared when its code appears once in every sample
+def shared_morphemes(indexes):
+    """Return the sorted Index of the morphemes found in every one of the given indexes."""
+    codes, uniques = pd.factorize(np.concatenate([np.asarray(index, dtype=object) for index in indexes]))
+    found = np.bincount(codes, minlength=len(uniques)) == len(indexes)
+    return pd.Index(uniques[found], dtype=indexes[0].dtype).sort_values()
+
+def shared_vocabulary(*corpora):
+    """Return the SharedVocabulary (sorted indexes of prefixes and suffixes) found in all the samples."""
+    prefixes = shared_morphemes([corpus.prefixes for corpus in corpora])
+    suffixes = shared_morphemes([corpus.suffixes for corpus in corpora])
+    return SharedVocabulary(prefixes, suffixes)
+
+# A construction is kept when both its prefix and its suffix are in the shared vocabulary: the rows of the shared prefixes
+# and the columns of the shared suffixes are taken from the matrix (found with a hash table, Index.get_indexer)
+def vocabulary_filter(corpus, vocabulary):
+    """Return the Corpus with only the constructions whose prefix and suffix are both in the shared vocabulary."""
+    return corpus.restrict(vocabulary.prefixes, vocabulary.suffixes)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Fixtures of the tests: a small pair of synthetic prefix_suffix samples, and runs of EsLiPro.py on them
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path, sys and subprocess to run EsLiPro.py as a user would
+# https://docs.python.org/3/library/subprocess.html
+import os.path
+import sys
+import subprocess
+# import Numpy to draw the synthetic samples
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pytest for the fixtures
+# https://docs.pytest.org/
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "EsLiPro.py")
+sys.path.insert(0, ROOT)
+
+
+# Prefixes and suffixes are drawn with Zipfian frequencies, so the samples have frequent morphemes used with many
+# partners and rare ones used with just one; the vocabulary of b.txt starts further in the list than the one of a.txt,
+# so some morphemes are only found in one of the samples
+def write_sample(txtfile, ntokens, first, nprefixes, nsuffixes, rng, exponent=1.2):
+    """Write ntokens prefix_suffix lines, with prefixes p<first>... and suffixes s<first>..."""
+    def zipf(n):
+        weights = 1.0 / np.arange(1, n + 1) ** exponent
+        return weights / weights.sum()
+    prefixes = rng.choice(nprefixes, size=ntokens, p=zipf(nprefixes)) + first
+    suffixes = rng.choice(nsuffixes, size=ntokens, p=zipf(nsuffixes)) + first // 5
+    with open(txtfile, "w") as f:
+        f.write("".join("p" + str(prefix) + "_s" + str(suffix) + "\n" for prefix, suffix in zip(prefixes, suffixes)))
+    return txtfile
+
+# a.txt has 600 tokens and b.txt 1200, with 60 prefixes and 12 suffixes each: small enough for thousands of iterations
+@pytest.fixture(scope="session")
+def pair(tmp_path_factory):
+    """Return the paths of both synthetic samples."""
+    directory = tmp_path_factory.mktemp("pair")
+    rng = np.random.default_rng(7)
+    return (write_sample(str(directory / "a.txt"), 600, 0, 60, 12, rng),
+            write_sample(str(directory / "b.txt"), 1200, 10, 60, 12, rng))
+
+@pytest.fixture(scope="session")
+def corpora(pair):
+    """Return the Corpus of both synthetic samples."""
+    from eslipro.corpus import read_corpus
+    return read_corpus(pair[0]), read_corpus(pair[1])
+
+def read_lines(txtfile):
+    """Return the prefix_suffix lines of a file."""
+    with open(txtfile) as f:
+        return f.read().split()
+
+# The runs of the tests never use the cache of samples of the user (see --cache-dir)
+@pytest.fixture(scope="session", autouse=True)
+def cache_dir(tmp_path_factory):
+    """Return the directory of the cache of samples used by the tests."""
+    directory = str(tmp_path_factory.mktemp("cache"))
+    os.environ["ESLIPRO_CACHE"] = directory
+    return directory
+
+def run_command(directory, options, answers=""):
+    """Run EsLiPro.py in directory with the options and the answers typed in, and return what it printed."""
+    run = subprocess.run([sys.executable, SCRIPT] + list(options), input=answers, cwd=str(directory), capture_output=True,
+                         text=True, env=dict(os.environ, MPLBACKEND="Agg"))
+    assert run.returncode == 0, run.stderr
+    return run.stdout
+
+# The script asks for both files and the number of iterations, and writes its outputs in the working directory
+def run_script(directory, txtfiles, iterations, *options):
+    """Run EsLiPro.py in directory with the files and number of iterations typed in, and return directory."""
+    run_command(directory, options, "\n".join(list(txtfiles) + [str(iterations)]) + "\n")
+    return str(directory)
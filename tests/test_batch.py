@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the batch mode (--batch): every pair of a directory against separate comparisons of two samples
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path to read the samples
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import Numpy to draw the samples
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pandas to compare tables
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import shutil to copy the samples
+# https://docs.python.org/3/library/shutil.html
+import shutil
+# import pytest for the directory of samples shared by the tests
+# https://docs.pytest.org/
+import pytest
+
+from conftest import write_sample
+from eslipro.analysis import build_results_table, compare
+from eslipro.batch import batch_pairs, load_directory, run_batch
+from eslipro.cli import main
+from eslipro.corpus import read_corpus
+
+
+@pytest.fixture(scope="module")
+def directory(tmp_path_factory):
+    """Return a directory with three samples of different sizes."""
+    directory = tmp_path_factory.mktemp("samples")
+    rng = np.random.default_rng(3)
+    for name, ntokens, first in (("a.txt", 400, 0), ("b.txt", 800, 10), ("c.txt", 1200, 20)):
+        write_sample(str(directory / name), ntokens, first, 60, 12, rng)
+    return str(directory)
+
+def pair_rows(Long, name1, name2):
+    """Return the rows of summary_table.csv of a pair in the long table of a batch."""
+    rows = Long[(Long.Sample1 == name1) & (Long.Sample2 == name2)]
+    return rows.drop(columns=['Sample1', 'Sample2', 'Seed', 'Status']).reset_index(drop=True)
+
+# Every pair of the batch gives the same rows as a comparison of both files alone with the seed of the pair,
+# whatever the number of workers
+def test_batch_matches_two_way_runs(directory):
+    corpora = load_directory(directory)
+    pairs = batch_pairs(list(corpora))
+    assert pairs == [("a.txt", "b.txt"), ("a.txt", "c.txt"), ("b.txt", "c.txt")]
+    Long, Samples, entropy = run_batch(corpora, pairs, numiter=100, seed=6)
+    for name1, name2 in pairs:
+        seed = Long[(Long.Sample1 == name1) & (Long.Sample2 == name2)].Seed.iloc[0]
+        comparison = compare(read_corpus(os.path.join(directory, name1)), read_corpus(os.path.join(directory, name2)),
+                             numiter=100, seed=seed, progress=False)
+        pd.testing.assert_frame_equal(pair_rows(Long, name1, name2), build_results_table(comparison), check_dtype=False)
+    Parallel, Samples, entropy = run_batch(corpora, pairs, numiter=100, seed=6, workers=2)
+    pd.testing.assert_frame_equal(Parallel, Long)
+
+# A pair is compared once, even when it is both a pair of the directory and a pair with the reference
+def test_batch_pairs_are_unique():
+    assert batch_pairs(["a", "b", "c"], "b") == [("a", "b"), ("a", "c"), ("b", "c")]
+    assert batch_pairs(["a", "b"], "r", all_pairs=False) == [("a", "r"), ("b", "r")]
+
+# The reference is read from its own path, even when a file of the directory has the same name, and a pair of samples
+# with the same size after the vocabulary control is reported with its Status instead of being left out
+def test_batch_reference_and_equal_sizes(directory, tmp_path, capsys):
+    shutil.copy(os.path.join(directory, "a.txt"), str(tmp_path / "a.txt"))
+    shutil.copy(os.path.join(directory, "a.txt"), str(tmp_path / "d.txt"))
+    reference = write_sample(str(tmp_path / "reference.txt"), 900, 5, 60, 12, np.random.default_rng(4))
+    os.mkdir(str(tmp_path / "other"))
+    shutil.move(reference, str(tmp_path / "other" / "a.txt"))
+    output_dir = str(tmp_path / "results")
+    main(["--batch", str(tmp_path), "--reference", str(tmp_path / "other" / "a.txt"), "--iterations", "20", "--seed", "2",
+          "--no-cache", "--output-dir", output_dir])
+    Samples = pd.read_csv(os.path.join(output_dir, "batch_samples.csv"))
+    assert Samples.groupby("Name").Tokens.first().to_dict() == {"a.txt": 400, "d.txt": 400, "reference:a.txt": 900}
+    Long = pd.read_csv(os.path.join(output_dir, "batch_results.csv"))
+    status = Long.groupby(["Sample1", "Sample2"]).Status.agg(["first", "size"])
+    assert status.to_dict("index") == {("a.txt", "d.txt"): {"first": "equal sizes", "size": 1},
+                                       ("a.txt", "reference:a.txt"): {"first": "compared", "size": 10},
+                                       ("d.txt", "reference:a.txt"): {"first": "compared", "size": 10}}
+    assert "Pairs not compared" in capsys.readouterr().out
+    Matrix = pd.read_csv(os.path.join(output_dir, "batch_matrix_CRE_Prefix.csv"), index_col=0)
+    assert np.isnan(Matrix.loc["a.txt", "d.txt"]) and not np.isnan(Matrix.loc["a.txt", "reference:a.txt"])
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of {05.e}: the BEST comparison of the CRE of the morphemes, on data with known answers
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import Numpy to draw the data
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pandas to compare tables
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+
+from eslipro.analysis import compare
+from eslipro.bayes import best, best_comparison, hdi
+
+
+def test_hdi():
+    assert hdi(np.arange(100.0), mass=0.5) == (0, 49)
+    # the narrowest interval of a skewed distribution is on the side of its mode
+    assert hdi(np.array([0, 0, 0, 1, 1, 2, 5, 9, 20, 50.0]), mass=0.5) == (0, 1)
+
+# Two groups drawn from normal distributions with means 0 and 1: the posterior finds both means, a difference above 0
+# with an HDI that excludes 0, and all the chains agree (Rhat near 1); two groups from the same distribution give an
+# HDI of the difference that includes 0
+def test_best_known_means():
+    rng = np.random.default_rng(4)
+    y1, y2 = rng.normal(0, 1, 200), rng.normal(1, 1, 200)
+    Table = best(y1, y2, np.random.default_rng(5), chains=8, warmup=500, draws=500).set_index('Parameter')
+    np.testing.assert_allclose(Table.loc[['mu1', 'mu2'], 'Mean'], [y1.mean(), y2.mean()], atol=0.05)
+    assert Table.loc['mu2-mu1', 'HDI_low'] > 0 and Table.loc['mu2-mu1', 'P(>0)'] > 0.99
+    assert (Table.Rhat < 1.05).all()
+    Same = best(y1, rng.normal(0, 1, 200), np.random.default_rng(5), chains=8, warmup=500, draws=500).set_index('Parameter')
+    assert Same.loc['mu2-mu1', 'HDI_low'] < 0 < Same.loc['mu2-mu1', 'HDI_high']
+
+# Every pair of samples is compared for prefixes and suffixes, and the same seed gives the same table
+def test_best_comparison(corpora):
+    comparison = compare(*corpora, numiter=50, seed=2, progress=False)
+    Best = best_comparison(comparison, seed=8, chains=4, warmup=200, draws=200)
+    assert Best.Table.groupby(['Position', 'Sample1', 'Sample2']).size().to_dict() == {
+        (position, first, second): 8 for position in ('Prefix', 'Suffix') for first, second in ((1, 2), (1, 3), (2, 3))}
+    pd.testing.assert_frame_equal(best_comparison(comparison, seed=8, chains=4, warmup=200, draws=200).Table, Best.Table)
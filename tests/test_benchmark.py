@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the benchmark suite (--benchmark): synthetic samples and a run on a tiny size
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path to find the outputs
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import pandas to write a file of another version
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+
+from conftest import read_lines
+from eslipro import benchmark
+from eslipro.benchmark import run_benchmark, store_benchmark, synthetic_pair
+
+
+STAGES = ["{00.b} ingest", "{01}-{02} CRE", "{03} vocabulary control", "{04} resampling", "{05} TRI", "{7} output"]
+
+# The second sample has ratio times the tokens of the first, and shares the most frequent morphemes with it
+def test_synthetic_pair(tmp_path):
+    samples = [read_lines(txtfile) for txtfile in synthetic_pair(str(tmp_path), 1000, ratio=1.5, overlap=0.5, seed=2)]
+    assert [len(lines) for lines in samples] == [1000, 1500]
+    assert all(line.count("_") == 1 for lines in samples for line in lines)
+    prefixes = [set(line.split("_")[0] for line in lines) for lines in samples]
+    assert prefixes[0] & prefixes[1] and prefixes[1] - prefixes[0]
+
+# Every stage is timed for every size, and a second run with another label is compared with the first one
+def test_run_benchmark(tmp_path):
+    output_dir = str(tmp_path)
+    Results = run_benchmark([300, 600], output_dir, numiter=10, label="first")
+    assert Results.Stage.tolist() == STAGES * 2
+    assert Results.Tokens1.tolist() == [300] * 6 + [600] * 6 and (Results.Tokens2 == 2 * Results.Tokens1).all()
+    assert (Results.Seconds >= 0).all() and (Results.PeakRSSMB > 0).all()
+    assert os.path.isfile(os.path.join(output_dir, "benchmark_data", "300", "summary_table.csv"))
+    assert store_benchmark(Results, output_dir) is None
+    Change = store_benchmark(run_benchmark([300], output_dir, numiter=10, label="second"), output_dir)
+    assert Change.Stage.tolist() == STAGES and (Change.Label_previous == "first").all()
+    assert (Change.Ratio == Change.Seconds / Change.Seconds_previous).all()
+
+# Above TOKEN_SAMPLER_LIMIT tokens in the sample reduced in {04}, the sampler "counts" replaces the sampler "tokens",
+# unless strict is True: the sample of 300 tokens of size 150 has 249 tokens after the vocabulary control, and the one of
+# 600 tokens of size 300 has 507
+def test_token_sampler_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark, "TOKEN_SAMPLER_LIMIT", 250)
+    Results = run_benchmark([150, 300], str(tmp_path), numiter=10, label="limit")
+    assert Results.groupby("Size").Sampler.first().to_dict() == {150: "tokens", 300: "counts"}
+    assert (run_benchmark([300], str(tmp_path), numiter=10, label="strict", strict=True).Sampler == "tokens").all()
+
+# The rows of a file written by another version with other columns are kept, with the columns of both versions
+def test_store_benchmark_keeps_old_rows(tmp_path):
+    output_dir = str(tmp_path)
+    Old = pd.DataFrame({"Label": ["old", "old"], "Size": [300, 300], "Stage": STAGES[:2], "Mode": "montecarlo",
+                        "Sampler": "tokens", "Iterations": 10, "Seconds": [1.0, 2.0], "PeakMB": [5.0, 6.0]})
+    Old.to_csv(os.path.join(output_dir, "benchmark_results.csv"), index=False)
+    Results = run_benchmark([300], output_dir, numiter=10, label="new")
+    Change = store_benchmark(Results, output_dir)
+    Stored = pd.read_csv(os.path.join(output_dir, "benchmark_results.csv"))
+    assert len(Stored) == 2 + len(Results) and set(Old.columns) | set(Results.columns) == set(Stored.columns)
+    pd.testing.assert_frame_equal(Stored[Old.columns].iloc[:2], Old)
+    assert Stored.PeakMB.iloc[2:].isna().all() and Stored.PeakRSSMB.iloc[:2].isna().all()
+    assert Change.Stage.tolist() == STAGES[:2] and Change.PeakRSSMB_previous.isna().all()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the cache of samples already read (--cache-dir, --cache-list, --cache-warm, --cache-evict)
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path to read the outputs and filecmp to compare the outputs of several runs
+# https://docs.python.org/3/library/filecmp.html
+import os.path
+import filecmp
+# import shutil to copy the samples
+# https://docs.python.org/3/library/shutil.html
+import shutil
+# import pandas to read the outputs
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+
+from conftest import run_command, run_script
+
+
+OUTPUTS = ["summary_table.csv", "results_creativity.csv", "iterations_summary_Prefixes.csv", "iterations_summary_Suffixes.csv"]
+
+def listed(directory, cache):
+    """Return the keys of the samples and the keys of the results listed by --cache-list."""
+    lines = run_command(directory, ["--cache-list", "--cache-dir", cache]).splitlines()
+    split = [line.startswith("Results (") for line in lines].index(True)
+    samples, results = lines[1:split], lines[split + 1:]
+    assert lines[0].endswith("(" + str(len(samples)) + " entries)")
+    assert lines[split].endswith("(" + str(len(results)) + " entries):")
+    return [line.split()[0] for line in samples], [line.split()[0] for line in results]
+
+def entries(directory, cache):
+    """Return the keys of the samples listed by --cache-list."""
+    return listed(directory, cache)[0]
+
+# A sample taken from the cache gives the same outputs as the sample read from its txt file
+def test_cache_round_trip(pair, tmp_path):
+    cache = str(tmp_path / "cache")
+    for name in ("store", "hit", "nocache"):
+        (tmp_path / name).mkdir()
+    run_script(tmp_path / "store", pair, 100, "--seed", "4", "--cache-dir", cache)
+    samples, results = listed(str(tmp_path), cache)
+    assert len(samples) == 2 and len(results) == 1
+    run_script(tmp_path / "hit", pair, 100, "--seed", "4", "--cache-dir", cache)
+    run_script(tmp_path / "nocache", pair, 100, "--seed", "4", "--no-cache")
+    assert listed(str(tmp_path), cache) == (samples, results)
+    for output in OUTPUTS:
+        assert filecmp.cmp(str(tmp_path / "hit" / output), str(tmp_path / "nocache" / output), shallow=False), output
+
+# A file that changes, or that is read with another normalization, gets a new entry, and its old entry is not used
+def test_changed_file_gets_new_entry(pair, tmp_path):
+    cache = str(tmp_path / "cache")
+    txtfiles = [shutil.copy(txtfile, str(tmp_path)) for txtfile in pair]
+    run_command(tmp_path, ["--cache-warm"] + txtfiles + ["--cache-dir", cache])
+    with open(txtfiles[0], "a") as f:
+        f.write("p0_s0\n" * 5)
+    run_script(tmp_path, txtfiles, 10, "--seed", "4", "--cache-dir", cache)
+    run_command(tmp_path, ["--cache-warm", txtfiles[1], "--normalization", "none", "--cache-dir", cache])
+    assert len(entries(str(tmp_path), cache)) == 4
+    assert pd.read_csv(os.path.join(str(tmp_path), "summary_table.csv"), index_col=0).Tokens.iloc[0] == 605
+
+def test_cache_evict(pair, tmp_path):
+    cache = str(tmp_path / "cache")
+    run_command(tmp_path, ["--cache-warm"] + list(pair) + ["--cache-dir", cache])
+    keys = entries(str(tmp_path), cache)
+    run_command(tmp_path, ["--cache-evict", keys[0], "--cache-dir", cache])
+    assert entries(str(tmp_path), cache) == keys[1:]
+    run_command(tmp_path, ["--cache-evict", "--cache-dir", cache])
+    assert entries(str(tmp_path), cache) == []
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the command line and of the library (import eslipro): the same analysis in every way it can be run
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path to read the outputs and filecmp to compare the outputs of several runs
+# https://docs.python.org/3/library/filecmp.html
+import os.path
+import filecmp
+# import Numpy to draw a sample
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pytest to check the errors
+# https://docs.pytest.org/
+import pytest
+
+from conftest import run_command, run_script, write_sample
+from eslipro.analysis import EqualSamplesError, compare, run_comparison
+from eslipro.corpus import read_corpus
+
+
+OUTPUTS = ["summary_table.csv", "results_creativity.csv", "iterations_summary_Prefixes.csv", "iterations_summary_Suffixes.csv"]
+
+def feedback_lines(directory):
+    """Return the lines of feedback_file.txt, without the last one (the time and memory of the run)."""
+    with open(os.path.join(directory, "feedback_file.txt")) as f:
+        return f.read().splitlines()[:-1]
+
+def same_outputs(directory1, directory2):
+    """Return the outputs that differ between two runs."""
+    differ = [output for output in OUTPUTS
+              if not filecmp.cmp(os.path.join(directory1, output), os.path.join(directory2, output), shallow=False)]
+    return differ + (["feedback_file.txt"] if feedback_lines(directory1) != feedback_lines(directory2) else [])
+
+# The files and the number of iterations given as arguments, typed in when the script asks for them, or given to
+# run_comparison from Python give the same outputs
+def test_arguments_answers_and_library_agree(pair, tmp_path):
+    for name in ("answers", "arguments", "library"):
+        (tmp_path / name).mkdir()
+    run_script(tmp_path / "answers", pair, 100, "--seed", "8", "--no-cache")
+    run_command(tmp_path, list(pair) + ["--iterations", "100", "--seed", "8", "--no-cache", "--output-dir", "arguments"])
+    run_comparison(*pair, output_dir=str(tmp_path / "library"), numiter=100, seed=8, histograms=False)
+    assert same_outputs(str(tmp_path / "answers"), str(tmp_path / "arguments")) == []
+    assert same_outputs(str(tmp_path / "answers"), str(tmp_path / "library")) == []
+
+# Two samples with the same number of tokens after the vocabulary control cannot be compared
+def test_equal_samples(tmp_path):
+    txtfile = write_sample(str(tmp_path / "a.txt"), 100, 0, 10, 5, np.random.default_rng(1))
+    with pytest.raises(EqualSamplesError):
+        compare(read_corpus(txtfile), read_corpus(txtfile), numiter=10)
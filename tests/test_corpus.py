@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of {00.b}: reading the samples
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path to read the outputs
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import pandas to read the outputs
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import pytest to run the same test with every normalization
+# https://docs.pytest.org/
+import pytest
+
+from conftest import run_script
+
+
+def write_lines(txtfile, lines):
+    """Write a list of prefix_suffix lines and return the path of the file."""
+    with open(txtfile, "w", encoding="utf-8") as f:
+        f.write("".join(line + "\n" for line in lines))
+    return str(txtfile)
+
+def read_creativity(directory, sample, position):
+    """Return the CRE of every morpheme of a sample and position in results_creativity.csv, as strings."""
+    Creativity = pd.read_csv(os.path.join(directory, "results_creativity.csv"), dtype=str, keep_default_na=False)
+    Creativity = Creativity[(Creativity.Sample == str(sample)) & (Creativity.Position == position)]
+    return dict(zip(Creativity.Morpheme, Creativity.CRE))
+
+# Every morpheme is read as a string (a number or "NA" is a morpheme like any other), and the characters other than
+# letters and digits are replaced by "xx", as in the original script
+LINES = ["NA_x", "1_2", "a-b_x", "ça_va", "NA_2", "NA_x"]
+
+def test_morphemes_are_strings(tmp_path):
+    txtfiles = (write_lines(tmp_path / "a.txt", LINES), write_lines(tmp_path / "b.txt", LINES + ["1_x", "1_x"]))
+    run_script(tmp_path, txtfiles, 10, "--seed", "1")
+    assert read_creativity(str(tmp_path), 1, "Prefix") == {"1": "1", "NA": "2", "axxb": "1", "xxa": "1"}
+    assert read_creativity(str(tmp_path), 2, "Suffix") == {"2": "2", "va": "1", "x": "3"}
+
+# --normalization: "ascii" replaces everything but a-z and 0-9, "unicode" keeps the letters of any alphabet and "none"
+# keeps every string; two strings that become the same (a-b and a+b) are one morpheme, with the partners of both
+NORMALIZED = {"ascii": {"nixxo": "1", "axxb": "2", "xxa": "2"},
+              "unicode": {"niño": "1", "axxb": "2", "ça": "2"},
+              "none": {"niño": "1", "a-b": "1", "a+b": "2", "ça": "2"}}
+
+@pytest.mark.parametrize("normalization", sorted(NORMALIZED))
+def test_normalization_rules(tmp_path, normalization):
+    lines = ["niño_x", "a-b_x", "a+b_y", "a+b_x", "ça_va", "ça_x"]
+    txtfiles = (write_lines(tmp_path / "a.txt", lines), write_lines(tmp_path / "b.txt", lines + lines[:3]))
+    run_script(tmp_path, txtfiles, 10, "--seed", "1", "--normalization", normalization)
+    assert read_creativity(str(tmp_path), 1, "Prefix") == NORMALIZED[normalization]
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of {01}-{03}: the rows None and Lexical of summary_table.csv against the definitions of the original script
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path to read the outputs and statistics for the mean and sd of the reference values
+# https://docs.python.org/3/library/statistics.html
+import os.path
+import statistics
+# import Numpy to compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pandas to read the outputs
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import pytest for the run of the script shared by the tests
+# https://docs.pytest.org/
+import pytest
+
+from conftest import read_lines, run_script
+
+
+# The original script searched every prefix (and suffix) in the set of construction types: its CRE is the number of
+# construction types where it is found, and TRI is the proportion of morphemes with CRE = 1
+def reference_cre(lines):
+    """Return the CRE of every prefix and of every suffix of a list of prefix_suffix lines."""
+    constructions = [line.split("_") for line in set(lines)]
+    prefixes = {prefix: 0 for prefix, suffix in constructions}
+    suffixes = {suffix: 0 for prefix, suffix in constructions}
+    for prefix, suffix in constructions:
+        prefixes[prefix] += 1
+        suffixes[suffix] += 1
+    return prefixes, suffixes
+
+def reference_row(CRE, ntokens, ntypes):
+    """Return the CRE, sd, Tokens, Types and TRI of a row of summary_table.csv."""
+    values = list(CRE.values())
+    return [statistics.mean(values), statistics.stdev(values), ntokens, ntypes, sum(value == 1 for value in values) / len(values)]
+
+def reference_rows(lines1, lines2):
+    """Return the rows None and Lexical of summary_table.csv computed with the definitions of the original script."""
+    rows = []
+    cre = [reference_cre(lines1), reference_cre(lines2)]
+    for (prefixes, suffixes), lines in zip(cre, (lines1, lines2)):
+        rows.append(reference_row(prefixes, len(lines), len(suffixes)))
+        rows.append(reference_row(suffixes, len(lines), len(prefixes)))
+    # {03} only the constructions with a prefix and a suffix found in the other sample are kept
+    shared_prefixes = set(cre[0][0]) & set(cre[1][0])
+    shared_suffixes = set(cre[0][1]) & set(cre[1][1])
+    for lines, nshared in zip((lines1, lines2), (len(shared_prefixes), len(shared_suffixes))):
+        kept = [line for line in lines if line.split("_")[0] in shared_prefixes and line.split("_")[1] in shared_suffixes]
+        prefixes, suffixes = reference_cre(kept)
+        rows.append(reference_row(prefixes, len(kept), nshared))
+        rows.append(reference_row(suffixes, len(kept), nshared))
+    return rows
+
+@pytest.fixture(scope="module")
+def outputs(pair, tmp_path_factory):
+    """Return the directory of a run of the script on both synthetic samples."""
+    return run_script(tmp_path_factory.mktemp("run"), pair, 20)
+
+def test_rows_match_original_definitions(pair, outputs):
+    ResultsTable = pd.read_csv(os.path.join(outputs, "summary_table.csv"), index_col=0)
+    computed = ResultsTable[ResultsTable.Control != 'Both'][['CRE', 'sd', 'Tokens', 'Types', 'TRI']].to_numpy(dtype=float)
+    expected = np.array(reference_rows(read_lines(pair[0]), read_lines(pair[1])), dtype=float)
+    np.testing.assert_allclose(computed, expected)
+
+# The CRE of Samples 1 and 2 are written as integers in results_creativity.csv, as in the original script
+def test_creativity_keeps_integer_cre(outputs):
+    Creativity = pd.read_csv(os.path.join(outputs, "results_creativity.csv"), dtype={"CRE": str})
+    assert not Creativity[Creativity.Sample < 3].CRE.str.contains(r"\.").any()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of --mode exact: the expected values of Sample 3 against the mean of many random samples
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path to read the outputs
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import Numpy to compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pandas to read the outputs
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+
+from conftest import run_script
+from eslipro.cre import compute_cre
+from eslipro.exact import exact_cre
+
+
+def read_outputs(directory):
+    """Return summary_table.csv and the Sample 3 rows of results_creativity.csv of a run."""
+    ResultsTable = pd.read_csv(os.path.join(directory, "summary_table.csv"), index_col=0)
+    Creativity = pd.read_csv(os.path.join(directory, "results_creativity.csv"))
+    return ResultsTable, Creativity[Creativity.Sample == 3].set_index(["Position", "Morpheme"]).CRE.sort_index()
+
+# The mean CRE of every morpheme of Sample 3 over 1000 random samples is close to its expected value, and the rows
+# before the control of sample size do not depend on the mode
+def test_exact_matches_montecarlo(pair, tmp_path):
+    (tmp_path / "exact").mkdir()
+    (tmp_path / "montecarlo").mkdir()
+    exact, exact_cre = read_outputs(run_script(tmp_path / "exact", pair, 0, "--mode", "exact"))
+    montecarlo, montecarlo_cre = read_outputs(run_script(tmp_path / "montecarlo", pair, 1000, "--seed", "3"))
+    both = exact.Control == 'Both'
+    np.testing.assert_allclose(montecarlo[both].CRE, exact[both].CRE, rtol=0.01)
+    # a morpheme with few tokens is drawn in few random samples, so its mean CRE is less precise
+    np.testing.assert_allclose(montecarlo_cre, exact_cre[montecarlo_cre.index], atol=0.3)
+    pd.testing.assert_frame_equal(montecarlo[~both], exact[~both])
+
+# Without a number of iterations, TRI of the exact mode is the limit of many random samples: the morphemes used with
+# just one partner in the larger sample, out of all of them
+def test_exact_tri_limit(corpora):
+    n = corpora[0].ntokens
+    limit = exact_cre(corpora[1], n)
+    np.testing.assert_allclose(exact_cre(corpora[1], n, numiter=10 ** 6)[2:], limit[2:], rtol=1e-6)
+    cre = compute_cre(corpora[1], 2)
+    assert limit[2:] == (cre.count_Tri_Pre, cre.count_Tri_Suf, len(cre.Pre), len(cre.Suf))
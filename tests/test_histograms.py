@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of {6}: the bins of the histograms of CRE (histograms_CRE.csv) and their images (--plots)
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os, sys and subprocess to check the modules imported by a run
+# https://docs.python.org/3/library/subprocess.html
+import os
+import sys
+import subprocess
+# import Numpy to compute the bins
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pandas to read the bins
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+
+from conftest import ROOT
+from eslipro.analysis import compare, histogram_bins, run_comparison
+
+
+# Every bin counts the morphemes whose CRE (mean CRE for Sample 3) has the same integer part
+def test_histogram_bins(corpora):
+    comparison = compare(*corpora, numiter=50, seed=2, progress=False)
+    Bins = histogram_bins(comparison)
+    samples = {1: comparison.cre1b, 2: comparison.cre2b, 3: comparison.sample3.cre}
+    assert sorted(Bins.Plot.unique()) == ["1-2", "1-3"]
+    for (name, label, sample), Bin in Bins.groupby(['Position', 'Plot', 'Sample']):
+        CRE = getattr(samples[sample], "Pre" if name == "Prefixes" else "Suf").CRE.astype(float)
+        expected = np.floor(CRE).astype(int).value_counts().sort_index()
+        assert Bin.CRE.tolist() == expected.index.tolist() and Bin.Count.tolist() == expected.tolist()
+
+# The images are drawn with --plots only, and a run without them never imports matplotlib
+def test_images_only_on_request(pair, tmp_path):
+    run_comparison(*pair, output_dir=str(tmp_path / "plots"), numiter=20, seed=1, plots=True)
+    images = sorted(name for name in os.listdir(str(tmp_path / "plots")) if name.endswith(".png"))
+    assert images == ["histogram_" + name + "_" + label + ".png" for name in ("Prefixes", "Suffixes") for label in ("1-2", "1-3")]
+    code = ("import sys; from eslipro.analysis import run_comparison; run_comparison(" + repr(pair[0]) + ", " + repr(pair[1]) +
+            ", output_dir=" + repr(str(tmp_path / "bins")) + ", numiter=20, seed=1); print('matplotlib' in sys.modules)")
+    run = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert run.stdout.split()[-1] == "False", run.stderr
+    assert not any(name.endswith(".png") for name in os.listdir(str(tmp_path / "bins")))
+    Bins = pd.read_csv(str(tmp_path / "bins" / "histograms_CRE.csv"), dtype={'Plot': str})
+    assert Bins.Count.sum() > 0
+    run_comparison(*pair, output_dir=str(tmp_path / "none"), numiter=20, seed=1, histograms=False)
+    assert not os.path.exists(str(tmp_path / "none" / "histograms_CRE.csv"))
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the incremental mode (--update) against a full recompute
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import Numpy to compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pytest to check the errors
+# https://docs.pytest.org/
+import pytest
+
+from conftest import read_lines
+from eslipro.analysis import build_results_table, compare
+from eslipro.corpus import read_corpus
+from eslipro.incremental import update_state
+
+
+COLUMNS = ['CRE', 'sd', 'Tokens', 'Types', 'TRI']
+
+def full_rows(txtfile1, txtfile2):
+    """Return the rows None and Lexical of summary_table.csv computed from the whole files."""
+    ResultsTable = build_results_table(compare(read_corpus(txtfile1), read_corpus(txtfile2), mode="exact", progress=False))
+    return ResultsTable[ResultsTable.Control != 'Both'][COLUMNS].to_numpy(dtype=float)
+
+# Both files grow in uneven steps (the first update only has lines of the first file), and every update is compared
+# with the comparison of the whole files; the last line of a step may be incomplete (it is read in the next update)
+def test_update_matches_full_recompute(pair, tmp_path):
+    lines = [read_lines(txtfile) for txtfile in pair]
+    growing = [str(tmp_path / "a.txt"), str(tmp_path / "b.txt")]
+    state = str(tmp_path / "state")
+    text = ["\n".join(sample) + "\n" for sample in lines]
+    cuts = [[0, 250, 251, 400, 603, len(text[0])], [0, 0, 700, 1100, 2890, len(text[1])]]
+    for step in range(1, len(cuts[0])):
+        for k in range(2):
+            with open(growing[k], "a") as f:
+                f.write(text[k][cuts[k][step - 1]:cuts[k][step]])
+        if step == 1:
+            # nothing is shared yet: the rows of the second sample are empty
+            update_state(state, *growing)
+            continue
+        rows = update_state(state, *growing).results_table()[COLUMNS].to_numpy(dtype=float)
+        complete = []
+        for k in range(2):
+            with open(growing[k]) as f:
+                content = f.read()
+            complete.append(str(tmp_path / ("complete" + str(k) + ".txt")))
+            with open(complete[k], "w") as f:
+                f.write(content[:content.rfind("\n") + 1])
+        np.testing.assert_allclose(rows, full_rows(*complete), equal_nan=True)
+    np.testing.assert_allclose(rows, full_rows(*pair))
+
+def test_update_checks_the_state(pair, tmp_path):
+    growing = str(tmp_path / "a.txt")
+    with open(pair[0]) as f:
+        content = f.read()
+    with open(growing, "w") as f:
+        f.write(content)
+    state = str(tmp_path / "state")
+    update_state(state, growing, pair[1])
+    # the normalization of a state cannot change
+    with pytest.raises(ValueError):
+        update_state(state, growing, pair[1], normalization="unicode")
+    # a file that was changed (not only appended to) needs a new state
+    with open(growing, "w") as f:
+        f.write("zz_zz\n" + content)
+    with pytest.raises(ValueError):
+        update_state(state, growing, pair[1])
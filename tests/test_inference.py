@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of {05.d}: permutation test and bootstrap interval of the difference between the samples, on known answers
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import Numpy to compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pandas to build the samples
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+
+from eslipro.corpus import Corpus
+from eslipro.inference import difference_tests
+from eslipro.vocabulary import shared_vocabulary, vocabulary_filter
+
+
+def filtered(corpus1, corpus2):
+    """Return both Corpus objects after the vocabulary control and their shared vocabulary."""
+    vocabulary = shared_vocabulary(corpus1, corpus2)
+    return vocabulary_filter(corpus1, vocabulary), vocabulary_filter(corpus2, vocabulary), vocabulary
+
+def corpus_of(constructions):
+    """Return the Corpus of a dict {(prefix, suffix): number of tokens}."""
+    return Corpus.from_table(pd.DataFrame([(prefix, suffix, count) for (prefix, suffix), count in constructions.items()],
+                                          columns=["prefix", "suffix", "count"]))
+
+# A sample compared with itself: no difference, every permuted split is at least as far from it (p = 1), and the
+# bootstrap interval is around 0
+def test_same_samples(corpora):
+    FILT_1, FILT_2, vocabulary = filtered(corpora[1], corpora[1])
+    Table = difference_tests(FILT_1, FILT_2, vocabulary, replicates=200, seed=1).Table
+    np.testing.assert_allclose(Table.Difference, 0)
+    np.testing.assert_allclose(Table.p_permutation, 1)
+    assert ((Table.CI_low <= 0) & (Table.CI_high >= 0)).all()
+
+# Every prefix of Sample 1 is used with one suffix (CRE 1, TRI 1), and with every suffix in Sample 2 (CRE 10, TRI 0):
+# the observed values are the ones of the matrices, no permuted split is as different (p = 1 / (1 + replicates)) and
+# the bootstrap interval of the difference of CRE of prefixes excludes 0 (no suffix has just one partner in either sample)
+def test_different_samples():
+    prefixes = ["p" + str(i) for i in range(20)]
+    suffixes = ["s" + str(j) for j in range(10)]
+    corpus1 = corpus_of({(prefix, suffixes[i % 10]): 50 for i, prefix in enumerate(prefixes)})
+    corpus2 = corpus_of({(prefix, suffix): 5 for prefix in prefixes for suffix in suffixes})
+    Tests = difference_tests(*filtered(corpus1, corpus2), replicates=200, seed=1)
+    Table = Tests.Table.set_index(["Analysis", "Statistic"])
+    assert Table.loc[("Prefix/Suffix", "CRE"), ["Sample1", "Sample2"]].tolist() == [1, 10]
+    assert Table.loc[("Prefix/Suffix", "TRI"), ["Sample1", "Sample2"]].tolist() == [1, 0]
+    assert Table.loc[("Suffix/Prefix", "CRE"), ["Sample1", "Sample2"]].tolist() == [2, 20]
+    assert Table.loc[("Suffix/Prefix", "TRI"), ["Sample1", "Sample2", "p_permutation"]].tolist() == [0, 0, 1]
+    np.testing.assert_allclose(Table.p_permutation.iloc[:3], 1 / 201)
+    assert Table.loc[("Prefix/Suffix", "CRE"), "CI_low"] > 0
+    # the same seed gives the same tests
+    pd.testing.assert_frame_equal(difference_tests(*filtered(corpus1, corpus2), replicates=200, seed=1).Table, Tests.Table)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the run manifest (run_manifest.json) and of the profile of one section (--profile)
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path and json to read the manifest
+# https://docs.python.org/3/library/json.html
+import os.path
+import json
+# import contextlib for the hook of the test
+# https://docs.python.org/3/library/contextlib.html
+import contextlib
+# import pstats to read the profile
+# https://docs.python.org/3/library/profile.html
+import pstats
+
+from eslipro.analysis import run_comparison
+from eslipro.instrument import MANIFEST_VERSION, RunReport, write_manifest
+
+
+def read_manifest(output_dir):
+    """Return the content of run_manifest.json in output_dir."""
+    with open(os.path.join(output_dir, "run_manifest.json")) as f:
+        return json.load(f)
+
+# Every section is written with its counts, the profiled section has its profile and the hook runs around every section
+def test_write_manifest(tmp_path):
+    hooked = []
+
+    @contextlib.contextmanager
+    def hook(stage):
+        hooked.append(stage)
+        yield
+    report = RunReport(profile="b", hook=hook)
+    with report.stage("a", "first") as counts:
+        counts["tokens"] = 10
+    with report.stage("b", "second"):
+        sum(range(1000))
+    write_manifest(report, str(tmp_path), mode="exact")
+    manifest = read_manifest(str(tmp_path))
+    assert manifest["version"] == MANIFEST_VERSION and manifest["parameters"] == {"mode": "exact"}
+    assert [(stage["stage"], stage["description"], stage["counts"]) for stage in manifest["stages"]] == [
+        ("a", "first", {"tokens": 10}), ("b", "second", {})]
+    assert all(stage["wall_seconds"] >= 0 and stage["cpu_seconds"] >= 0 for stage in manifest["stages"])
+    assert hooked == ["a", "b"]
+    assert pstats.Stats(str(tmp_path / "profile_b.prof")).total_calls > 0
+
+# A comparison writes the manifest of all its sections, and its summary is the last line of feedback_file.txt
+def test_run_comparison_manifest(pair, tmp_path):
+    run_comparison(*pair, output_dir=str(tmp_path), numiter=20, seed=1, histograms=False, cache_dir=None)
+    manifest = read_manifest(str(tmp_path))
+    assert [stage["stage"] for stage in manifest["stages"]] == ["00.b", "01-02", "03", "04", "7"]
+    assert manifest["stages"][0]["counts"]["tokens"] == 1800
+    assert manifest["parameters"]["iterations"] == 20
+    with open(str(tmp_path / "feedback_file.txt")) as f:
+        assert f.read().splitlines()[-1].startswith("Run: ")
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the cache of results: a comparison taken from the cache writes the same outputs as a new compute
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path and json to read the outputs
+# https://docs.python.org/3/library/json.html
+import os.path
+import json
+# import filecmp to compare the outputs of both runs
+# https://docs.python.org/3/library/filecmp.html
+import filecmp
+# import time to give the entries of the cache their times of last use
+# https://docs.python.org/3/library/time.html
+import time
+
+from eslipro.analysis import run_comparison
+from eslipro.cli import main
+from eslipro.corpus import cache_entries
+from eslipro.memo import cache_usage, cacheable, trim_cache
+
+
+# The outputs that change from one run to another (times and memory) are not compared
+OUTPUTS = ["summary_table.csv", "results_creativity.csv", "iterations_summary_Prefixes.csv", "iterations_summary_Suffixes.csv",
+           "histograms_CRE.csv"]
+
+def cached(output_dir):
+    """Return True when the run of output_dir took its results from the cache (see run_manifest.json)."""
+    with open(os.path.join(output_dir, "run_manifest.json")) as f:
+        return json.load(f)["parameters"]["cached"]
+
+def test_cache_hit_equals_recompute(pair, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    runs = {name: str(tmp_path / name) for name in ("first", "hit", "recompute")}
+    for name in ("first", "hit"):
+        run_comparison(*pair, output_dir=runs[name], numiter=200, seed=9, cache_dir=cache_dir, tests=100, best=True)
+    run_comparison(*pair, output_dir=runs["recompute"], numiter=200, seed=9, tests=100, best=True)
+    assert not cached(runs["first"]) and cached(runs["hit"]) and not cached(runs["recompute"])
+    for output in OUTPUTS + ["best_summary.csv"]:
+        assert filecmp.cmp(os.path.join(runs["hit"], output), os.path.join(runs["recompute"], output), shallow=False), output
+    # the feedback file only differs in its last line (the times of the run)
+    feedback = []
+    for name in ("hit", "recompute"):
+        with open(os.path.join(runs[name], "feedback_file.txt")) as f:
+            feedback.append(f.read().splitlines()[:-1])
+    assert feedback[0] == feedback[1]
+
+# A change of the parameters of the analysis is a new entry
+def test_cache_key_includes_parameters(pair, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    run_comparison(*pair, output_dir=str(tmp_path / "a"), numiter=100, seed=9, cache_dir=cache_dir, histograms=False)
+    run_comparison(*pair, output_dir=str(tmp_path / "b"), numiter=100, seed=10, cache_dir=cache_dir, histograms=False)
+    run_comparison(*pair, output_dir=str(tmp_path / "c"), numiter=100, seed=9, cache_dir=cache_dir, histograms=False,
+                   sampler="counts")
+    assert not any(cached(str(tmp_path / name)) for name in "abc")
+
+# Only the runs without random parts can be kept without a seed
+def test_cacheable():
+    assert cacheable("montecarlo", 1) and cacheable("exact", None)
+    assert not cacheable("montecarlo", None)
+    assert not cacheable("exact", None, tests=100) and not cacheable("exact", None, best=True)
+    assert cacheable("exact", 1, tests=100, best=True)
+    assert not cacheable("montecarlo", 1, iteration_files=("a.csv", "b.csv"))
+
+# The entries used the longest time ago (samples and results alike) are removed first, until the cache fits
+def test_trim_cache(tmp_path):
+    cache_dir = str(tmp_path)
+    now = time.time()
+    for age, path in enumerate(["sample1", "results/result1", "sample2", "results/result2"]):
+        (tmp_path / path).mkdir(parents=True)
+        (tmp_path / path / "data").write_bytes(b"x" * 1000)
+        (tmp_path / path / "meta.json").write_text("{}")
+        os.utime(str(tmp_path / path / "meta.json"), (now - age, now - age))
+    removed = trim_cache(cache_dir, 2500)
+    assert sorted(os.path.relpath(path, cache_dir) for path in removed) == ["results/result2", "sample2"]
+    assert trim_cache(cache_dir, 2500) == []
+
+# The samples stored by the runs whose results are not kept (no seed, --cache-warm) keep the cache within its size too
+def test_samples_keep_cache_size(pair, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    main(["--cache-warm", pair[0], "--cache-dir", cache_dir])
+    entry_bytes = sum(size for used, size, path in cache_usage(cache_dir))
+    main(["--cache-warm", pair[1], "--cache-dir", cache_dir, "--cache-size", str(1.5 * entry_bytes / 2 ** 20)])
+    assert [entry["source"] for entry in cache_entries(cache_dir)] == [os.path.abspath(pair[1])]
+    run_comparison(pair[1], pair[0], str(tmp_path / "run"), numiter=10, cache_dir=cache_dir, cache_size=int(1.5 * entry_bytes),
+                   histograms=False)
+    assert [entry["source"] for entry in cache_entries(cache_dir)] == [os.path.abspath(pair[0])]
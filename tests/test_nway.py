@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the comparison of more than two samples against separate comparisons of two samples
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path to write the paths of the samples
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import Numpy to draw the samples and compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pandas to compare tables
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import pytest to check the errors of the command line
+# https://docs.pytest.org/
+import pytest
+
+from conftest import read_lines, write_sample
+from eslipro.analysis import build_results_table, compare
+from eslipro.cli import main
+from eslipro.corpus import read_corpus
+from eslipro.nway import build_nway_table, compare_many
+from eslipro.resampling import derived_seed
+
+
+VALUES = ['CRE', 'sd', 'TRI']
+
+# When all the samples have the same prefixes and suffixes, the vocabulary control of N samples is the one of every
+# pair, so every sample must have the values it has in a comparison of two samples
+def same_vocabulary(samples):
+    """Return the lines of every sample whose prefix and suffix are found in all the samples."""
+    while True:
+        prefixes = set.intersection(*(set(line.split("_")[0] for line in lines) for lines in samples))
+        suffixes = set.intersection(*(set(line.split("_")[1] for line in lines) for lines in samples))
+        kept = [[line for line in lines if line.split("_")[0] in prefixes and line.split("_")[1] in suffixes]
+                for lines in samples]
+        if kept == samples:
+            return kept
+        samples = kept
+
+def test_nway_matches_two_way_runs(tmp_path):
+    rng = np.random.default_rng(9)
+    names = ["a.txt", "b.txt", "c.txt"]
+    samples = same_vocabulary([read_lines(write_sample(str(tmp_path / name), ntokens, 0, 40, 10, rng))
+                               for name, ntokens in zip(names, (500, 900, 1300))])
+    corpora = {}
+    for name, lines in zip(names, samples):
+        with open(str(tmp_path / name), "w") as f:
+            f.write("".join(line + "\n" for line in lines))
+        corpora[name] = read_corpus(str(tmp_path / name))
+    nway = compare_many(corpora, numiter=100, seed=5)
+    Table = build_nway_table(nway)
+    rows = {(name, control): Table[(Table.Name == name) & (Table.Control == control)][VALUES].to_numpy(dtype=float)
+            for name in names for control in ('None', 'Lexical', 'Both')}
+    # the smallest sample is not resampled, and every larger one is resampled with the seed derived from its name
+    np.testing.assert_allclose(rows["a.txt", 'Both'], rows["a.txt", 'Lexical'])
+    for name in names[1:]:
+        ResultsTable = build_results_table(compare(corpora["a.txt"], corpora[name], numiter=100,
+                                                   seed=derived_seed(nway.entropy, name), progress=False))
+        for control, sample in (('None', 1), ('Lexical', 1), ('None', 2), ('Lexical', 2), ('Both', 1)):
+            expected = ResultsTable[(ResultsTable.Control == control) & (ResultsTable.Sample == sample)][VALUES]
+            np.testing.assert_allclose(rows[name if sample == 2 or control == 'Both' else "a.txt", control],
+                                       expected.to_numpy(dtype=float))
+
+# The seed of a sample depends on its file name, not on the way its path is written
+def test_nway_seeds_from_file_names(pair, corpora, tmp_path, capsys):
+    third = read_corpus(write_sample(str(tmp_path / "c.txt"), 900, 5, 60, 12, np.random.default_rng(2)))
+    written = {os.path.join(".", "dir", "a.txt"): corpora[0], "b.txt": corpora[1], str(tmp_path / "c.txt"): third}
+    plain = {"a.txt": corpora[0], os.path.join("dir", "b.txt"): corpora[1], "c.txt": third}
+    tables = [build_nway_table(compare_many(samples, numiter=20, seed=5)).drop(columns='Name') for samples in (written, plain)]
+    pd.testing.assert_frame_equal(tables[0], tables[1])
+    for option in ("--plots", "--no-histograms"):
+        with pytest.raises(SystemExit):
+            main(list(pair) + [str(tmp_path / "c.txt"), "--iterations", "10", option])
+        assert "only available for the comparison of two files" in capsys.readouterr().err
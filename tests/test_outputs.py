@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the output formats (--output-format): tables and dense iteration matrices in npz, Parquet and Feather
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path to find the outputs
+# https://docs.python.org/3/library/os.path.html
+import os.path
+# import Numpy to compare the matrices
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pandas to read the outputs
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import pytest to run the same test with every format
+# https://docs.pytest.org/
+import pytest
+
+from eslipro.analysis import run_comparison
+from eslipro.outputs import IterationWriter, read_iterations
+
+
+FORMATS = ["npz", "parquet", "feather"]
+
+# The blocks of iterations are written one after the other (the CRE of a morpheme not drawn is 0), and read back as one
+# matrix of the smallest type that holds the largest CRE, with its vocabulary
+@pytest.mark.parametrize("output_format", FORMATS)
+def test_iteration_writer_round_trip(tmp_path, output_format):
+    # a morpheme can have the name of the column of the iterations
+    vocab = ["a", "Iteration", "NA", "1"]
+    path = str(tmp_path / ("iterations." + output_format))
+    writer = IterationWriter(path, vocab, [3, 300, 1, 2], output_format)
+    writer.write([(np.array([0, 0, 1]), np.array([0, 1, 3]), np.array([1, 300, 2]))], 2)
+    writer.write([(np.array([2]), np.array([2]), np.array([1])), (np.array([4]), np.array([0]), np.array([3]))], 5)
+    writer.close()
+    matrix, vocabulary = read_iterations(path)
+    expected = np.zeros((5, 4), dtype=np.uint16)
+    expected[[0, 0, 1, 2, 4], [0, 1, 3, 2, 0]] = [1, 300, 2, 1, 3]
+    assert matrix.dtype == np.uint16
+    np.testing.assert_array_equal(matrix, expected)
+    assert vocabulary.tolist() == vocab
+
+# The iterations of a run written as dense matrices are the rows of the iterations_*.csv files of the same run in csv
+@pytest.mark.parametrize("output_format", FORMATS)
+def test_iterations_match_csv(pair, tmp_path, output_format):
+    for name in ("csv", output_format):
+        run_comparison(*pair, output_dir=str(tmp_path / name), numiter=30, seed=3, histograms=False, iterations_out=True,
+                       output_format=name)
+    for position in ("Prefixes", "Suffixes"):
+        Long = pd.read_csv(str(tmp_path / "csv" / ("iterations_" + position + ".csv")), dtype={"Morpheme": str},
+                           keep_default_na=False)
+        matrix, vocabulary = read_iterations(str(tmp_path / output_format / ("iterations_" + position + "." + output_format)))
+        expected = np.zeros((30, len(vocabulary)), dtype=np.int64)
+        expected[Long.Iteration.to_numpy(), vocabulary.get_indexer(Long.Morpheme)] = Long.CRE
+        np.testing.assert_array_equal(matrix, expected)
+    Summary = pd.read_csv(str(tmp_path / "csv" / "summary_table.csv"), index_col=0)
+    Read = (np.load if output_format == "npz" else pd.read_parquet if output_format == "parquet" else pd.read_feather)(
+        os.path.join(str(tmp_path / output_format), "summary_table." + output_format))
+    np.testing.assert_allclose(np.asarray(Read["CRE"], dtype=float), Summary.CRE.to_numpy(dtype=float))
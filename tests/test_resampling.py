@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of {04}: the random samples of Sample 3
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import os.path to read the outputs and filecmp to compare the outputs of several runs
+# https://docs.python.org/3/library/filecmp.html
+import os.path
+import filecmp
+# import Numpy to draw larger samples
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pandas to read the outputs
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import pytest to run the same test with every sampler
+# https://docs.pytest.org/
+import pytest
+
+from conftest import read_lines, run_script, write_sample
+from eslipro.analysis import build_results_table, compare
+
+
+# Every random sample is drawn from the larger sample after the vocabulary control: in every iteration, a morpheme
+# cannot have more partners than in that sample, and the number of construction types drawn is the sum of the CRE of
+# the prefixes as well as the sum of the CRE of the suffixes
+def test_iterations_are_samples_of_the_filtered_sample(pair, tmp_path):
+    run_script(tmp_path, pair, 50, "--iterations-out")
+    lines = [read_lines(txtfile) for txtfile in pair]
+    shared = [set(line.split("_")[k] for line in lines[0]) & set(line.split("_")[k] for line in lines[1]) for k in range(2)]
+    kept = set(line for line in lines[1] if line.split("_")[0] in shared[0] and line.split("_")[1] in shared[1])
+    partners = [pd.Series([line.split("_")[k] for line in kept]).value_counts() for k in range(2)]
+    totals = []
+    for k, position in enumerate(("Prefixes", "Suffixes")):
+        Long = pd.read_csv(os.path.join(str(tmp_path), "iterations_" + position + ".csv"))
+        assert sorted(Long.Iteration.unique()) == list(range(50))
+        assert set(Long.Morpheme) <= shared[k]
+        assert (Long.CRE.to_numpy() <= partners[k][Long.Morpheme].to_numpy()).all()
+        totals.append(Long.groupby("Iteration").CRE.sum())
+    pd.testing.assert_series_equal(totals[0], totals[1])
+
+# Every iteration has its own random generator, so the same seed gives the same outputs with 1, 3 or 4 workers
+# (the samples are larger than the synthetic pair, so that the iterations are split into several batches)
+def test_results_do_not_depend_on_workers(tmp_path):
+    rng = np.random.default_rng(5)
+    large = (write_sample(str(tmp_path / "a.txt"), 3000, 0, 300, 40, rng),
+             write_sample(str(tmp_path / "b.txt"), 8000, 10, 300, 40, rng))
+    runs = []
+    for workers in (1, 3, 4):
+        (tmp_path / str(workers)).mkdir()
+        runs.append(run_script(tmp_path / str(workers), large, 1000, "--seed", "11", "--workers", str(workers),
+                               "--iterations-out", "--quantiles", "0.5"))
+    for run in runs[1:]:
+        for output in ("iterations_Prefixes.csv", "iterations_Suffixes.csv", "iterations_summary_Prefixes.csv",
+                       "iterations_summary_Suffixes.csv", "summary_table.csv", "results_creativity.csv"):
+            assert filecmp.cmp(os.path.join(run, output), os.path.join(runs[0], output), shallow=False), output
+
+# The summaries of the iterations are kept without keeping the iterations: they are the same as the ones computed from
+# the rows of every iteration (the quantiles are values of CRE actually found, as numpy's "inverted_cdf")
+def test_summaries_match_iteration_rows(pair, tmp_path):
+    run_script(tmp_path, pair, 200, "--seed", "2", "--iterations-out", "--quantiles", "0.1", "0.5", "0.9")
+    for position in ("Prefixes", "Suffixes"):
+        Long = pd.read_csv(os.path.join(str(tmp_path), "iterations_" + position + ".csv"))
+        Stats = pd.read_csv(os.path.join(str(tmp_path), "iterations_summary_" + position + ".csv")).set_index("Morpheme")
+        grouped = Long.groupby("Morpheme").CRE
+        expected = pd.DataFrame({"Iterations": grouped.size(), "CRE": grouped.mean(), "sd": grouped.std()})
+        for q in (0.1, 0.5, 0.9):
+            expected["q" + format(q, "g")] = grouped.apply(lambda values: np.quantile(values, q, method="inverted_cdf"))
+        pd.testing.assert_frame_equal(Stats.sort_index(), expected.sort_index(), check_dtype=False, check_names=False)
+
+# With a precision, the run stops at the same iteration whatever the number of workers, once the standard errors of
+# the overall CRE of prefixes and suffixes are at most the precision
+def test_precision_does_not_depend_on_workers(corpora):
+    samples = [compare(*corpora, numiter=5000, seed=11, workers=workers, progress=False, precision=0.05).sample3
+               for workers in (1, 3)]
+    assert samples[0].iterations == samples[1].iterations < 5000
+    assert samples[0].iterations % 100 == 0
+    assert samples[0].converged and max(samples[0].errors[:2]) <= 0.05
+    pd.testing.assert_frame_equal(samples[0].Pre_Stats, samples[1].Pre_Stats)
+
+# Every iteration has its own random generator, so the same seed gives the same tables with 1, 3 or 4 workers, with
+# every sampler
+@pytest.mark.parametrize("sampler", ["tokens", "counts", "bootstrap"])
+def test_samplers_do_not_depend_on_workers(corpora, sampler):
+    comparisons = [compare(*corpora, numiter=300, seed=11, workers=workers, progress=False, sampler=sampler, quantiles=(0.5,))
+                   for workers in (1, 3, 4)]
+    for comparison in comparisons[1:]:
+        pd.testing.assert_frame_equal(comparison.sample3.Pre_Stats, comparisons[0].sample3.Pre_Stats)
+        pd.testing.assert_frame_equal(comparison.sample3.Suf_Stats, comparisons[0].sample3.Suf_Stats)
+        pd.testing.assert_frame_equal(build_results_table(comparison), build_results_table(comparisons[0]))
+
+# The counts sampler draws without replacement, as the token sampler: the mean CRE and TRI of Sample 3 over many random
+# samples of both are close to the expected values of the exact mode for the same number of iterations
+@pytest.mark.parametrize("sampler", ["tokens", "counts"])
+def test_samplers_match_exact(corpora, sampler):
+    exact = build_results_table(compare(*corpora, mode="exact", numiter=2000, progress=False))
+    montecarlo = build_results_table(compare(*corpora, numiter=2000, seed=3, progress=False, sampler=sampler))
+    both = exact.Control == 'Both'
+    np.testing.assert_allclose(montecarlo[both].CRE.astype(float), exact[both].CRE.astype(float), rtol=0.01)
+    np.testing.assert_allclose(montecarlo[both].TRI.astype(float), exact[both].TRI.astype(float), atol=0.01)
+    pd.testing.assert_frame_equal(montecarlo[~both], exact[~both])
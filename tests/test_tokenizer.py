@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of {00.b}: the byte-level tokenizer against the prefix_suffix lines split in Python
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import Numpy to draw the strings
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pytest to run the same test with several sizes of blocks
+# https://docs.pytest.org/
+import pytest
+
+from eslipro.cli import main
+from eslipro.tokenizer import Tokenizer, map_file
+
+
+def tokenize(tmp_path, content, block=1 << 26):
+    """Write content (bytes) in a file and return its (prefix, suffix) tokens and the Tokenizer that read them."""
+    txtfile = str(tmp_path / "sample.txt")
+    with open(txtfile, "wb") as f:
+        f.write(content)
+    tokenizer = Tokenizer(block=block, cells=64)
+    prefixes, suffixes = [], []
+    for pre_codes, suf_codes in tokenizer.tokens(map_file(txtfile)):
+        prefixes.extend(pre_codes)
+        suffixes.extend(suf_codes)
+    vocabulary = [tokenizer.vocabulary(position) for position in (0, 1)]
+    return list(zip(vocabulary[0][prefixes], vocabulary[1][suffixes])), tokenizer
+
+# Morphemes of 1 to 30 bytes (strings of more than 8 bytes are coded by a hash of their words), read in blocks small
+# enough to cut lines, give the same tokens as the lines split in Python
+@pytest.mark.parametrize("block", [64, 1 << 26])
+def test_tokens_match_python_split(tmp_path, block):
+    rng = np.random.default_rng(2)
+    letters = np.array(list("abcdefghij"))
+    morphemes = ["".join(rng.choice(letters, size=length)) for length in rng.integers(1, 31, size=40)]
+    lines = [rng.choice(morphemes) + "_" + rng.choice(morphemes) for _ in range(500)]
+    tokens, tokenizer = tokenize(tmp_path, "".join(line + "\n" for line in lines).encode(), block)
+    assert tokens == [tuple(line.split("_")) for line in lines]
+    assert tokenizer.malformed == []
+
+# Two strings of 16 bytes whose words give the same hash are still two different morphemes
+def test_hash_collision(tmp_path):
+    def word(text):
+        return int.from_bytes(text.encode(), "little")
+    first = "abcdefghijklmnop"
+    multiplier = 0x9E3779B97F4A7C15
+    # the second word of a string that starts with another word, chosen so that both strings get the same hash
+    # (its bytes are neither "\n", "\r", "_" nor zero)
+    second = (word(first[:8]) * multiplier ^ word("zyxwvuts") * multiplier ^ word(first[8:])) % (1 << 64)
+    other = second.to_bytes(8, "little")
+    assert all(byte >= 32 and byte != ord("_") for byte in other)
+    colliding = b"zyxwvuts" + other
+    tokens, tokenizer = tokenize(tmp_path, first.encode() + b"_x\n" + colliding + b"_x\n" + first.encode() + b"_y\n")
+    assert tokens == [(first, "x"), (colliding.decode("utf-8", "replace"), "x"), (first, "y")]
+    assert list(tokenizer.codes[0]) == [first.encode(), colliding]
+
+# "\r\n" ends a line like "\n", and the last line of a file may have no "\n"
+def test_line_ends(tmp_path):
+    tokens, tokenizer = tokenize(tmp_path, b"a_b\r\nc_d\r\n\r\ne_f")
+    assert tokens == [("a", "b"), ("c", "d"), ("e", "f")]
+    assert tokenizer.malformed == []
+
+# The strings are UTF-8 bytes: a morpheme with characters of several bytes is read as it is written
+def test_utf8_morphemes(tmp_path):
+    tokens, tokenizer = tokenize(tmp_path, "niño_ça\nçççççç_日本語\nniño_x\n".encode("utf-8"), block=8)
+    assert tokens == [("niño", "ça"), ("çççççç", "日本語"), ("niño", "x")]
+
+# The malformed lines are skipped and reported with their number in the file, even when they are read in several blocks
+@pytest.mark.parametrize("block", [8, 1 << 26])
+def test_malformed_lines(tmp_path, block):
+    content = b"a_b\nnounderscore\na_b_c\n\n_x\nx_\nc_d\n"
+    tokens, tokenizer = tokenize(tmp_path, content, block)
+    assert tokens == [("a", "b"), ("c", "d")]
+    assert tokenizer.malformed == [(2, "no _", "nounderscore"), (3, "several _", "a_b_c"),
+                                   (5, "empty prefix", "_x"), (6, "empty suffix", "x_")]
+
+def test_check_lists_malformed_lines(tmp_path, capsys):
+    txtfile = str(tmp_path / "sample.txt")
+    with open(txtfile, "wb") as f:
+        f.write(b"a_b\nc\n")
+    assert main(["--check", txtfile]) == 1
+    assert capsys.readouterr().out.splitlines() == [txtfile + ": 1 malformed lines", "  line 2: no _: c"]
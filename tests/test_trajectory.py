@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the trajectory mode (--trajectory): every window against a full recompute of its tokens
+
+Part of EsLiPro (Estimations of Linguistic Productivity), see EsLiPro.py and readme.txt
+"""
+
+# Import Numpy to compare values
+# https://numpy.org/doc/stable/
+import numpy as np
+# import pandas to build the samples of the windows
+# https://pandas.pydata.org/docs/index.html
+import pandas as pd
+# import pytest to run the same test with several windows
+# https://docs.pytest.org/
+import pytest
+
+from conftest import read_lines
+from eslipro.corpus import Corpus
+from eslipro.cli import main
+from eslipro.trajectory import trajectory, window_starts
+
+
+# Every window of the trajectory is compared with the CRE and TRI of its tokens computed from scratch
+def window_values(lines):
+    """Return the tokens, types, CRE and TRI of prefixes and suffixes of a list of prefix_suffix lines."""
+    corpus = Corpus.from_table(pd.DataFrame({"prefix": [line.split("_")[0] for line in lines],
+                                             "suffix": [line.split("_")[1] for line in lines], "count": 1}))
+    CRE_Pre, CRE_Suf = corpus.cre()
+    return [len(lines), len(CRE_Pre), len(CRE_Suf), CRE_Pre.mean(), CRE_Suf.mean(), (CRE_Pre == 1).mean(), (CRE_Suf == 1).mean()]
+
+@pytest.mark.parametrize("size, step", [(300, 100), (250, 70), (1800, 1000)])
+def test_trajectory_matches_full_recompute(pair, size, step):
+    tokens = read_lines(pair[0]) + read_lines(pair[1])
+    Trajectory = trajectory(list(pair), size, step)
+    # the last window ends at the last token, even when the step does not reach it
+    assert Trajectory.End.iloc[-1] == len(tokens)
+    assert (Trajectory.End - Trajectory.Start == min(size, len(tokens))).all()
+    computed = Trajectory[['Tokens', 'Prefix_Types', 'Suffix_Types', 'CRE_Prefix', 'CRE_Suffix', 'TRI_Prefix', 'TRI_Suffix']]
+    expected = [window_values(tokens[start:end]) for start, end in zip(Trajectory.Start, Trajectory.End)]
+    np.testing.assert_allclose(computed.to_numpy(dtype=float), np.array(expected, dtype=float))
+
+# By sessions, a window has the tokens of its sessions
+def test_trajectory_by_sessions(pair):
+    Trajectory = trajectory(list(pair), 1, 1, by="sessions")
+    assert Trajectory[['First_Session', 'Last_Session']].values.tolist() == [[1, 1], [2, 2]]
+    computed = Trajectory[['Tokens', 'Prefix_Types', 'Suffix_Types', 'CRE_Prefix', 'CRE_Suffix', 'TRI_Prefix', 'TRI_Suffix']]
+    np.testing.assert_allclose(computed.to_numpy(dtype=float),
+                               np.array([window_values(read_lines(txtfile)) for txtfile in pair], dtype=float))
+
+def test_trajectory_by_sessions_covers_every_session(pair):
+    sessions = [pair[0], pair[1], pair[0]]
+    Trajectory = trajectory(sessions, 2, 2, by="sessions")
+    assert Trajectory.Last_Session.iloc[-1] == len(sessions)
+    assert Trajectory.End.iloc[-1] == sum(len(read_lines(txtfile)) for txtfile in sessions)
+
+# A window needs at least one token (or session), and must move at every step
+@pytest.mark.parametrize("size, step", [(10, -5), (10, 0), (0, 10)])
+def test_trajectory_rejects_empty_windows(pair, size, step, capsys):
+    with pytest.raises(ValueError):
+        window_starts(100, size, step)
+    with pytest.raises(SystemExit):
+        main(["--trajectory", str(size), "--step", str(step)] + list(pair))
+    assert "must be at least 1" in capsys.readouterr().err